@@ -0,0 +1,140 @@
+"""Offline benchmark for the monitor's reply pipeline.
+
+Drives messaging/browser/pipeline.py's ReplyPipeline with simulated stage
+costs (Stagehand actions, LLM generation, typing the reply) and a shared
+browser lock, the way MessageMonitor uses it, and compares how long a
+stream of buyer messages takes to answer:
+
+    serial-click     no pipeline, conversations opened by clicking the inbox row
+    pipeline-click   pipeline, send stage reopens by row click, drained every cycle
+    serial-direct    no pipeline, threads opened by URL
+    pipeline-direct  pipeline, threads reopened by URL, generated replies sent
+                     before the next extract, the rest finished during the
+                     pause between cycles
+
+Usage:
+    uv run python bench_pipeline.py [--cycles 4] [--per-cycle 3] [--scale 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from messaging.browser.pipeline import ReplyPipeline
+
+# Simulated cost of each step in seconds, before --scale
+COSTS = {
+    "inbox": 4.0,       # extract_conversation_list (Stagehand extract)
+    "navigate": 2.0,    # back to the inbox after a thread URL
+    "click": 3.0,       # click_conversation (Stagehand act)
+    "popups": 0.5,      # close_all_popups
+    "url_open": 1.5,    # open_thread (page.goto)
+    "extract": 4.0,     # extract_chat_messages (Stagehand extract)
+    "generate": 3.0,    # generate_response
+    "send": 3.0,        # browser_send_message
+    "refresh": 1.0,     # refresh_inbox after a clicked reply
+    "sleep": 3.0,       # ACTIVE_REFRESH between cycles
+}
+
+
+@dataclass
+class Job:
+    arrived_at: float
+    answered_at: float = 0.0
+
+
+class Simulation:
+    def __init__(self, mode: str, cycles: int, per_cycle: int, scale: float):
+        self.mode = mode
+        self.direct = mode.endswith("direct")
+        self.cycles = cycles
+        self.per_cycle = per_cycle
+        self.scale = scale
+        self.lock = asyncio.Lock()
+        self.jobs: list[Job] = []
+
+    async def step(self, *names: str) -> None:
+        await asyncio.sleep(sum(COSTS[name] for name in names) * self.scale)
+
+    async def open(self) -> None:
+        await self.step("url_open" if self.direct else "click", *([] if self.direct else ["popups"]))
+
+    async def generate(self, job: Job) -> bool:
+        await self.step("generate")
+        return True
+
+    async def send(self, job: Job) -> str:
+        async with self.lock:
+            await self.open()
+            await self.step("send", *([] if self.direct else ["popups", "refresh"]))
+        job.answered_at = time.monotonic()
+        return "responded"
+
+    async def finish(self, job: Job) -> None:
+        pass
+
+    async def run(self) -> float:
+        pipeline = None
+        if self.mode.startswith("pipeline"):
+            pipeline = ReplyPipeline(self.generate, self.send, self.finish)
+            pipeline.start()
+        started = time.monotonic()
+
+        for _ in range(self.cycles):
+            async with self.lock:
+                await self.step("inbox", *(["navigate"] if self.direct else []))
+            batch = [Job(time.monotonic()) for _ in range(self.per_cycle)]
+            self.jobs += batch
+            for job in batch:
+                if pipeline:
+                    if self.direct:
+                        await pipeline.wait_for_sends()
+                    async with self.lock:
+                        await self.open()
+                        await self.step("extract", *([] if self.direct else ["popups"]))
+                    pipeline.submit(job)
+                else:
+                    await self.open()
+                    await self.step("extract", "generate")
+                    await self.step("send", *([] if self.direct else ["popups", "refresh"]))
+                    job.answered_at = time.monotonic()
+            if pipeline and not self.direct:
+                await pipeline.drain()
+                await self.step("sleep")
+            elif pipeline:
+                pipeline.collect()
+                # Queued replies finish during the pause before the next cycle
+                await asyncio.gather(self.step("sleep"), pipeline.wait_idle())
+            else:
+                await self.step("sleep")
+
+        if pipeline:
+            await pipeline.drain()
+            await pipeline.stop()
+        return time.monotonic() - started
+
+    def report(self, total_s: float) -> dict:
+        latencies = [(job.answered_at - job.arrived_at) / self.scale for job in self.jobs]
+        return {
+            "mode": self.mode,
+            "total_s": round(total_s / self.scale, 1),
+            "avg_reply_s": round(sum(latencies) / len(latencies), 1),
+            "max_reply_s": round(max(latencies), 1),
+        }
+
+
+async def main(args) -> None:
+    print(f"{'mode':<17}{'total_s':>9}{'avg_reply_s':>13}{'max_reply_s':>13}")
+    for mode in ("serial-click", "pipeline-click", "serial-direct", "pipeline-direct"):
+        simulation = Simulation(mode, args.cycles, args.per_cycle, args.scale)
+        row = simulation.report(await simulation.run())
+        print(f"{row['mode']:<17}{row['total_s']:>9}{row['avg_reply_s']:>13}{row['max_reply_s']:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=4)
+    parser.add_argument("--per-cycle", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=0.01, help="real seconds per simulated second")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,165 @@
+"""Offline benchmark for the AI responder.
+
+Replays the demo conversations from database/seed.py through
+build_system_prompt, build_message_history and generate_response against
+the local stub in messaging/ai/stub_server.py, so prompt changes can be
+compared on tokens and latency without calling OpenAI.
+
+Usage:
+    uv run python bench_responder.py [--rounds 3] [--latency-ms 800]
+        [--jitter-ms 200] [--invalid-rate 0.05] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import uvicorn
+
+from database.models.listing import Listing
+from database.seed import DEFAULT_CONVERSATIONS, DEFAULT_LISTINGS
+from messaging.config import settings
+from messaging.models.message import Message
+
+
+def build_turns() -> list[dict]:
+    """Every buyer message in the fixtures becomes one turn, with the history before it."""
+    listings = {
+        data["title"]: Listing(id=i, **data) for i, data in enumerate(DEFAULT_LISTINGS, start=1)
+    }
+    turns = []
+    for fixture in DEFAULT_CONVERSATIONS:
+        conversation = fixture["conversation"]
+        history = []
+        for role, content, _ in fixture["messages"]:
+            if role == "buyer":
+                turns.append({
+                    "buyer": fixture["buyer_name"],
+                    "listing": listings.get(fixture["listing_title"]),
+                    "history": list(history),
+                    "new_buyer_messages": [content],
+                    "status": conversation.get("status", "active"),
+                    "agreed_price": conversation.get("agreed_price"),
+                    "delivery_address": conversation.get("delivery_address"),
+                })
+            history.append(Message(role=role, content=content))
+    return turns
+
+
+def time_builders(turns: list[dict], iterations: int = 200) -> dict:
+    """Average CPU time of the prompt builders per turn, in microseconds."""
+    from messaging.ai.context import build_message_history
+    from messaging.ai.prompts import build_system_prompt
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for turn in turns:
+            build_system_prompt(turn["listing"], turn["status"], turn["agreed_price"])
+    system_us = (time.perf_counter() - started) / (iterations * len(turns)) * 1e6
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for turn in turns:
+            build_message_history(turn["history"], turn["new_buyer_messages"])
+    history_us = (time.perf_counter() - started) / (iterations * len(turns)) * 1e6
+
+    return {
+        "build_system_prompt_us": round(system_us, 1),
+        "build_message_history_us": round(history_us, 1),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    from messaging.ai import stub_server
+    from messaging.ai.responder import generate_response, responder_stats
+    from messaging.ai.router import route_stats
+    from messaging.ai.usage import usage_tracker
+
+    stub_server.reset(stub_server.StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        invalid_rate=args.invalid_rate,
+        seed=args.seed,
+    ))
+    server = uvicorn.Server(uvicorn.Config(
+        stub_server.app, host="127.0.0.1", port=args.port, log_level="warning"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    turns = build_turns()
+    latencies = []
+    deal_statuses: dict[str, int] = {}
+    failed = 0
+    try:
+        for _ in range(args.rounds):
+            for turn in turns:
+                started = time.monotonic()
+                result = await generate_response(
+                    listing=turn["listing"],
+                    messages=turn["history"],
+                    conversation_status=turn["status"],
+                    new_buyer_messages=turn["new_buyer_messages"],
+                    agreed_price=turn["agreed_price"],
+                    delivery_address=turn["delivery_address"],
+                )
+                latencies.append(time.monotonic() - started)
+                if result is None:
+                    failed += 1
+                else:
+                    deal_statuses[result.deal_status] = deal_statuses.get(result.deal_status, 0) + 1
+    finally:
+        server.should_exit = True
+        await server_task
+
+    usage = usage_tracker.snapshot()
+    ordered = sorted(latencies)
+    return {
+        "turns": len(latencies),
+        "failed": failed,
+        "latency_ms": {
+            "avg": round(statistics.mean(ordered) * 1000),
+            "p50": round(ordered[len(ordered) // 2] * 1000),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000),
+        },
+        "tokens": {
+            "prompt": usage["prompt_tokens"],
+            "cached": usage["cached_tokens"],
+            "completion": usage["completion_tokens"],
+            "prompt_per_turn": round(usage["prompt_tokens"] / (len(latencies) or 1)),
+            "cache_hit_rate": usage["cache_hit_rate"],
+        },
+        "parsing": responder_stats.snapshot(),
+        "routes": route_stats.snapshot(),
+        "deal_statuses": deal_statuses,
+        "builders": time_builders(turns),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI responder against a local stub")
+    parser.add_argument("--rounds", type=int, default=3, help="times to replay all fixtures")
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="fraction of invalid JSON replies")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    settings.openai_api_key = "stub"
+    settings.openai_base_url = f"http://127.0.0.1:{args.port}/v1"
+    settings.fast_path_enabled = False
+
+    results = asyncio.run(run_benchmark(args))
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import event, text
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -21,9 +21,14 @@ engine = create_async_engine(DATABASE_URL, echo=False)
 
 @event.listens_for(engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_conn, connection_record):
-    """Enable WAL mode for concurrent access from multiple services."""
+    """Enable WAL mode for concurrent access from multiple services.
+
+    busy_timeout makes concurrent writers wait for the lock instead of
+    failing immediately with "database is locked".
+    """
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
     cursor.close()
 
 
@@ -34,10 +39,32 @@ async_session = async_sessionmaker(
 )
 
 
+def add_missing_columns(sync_conn):
+    """Add columns and indexes that were added to models after their table was created.
+
+    create_all only creates missing tables, so without this an existing
+    database never picks up new columns. Run via conn.run_sync after create_all.
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.tables.values():
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                col_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+                )
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     """Initialize database with schema."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
 
     schema_path = Path(__file__).parent / "schema.sql"
     if schema_path.exists():
@@ -78,6 +78,10 @@ CREATE TABLE IF NOT EXISTS conversations (
     agreed_price REAL,
     delivery_address TEXT,
     current_offer REAL,
+    message_count INTEGER DEFAULT 0,
+    history_summary TEXT,
+    summary_through_id INTEGER DEFAULT 0,
+    summarized_tokens INTEGER DEFAULT 0,
     last_message_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (buyer_id) REFERENCES buyers(id),
@@ -92,6 +96,8 @@ CREATE TABLE IF NOT EXISTS messages (
     content TEXT NOT NULL,
     sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     delivered BOOLEAN DEFAULT 0,
+    position INTEGER,
+    fingerprint TEXT,
     FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE
 );
 
@@ -140,6 +146,52 @@ CREATE TABLE IF NOT EXISTS transactions (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Dashboard row counts; maintained by triggers the messaging service
+-- installs at startup (see messaging/services/stats_counters.py)
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+
+-- Analytics: hourly rollups, rollup watermarks and conversation status
+-- transitions (recorded by triggers, see messaging/services/analytics.py)
+CREATE TABLE IF NOT EXISTS analytics_hourly (
+    bucket TIMESTAMP NOT NULL,
+    metric TEXT NOT NULL,
+    dimension TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    PRIMARY KEY (bucket, metric, dimension)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_watermarks (
+    source TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS conversation_status_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id INTEGER NOT NULL,
+    from_status TEXT,
+    to_status TEXT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Stripe webhook inbox, keyed by event id
+CREATE TABLE IF NOT EXISTS webhook_events (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_listing_images_listing_id ON listing_images(listing_id);
 CREATE INDEX IF NOT EXISTS idx_posting_jobs_listing_id ON posting_jobs(listing_id);
@@ -149,5 +201,10 @@ CREATE INDEX IF NOT EXISTS idx_conversations_buyer_id ON conversations(buyer_id)
 CREATE INDEX IF NOT EXISTS idx_conversations_listing_id ON conversations(listing_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_status ON conversations(status);
 CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_sent_at ON messages(conversation_id, sent_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_fingerprint ON messages(fingerprint);
 CREATE INDEX IF NOT EXISTS idx_transactions_conversation_id ON transactions(conversation_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions(status);
+CREATE INDEX IF NOT EXISTS idx_transactions_created_at_id ON transactions(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_conversation_status_events_changed_at ON conversation_status_events(changed_at);
+CREATE INDEX IF NOT EXISTS idx_webhook_events_status_next_attempt ON webhook_events(status, next_attempt_at);
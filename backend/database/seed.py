@@ -74,11 +74,76 @@ async def seed_default_listings():
         await db.commit()
 
 
+DEFAULT_BUYERS = [
+    {"fb_name": "Sarah Mitchell", "fb_profile_url": "https://facebook.com/sarah.mitchell"},
+    {"fb_name": "Mike Rodriguez", "fb_profile_url": "https://facebook.com/mike.rodriguez"},
+    {"fb_name": "James Kim", "fb_profile_url": "https://facebook.com/james.kim"},
+    {"fb_name": "Lisa Thompson", "fb_profile_url": "https://facebook.com/lisa.thompson"},
+    {"fb_name": "David Chen", "fb_profile_url": "https://facebook.com/david.chen"},
+]
+
+# Demo conversations: buyer, listing, conversation fields and messages
+# (role, content, sent_at). Also replayed by bench_responder.py.
+DEFAULT_CONVERSATIONS = [
+    {
+        "buyer_name": "Sarah Mitchell",
+        "listing_title": "Airpod Pro 2nd Generation",
+        "conversation": {
+            "fb_thread_id": "thread_airpod_sarah", "status": "active",
+            "current_offer": 100.0, "last_message_at": "2026-02-15T09:30:00",
+        },
+        "messages": [
+            ("buyer", "Hey, is this still available? The AirPods Pro 2nd gen?", "2026-02-13T10:15:00"),
+            ("seller", "Yes! They are still available. They are in great condition with active noise cancellation working perfectly. Comes with the MagSafe charging case.", "2026-02-13T10:16:00"),
+            ("buyer", "Nice! Would you take $85 for them?", "2026-02-13T10:20:00"),
+            ("seller", "I appreciate the offer, but $85 is a bit low. The lowest I can go is $90. These retail for $249 new and they are in great shape.", "2026-02-13T10:21:00"),
+            ("buyer", "How about $95? I can pick up today.", "2026-02-14T08:00:00"),
+            ("seller", "I can do $100 since you are picking up today. That is my best price.", "2026-02-14T08:01:00"),
+            ("buyer", "Let me think about it and get back to you.", "2026-02-15T09:30:00"),
+        ],
+    },
+    {
+        "buyer_name": "Mike Rodriguez",
+        "listing_title": "Airpod Pro 2nd Generation",
+        "conversation": {
+            "fb_thread_id": "thread_airpod_mike", "status": "agreed",
+            "agreed_price": 110.0, "current_offer": 110.0,
+            "delivery_address": "456 Oak Ave, Berkeley, CA",
+            "last_message_at": "2026-02-15T08:00:00",
+        },
+        "messages": [
+            ("buyer", "Hi there! Interested in the AirPods. What condition are they in?", "2026-02-12T14:00:00"),
+            ("seller", "They are in great condition! Fully functional noise cancellation, comes with all ear tips and the original box. Battery health is excellent.", "2026-02-12T14:01:00"),
+            ("buyer", "Sounds good. Can you do $100?", "2026-02-12T14:10:00"),
+            ("seller", "I could meet you at $110. That is a great deal considering the condition and everything included.", "2026-02-12T14:11:00"),
+            ("buyer", "Deal! $110 works. Can you ship to Berkeley?", "2026-02-13T09:00:00"),
+            ("seller", "Absolutely! I will send you a payment link. Once confirmed, I will ship it out same day.", "2026-02-13T09:01:00"),
+            ("buyer", "Payment sent! My address is 456 Oak Ave, Berkeley, CA.", "2026-02-15T08:00:00"),
+        ],
+    },
+    {
+        "buyer_name": "David Chen",
+        "listing_title": "Home Office Chair [PERFECT CONDITION]",
+        "conversation": {
+            "fb_thread_id": "thread_chair_david", "status": "active",
+            "current_offer": 25.0, "last_message_at": "2026-02-15T11:00:00",
+        },
+        "messages": [
+            ("buyer", "Hey! Is the office chair still available? Can you deliver to downtown?", "2026-02-14T11:30:00"),
+            ("seller", "Yes it is! I can deliver within the area. It is in perfect condition, very comfortable for long work sessions.", "2026-02-14T11:31:00"),
+            ("buyer", "Awesome. Would you take $20?", "2026-02-14T12:00:00"),
+            ("seller", "I can do $25 with delivery included. That is a great deal for a chair in this condition.", "2026-02-14T12:01:00"),
+            ("buyer", "$25 with delivery? That works for me! When can you drop it off?", "2026-02-15T11:00:00"),
+        ],
+    },
+]
+
 async def seed_default_conversations():
     """Insert demo buyers, conversations, and messages if none exist."""
     from messaging.models.buyer import Buyer
     from messaging.models.conversation import Conversation
     from messaging.models.message import Message
+    from messaging.services.message_dedup import message_fingerprint
 
     async with async_session() as db:
         # Skip if conversations already exist
@@ -90,89 +155,33 @@ async def seed_default_conversations():
         listings = (await db.execute(select(Listing))).scalars().all()
         listing_by_title = {l.title: l for l in listings}
 
-        airpod = listing_by_title.get("Airpod Pro 2nd Generation")
-        chair = listing_by_title.get("Home Office Chair [PERFECT CONDITION]")
-
         # Create buyers
-        buyers = [
-            Buyer(fb_name="Sarah Mitchell", fb_profile_url="https://facebook.com/sarah.mitchell"),
-            Buyer(fb_name="Mike Rodriguez", fb_profile_url="https://facebook.com/mike.rodriguez"),
-            Buyer(fb_name="James Kim", fb_profile_url="https://facebook.com/james.kim"),
-            Buyer(fb_name="Lisa Thompson", fb_profile_url="https://facebook.com/lisa.thompson"),
-            Buyer(fb_name="David Chen", fb_profile_url="https://facebook.com/david.chen"),
-        ]
-        for b in buyers:
-            db.add(b)
+        buyers = {}
+        for buyer_data in DEFAULT_BUYERS:
+            buyers[buyer_data["fb_name"]] = Buyer(**buyer_data)
+            db.add(buyers[buyer_data["fb_name"]])
         await db.flush()
 
-        # Conversations for Airpod Pro
-        convos = []
-        if airpod:
-            convos.append(Conversation(
-                buyer_id=buyers[0].id, listing_id=airpod.id,
-                fb_thread_id="thread_airpod_sarah", status="active",
-                current_offer=100.0, last_message_at=datetime.fromisoformat("2026-02-15T09:30:00"),
-            ))
-            convos.append(Conversation(
-                buyer_id=buyers[1].id, listing_id=airpod.id,
-                fb_thread_id="thread_airpod_mike", status="agreed",
-                agreed_price=110.0, current_offer=110.0,
-                delivery_address="456 Oak Ave, Berkeley, CA",
-                last_message_at=datetime.fromisoformat("2026-02-15T08:00:00"),
-            ))
-
-        # Conversations for Chair
-        if chair:
-            convos.append(Conversation(
-                buyer_id=buyers[4].id, listing_id=chair.id,
-                fb_thread_id="thread_chair_david", status="active",
-                current_offer=25.0, last_message_at=datetime.fromisoformat("2026-02-15T11:00:00"),
-            ))
-
-        for c in convos:
-            db.add(c)
-        await db.flush()
-
-        # Messages
-        all_messages = []
-
-        # Sarah -> Airpod Pro
-        if len(convos) >= 1:
-            cid = convos[0].id
-            all_messages += [
-                Message(conversation_id=cid, role="buyer", content="Hey, is this still available? The AirPods Pro 2nd gen?", sent_at=datetime.fromisoformat("2026-02-13T10:15:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="Yes! They are still available. They are in great condition with active noise cancellation working perfectly. Comes with the MagSafe charging case.", sent_at=datetime.fromisoformat("2026-02-13T10:16:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Nice! Would you take $85 for them?", sent_at=datetime.fromisoformat("2026-02-13T10:20:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="I appreciate the offer, but $85 is a bit low. The lowest I can go is $90. These retail for $249 new and they are in great shape.", sent_at=datetime.fromisoformat("2026-02-13T10:21:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="How about $95? I can pick up today.", sent_at=datetime.fromisoformat("2026-02-14T08:00:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="I can do $100 since you are picking up today. That is my best price.", sent_at=datetime.fromisoformat("2026-02-14T08:01:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Let me think about it and get back to you.", sent_at=datetime.fromisoformat("2026-02-15T09:30:00"), delivered=True),
-            ]
-
-        # Mike -> Airpod Pro
-        if len(convos) >= 2:
-            cid = convos[1].id
-            all_messages += [
-                Message(conversation_id=cid, role="buyer", content="Hi there! Interested in the AirPods. What condition are they in?", sent_at=datetime.fromisoformat("2026-02-12T14:00:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="They are in great condition! Fully functional noise cancellation, comes with all ear tips and the original box. Battery health is excellent.", sent_at=datetime.fromisoformat("2026-02-12T14:01:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Sounds good. Can you do $100?", sent_at=datetime.fromisoformat("2026-02-12T14:10:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="I could meet you at $110. That is a great deal considering the condition and everything included.", sent_at=datetime.fromisoformat("2026-02-12T14:11:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Deal! $110 works. Can you ship to Berkeley?", sent_at=datetime.fromisoformat("2026-02-13T09:00:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="Absolutely! I will send you a payment link. Once confirmed, I will ship it out same day.", sent_at=datetime.fromisoformat("2026-02-13T09:01:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Payment sent! My address is 456 Oak Ave, Berkeley, CA.", sent_at=datetime.fromisoformat("2026-02-15T08:00:00"), delivered=True),
-            ]
-
-        # David -> Chair
-        if len(convos) >= 3:
-            cid = convos[2].id
-            all_messages += [
-                Message(conversation_id=cid, role="buyer", content="Hey! Is the office chair still available? Can you deliver to downtown?", sent_at=datetime.fromisoformat("2026-02-14T11:30:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="Yes it is! I can deliver within the area. It is in perfect condition, very comfortable for long work sessions.", sent_at=datetime.fromisoformat("2026-02-14T11:31:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="Awesome. Would you take $20?", sent_at=datetime.fromisoformat("2026-02-14T12:00:00"), delivered=True),
-                Message(conversation_id=cid, role="seller", content="I can do $25 with delivery included. That is a great deal for a chair in this condition.", sent_at=datetime.fromisoformat("2026-02-14T12:01:00"), delivered=True),
-                Message(conversation_id=cid, role="buyer", content="$25 with delivery? That works for me! When can you drop it off?", sent_at=datetime.fromisoformat("2026-02-15T11:00:00"), delivered=True),
-            ]
-
-        for m in all_messages:
-            db.add(m)
+        for fixture in DEFAULT_CONVERSATIONS:
+            listing = listing_by_title.get(fixture["listing_title"])
+            if not listing:
+                continue
+
+            fields = dict(fixture["conversation"])
+            fields["last_message_at"] = datetime.fromisoformat(fields["last_message_at"])
+            conversation = Conversation(
+                buyer_id=buyers[fixture["buyer_name"]].id,
+                listing_id=listing.id,
+                message_count=len(fixture["messages"]),
+                **fields,
+            )
+            db.add(conversation)
+            await db.flush()
+
+            for position, (role, content, sent_at) in enumerate(fixture["messages"]):
+                db.add(Message(
+                    conversation_id=conversation.id, role=role, content=content,
+                    sent_at=datetime.fromisoformat(sent_at), delivered=True, position=position,
+                    fingerprint=message_fingerprint(conversation.id, role, content, position),
+                ))
         await db.commit()
@@ -1,13 +1,280 @@
+import asyncio
+import bisect
+import logging
+import random
+import time
+from collections import deque
+
+import openai
 from openai import AsyncOpenAI
 
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
 _client: AsyncOpenAI | None = None
+_gateway: "LLMGateway | None" = None
+
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000]
+
+# Samples needed before hedging kicks in
+HEDGE_MIN_SAMPLES = 20
+
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
 
 
 def get_openai_client() -> AsyncOpenAI:
-    """Get or create the OpenAI client singleton."""
+    """Get or create the OpenAI client singleton.
+
+    Retries and timeouts are handled by the gateway, not the SDK.
+    """
     global _client
     if _client is None:
-        _client = AsyncOpenAI(api_key=settings.openai_api_key)
+        _client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=settings.llm_timeout,
+            max_retries=0,
+        )
     return _client
+
+
+def get_llm_gateway() -> "LLMGateway":
+    """Get or create the shared LLM gateway."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(
+            max_concurrency=settings.llm_max_concurrency,
+            timeout=settings.llm_timeout,
+            max_retries=settings.llm_max_retries,
+            hedge_percentile=settings.llm_hedge_percentile,
+            breaker_threshold=settings.llm_breaker_threshold,
+            breaker_reset=settings.llm_breaker_reset,
+        )
+    return _gateway
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 200):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_s = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def record(self, latency_s: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_s * 1000)] += 1
+        self.count += 1
+        self.total_s += latency_s
+        self._recent.append(latency_s)
+
+    def percentile(self, p: float) -> float | None:
+        """Latency in seconds at percentile p (0-1) over recent calls, None without data."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["le_inf"]
+        cumulative, buckets = 0, {}
+        for label, count in zip(labels, self.counts):
+            cumulative += count
+            buckets[label] = cumulative
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_s / (self.count or 1) * 1000),
+            "p50_ms": round((self.percentile(0.5) or 0) * 1000),
+            "p95_ms": round((self.percentile(0.95) or 0) * 1000),
+            "buckets": buckets,
+        }
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; lets one trial call through after `reset` seconds."""
+
+    def __init__(self, threshold: int, reset: float):
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def end_trial(self) -> None:
+        """Release the half-open trial slot without a verdict, e.g. after a 4xx or a cancel."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"[llm_gateway] Circuit breaker opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """Shared entry point for chat completions.
+
+    Caps concurrent requests with a semaphore, gives every attempt a
+    deadline, retries transient errors with jittered backoff, optionally
+    sends a hedged duplicate request once an attempt is slower than the
+    model's recent latency percentile, and stops calling the provider
+    while the circuit breaker is open (raising CircuitOpenError so callers
+    can degrade).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout: float,
+        max_retries: int,
+        hedge_percentile: float,
+        breaker_threshold: int,
+        breaker_reset: float,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.hedge_percentile = hedge_percentile
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.counters = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0}
+
+    async def chat(self, **params):
+        """Run chat.completions.create through the gateway and return the response.
+
+        Only provider trouble (transient errors after retries, 5xx) counts
+        toward the breaker; a 4xx or an invalid response is the request's
+        fault and is raised as is.
+        """
+        trial = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        self.counters["calls"] += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with self._semaphore:
+                        self.in_flight += 1
+                        try:
+                            response = await self._attempt(params)
+                        finally:
+                            self.in_flight -= 1
+                except RETRYABLE_ERRORS as e:
+                    if isinstance(e, (asyncio.TimeoutError, openai.APITimeoutError)):
+                        self.counters["timeouts"] += 1
+                    if attempt == self.max_retries:
+                        self._fail()
+                        raise
+                    self.counters["retries"] += 1
+                    backoff = min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning(
+                        f"[llm_gateway] {type(e).__name__} on attempt {attempt + 1}, "
+                        f"retrying in {backoff:.1f}s"
+                    )
+                    # Outside the semaphore so waiting retries don't hold slots
+                    await asyncio.sleep(backoff)
+                except openai.APIStatusError as e:
+                    if e.status_code >= 500:
+                        self._fail()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    return response
+        finally:
+            # A trial that ended without a verdict (4xx, cancelled) must not block the next one
+            if trial:
+                self.breaker.end_trial()
+
+    def _fail(self) -> None:
+        self.counters["failures"] += 1
+        self.breaker.record_failure()
+
+    async def _attempt(self, params: dict):
+        """One attempt with a deadline, hedged after the latency percentile if enabled."""
+        histogram = self.histograms.setdefault(params.get("model", ""), LatencyHistogram())
+        hedge_after = None
+        if self.hedge_percentile and histogram.samples >= HEDGE_MIN_SAMPLES:
+            hedge_after = histogram.percentile(self.hedge_percentile)
+
+        async with asyncio.timeout(self.timeout):
+            primary = asyncio.create_task(self._timed_call(params, histogram))
+            if hedge_after is None or hedge_after >= self.timeout:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self.counters["hedged"] += 1
+            hedge = asyncio.create_task(self._timed_call(params, histogram))
+            pending = {primary, hedge}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is hedge:
+                                self.counters["hedge_wins"] += 1
+                            return task.result()
+                # Both failed: surface the primary's error
+                return primary.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    async def _timed_call(self, params: dict, histogram: LatencyHistogram):
+        started_at = time.monotonic()
+        response = await get_openai_client().chat.completions.create(**params)
+        histogram.record(time.monotonic() - started_at)
+        return response
+
+    def snapshot(self) -> dict:
+        return {
+            "breaker": self.breaker.state,
+            "in_flight": self.in_flight,
+            **self.counters,
+            "models": {model: h.snapshot() for model, h in self.histograms.items()},
+        }
@@ -1,17 +1,59 @@
-def build_message_history(messages, new_buyer_messages: list[str] | None = None) -> list[dict]:
+# Rough chat-format overhead per message on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Approximate token count (~4 characters per token for English text)."""
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+
+def history_tokens(messages) -> int:
+    """Approximate tokens the messages take up in the prompt."""
+    return sum(estimate_tokens(msg.content) + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+
+
+def split_history(messages, budget: int) -> tuple[list, list]:
+    """Split messages into (older, recent) so that the recent ones fit in `budget` tokens.
+
+    Walks back from the newest message and keeps whole messages only.
+    """
+    used = 0
+    cut = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(messages[i].content) + MESSAGE_OVERHEAD_TOKENS
+        if used > budget:
+            break
+        cut = i
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def build_message_history(
+    messages,
+    new_buyer_messages: list[str] | None = None,
+    summary: str | None = None,
+) -> list[dict]:
     """Convert DB messages into OpenAI chat message format.
 
     Args:
         messages: List of Message model instances, ordered by sent_at ASC.
-            These are the FULL conversation history already in the DB.
+            These are the recent conversation history already in the DB.
         new_buyer_messages: List of new buyer message strings that haven't
             been responded to yet. These get appended as a single user
             message labeled "NEW MESSAGES" so the AI knows what to respond to.
+        summary: Summary of the older messages that were left out, if any.
 
     Returns:
-        List of {"role": "user"|"assistant", "content": str} dicts.
+        List of {"role": "system"|"user"|"assistant", "content": str} dicts.
     """
     history = []
+    if summary:
+        history.append({
+            "role": "system",
+            "content": f"[EARLIER IN THIS CONVERSATION - summary]\n{summary}",
+        })
+
     for msg in messages:
         role = "user" if msg.role == "buyer" else "assistant"
         history.append({"role": role, "content": msg.content})
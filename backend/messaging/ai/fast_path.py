@@ -0,0 +1,166 @@
+import logging
+import random
+import re
+from dataclasses import dataclass, field
+
+from .prompts import listing_pricing, negotiation_thresholds
+from .responder import AIResponse
+from .router import ACK_PATTERN
+
+logger = logging.getLogger(__name__)
+
+_AMOUNT = r"(\d{1,6}(?:\.\d{1,2})?)"
+_CURRENCY = r"(?:\$|dollars|bucks)"
+# After "would you take" etc. the phrase says it's a price, so "$" is optional
+_PRICE = rf"\$?\s*{_AMOUNT}(?:\s*{_CURRENCY})?"
+# On its own a number could be a year, a size or a count — require "$" or "bucks"
+_MARKED_PRICE = rf"(?:\$\s*{_AMOUNT}(?:\s*{_CURRENCY})?|{_AMOUNT}\s*{_CURRENCY})"
+
+AVAILABILITY_PATTERN = re.compile(
+    r"^(?:(?:hi|hey|hello|yo)\b[\s,!.]*)?"
+    r"(?:is\s+(?:this|it|this\s+item|the\s+\w+)\s+)?(?:still\s+)?available\s*[?!.]*$"
+)
+
+OFFER_PATTERNS = [
+    re.compile(rf"^{_MARKED_PRICE}\s*[?!.]*$"),
+    re.compile(
+        rf"^(?:would|will|could|can)\s+(?:you|u)\s+(?:take|do|accept|go)\s+(?:for\s+)?{_PRICE}\s*[?!.]*$"
+    ),
+    re.compile(rf"^(?:i\s+can\s+do|i\s+could\s+do|how\s+about|what\s+about|hows|how's)\s+{_PRICE}\s*[?!.]*$"),
+    re.compile(rf"^{_MARKED_PRICE}\s+(?:ok|okay|work|works|cool)\s*[?!.]*$"),
+]
+
+AVAILABILITY_REPLIES = [
+    "yep still available",
+    "yea its still available",
+    "yup still got it",
+]
+
+ACK_REPLIES = [
+    "bet lmk if you have any questions",
+    "for sure lmk",
+    "cool cool lmk",
+]
+
+
+@dataclass
+class FastPathStats:
+    """How often the fast path answered instead of the LLM."""
+    checked: int = 0
+    hits: int = 0
+    by_intent: dict[str, int] = field(default_factory=dict)
+    latency_saved_s: float = 0.0
+
+    def record_hit(self, intent: str, llm_latency_s: float) -> None:
+        self.hits += 1
+        self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+        self.latency_saved_s += llm_latency_s
+
+    def snapshot(self) -> dict:
+        return {
+            "checked": self.checked,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / (self.checked or 1), 4),
+            "by_intent": dict(self.by_intent),
+            "latency_saved_ms": round(self.latency_saved_s * 1000),
+        }
+
+
+fast_path_stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def parse_offer(text: str) -> float | None:
+    """Return the dollar amount if the message is nothing but a price offer.
+
+    A bare number only counts with a currency marker ("$80", "80 bucks");
+    without one it needs an offer phrase ("would you take 80").
+    """
+    normalized = _normalize(text)
+    for pattern in OFFER_PATTERNS:
+        match = pattern.match(normalized)
+        if match:
+            return float(next(group for group in match.groups() if group))
+    return None
+
+
+def evaluate_offer(listing, offer: float, current_offer: float | None, competing_offer: float | None):
+    """Answer a price offer from the same thresholds the prompt's rules use.
+
+    Only clear-cut cases: an offer at or above what the rules accept
+    outright (but not above asking, which is more likely a misread or a
+    typo than a generous buyer), or a first offer below the lowest price.
+    Counter-offers in between need the back-and-forth judgement of the LLM.
+    Returns None to fall back to the LLM.
+    """
+    price, floor, flexibility = listing_pricing(listing)
+    visible_lowest, accept_threshold = negotiation_thresholds(price, floor, flexibility)
+
+    # Firm listings only accept asking; everyone else accepts within ~10%
+    # Never below the lowest the prompt allows or the seller's real minimum
+    accept_at = price if flexibility <= 0.15 else max(accept_threshold, visible_lowest, floor)
+    lowest = visible_lowest
+    if competing_offer is not None and competing_offer > floor:
+        accept_at = max(accept_at, competing_offer)
+        lowest = max(lowest, round(competing_offer))
+
+    if offer > price:
+        return None
+
+    if offer >= accept_at and offer >= floor:
+        return AIResponse(
+            message=f"bet ${offer:.0f} works, whats your address?",
+            deal_status="agreed",
+            agreed_price=offer,
+            buyer_offer=offer,
+        )
+
+    # Repeated lowballs are for the LLM (it wraps up after a few rounds).
+    # Super flexible listings counter above the lowest first, so the LLM too.
+    if offer < lowest and current_offer is None and flexibility <= 0.85 and offer >= price * 0.1:
+        if flexibility <= 0.15:
+            message = f"sorry this one's pretty firm at ${price:.0f}"
+        else:
+            message = f"lowest i can do is ${lowest:.0f} lmk if that works"
+        return AIResponse(message=message, buyer_offer=offer)
+
+    return None
+
+
+def classify_fast_reply(
+    listing,
+    conversation_status: str,
+    new_buyer_messages: list[str],
+    last_seller_message: str | None = None,
+    current_offer: float | None = None,
+    competing_offer: float | None = None,
+) -> tuple[str, AIResponse] | None:
+    """Answer trivial buyer messages without the LLM.
+
+    Handles availability checks, plain price offers and simple
+    acknowledgements in an active conversation about a known listing.
+    Returns (intent, response), or None to fall back to the LLM.
+    """
+    if not listing or conversation_status != "active" or not new_buyer_messages:
+        return None
+
+    text = _normalize(" ".join(new_buyer_messages))
+
+    if AVAILABILITY_PATTERN.match(text):
+        return "availability", AIResponse(message=random.choice(AVAILABILITY_REPLIES))
+
+    offer = parse_offer(text)
+    if offer is not None:
+        response = evaluate_offer(listing, offer, current_offer, competing_offer)
+        return ("offer", response) if response else None
+
+    # "ok" after a price or a question may be the buyer accepting — LLM decides
+    if ACK_PATTERN.match(text) and last_seller_message and not re.search(
+        r"[\d$?]", last_seller_message
+    ):
+        return "acknowledgement", AIResponse(message=random.choice(ACK_REPLIES))
+
+    return None
@@ -1,8 +1,13 @@
-SYSTEM_PROMPT_TEMPLATE = """You are a real person selling an item on Facebook Marketplace, texting with a buyer.
+from collections import OrderedDict
 
-LISTING: {title} | Price: ${price}
-Description: {description}
-Seller notes: {seller_notes}
+from ..config import settings
+
+# Everything that is the same for every listing comes first and is never
+# formatted, so the system prompt always starts with the same bytes. Listing
+# values and deal state go last. This is ~650 tokens, below the 1024-token
+# minimum for OpenAI prompt caching, so today cached_tokens stays 0: the
+# ordering only pays off once the shared prefix grows past that.
+SYSTEM_PROMPT_STATIC = """You are a real person selling an item on Facebook Marketplace, texting with a buyer.
 
 RULES:
 - You will see the full conversation history, then NEW MESSAGES from the buyer since your last response.
@@ -16,7 +21,7 @@ RULES:
 - The seller ships via mail or meets in person — do NOT ask about delivery preferences or timing. Do NOT mention delivery/pickup until a price is agreed. Once agreed, just ask for their address.
 
 NEGOTIATION:
-{negotiation_rules}
+- Follow the PRICE RULES for this listing at the end of this prompt.
 - If negotiation goes back and forth 3+ times with no agreement → wrap it up naturally, like "no worries i get it, if anything changes hmu ill keep you posted. bye buy!" and set deal_status to "declined".
 - If buyer says they're not interested / passes / says nvm → be cool about it, like "all good no worries, hmu if you change your mind. bye buy!" and set deal_status to "declined".
 - If you don't know something → "lemme check on that and get back to you" (flag for review).
@@ -30,11 +35,20 @@ DEAL STATUS - BE CAREFUL:
 - "address_confirmed" - buyer confirmed the delivery address is correct after you repeated it back
 
 Respond with ONLY valid JSON:
-{{"message": "your response text", "deal_status": "none", "agreed_price": null, "delivery_address": null, "buyer_offer": null}}
+{"message": "your response text", "deal_status": "none", "agreed_price": null, "delivery_address": null, "buyer_offer": null}
 
 Set "buyer_offer" to the dollar amount the buyer offered/mentioned, or null if no price was mentioned.
 """
 
+LISTING_CONTEXT_TEMPLATE = """
+LISTING: {title} | Price: ${price}
+Description: {description}
+Seller notes: {seller_notes}
+
+PRICE RULES:
+{negotiation_rules}
+"""
+
 SYSTEM_PROMPT_NO_LISTING = """You are a real person selling items on Facebook Marketplace, texting with a buyer.
 
 The specific listing could not be identified.
@@ -51,6 +65,19 @@ Respond with ONLY valid JSON:
 Set "buyer_offer" to the dollar amount the buyer offered/mentioned, or null if no price was mentioned.
 """
 
+HISTORY_SUMMARY_PROMPT = """You keep notes on a Facebook Marketplace conversation between a seller and a buyer.
+
+Update the summary below with the new messages. Keep every fact that matters for the deal: prices offered and countered by each side, what was agreed or refused, questions asked and answered, pickup/shipping details and the buyer's address if given. Drop small talk.
+
+Write at most 5 short lines of plain text, no JSON.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW MESSAGES:
+{messages}
+"""
+
 COMPETING_OFFER_ADDENDUM = """
 
 IMPORTANT - COMPETING OFFER: Another buyer is currently offering ${competing_offer} for this item. That is your effective floor price now.
@@ -70,7 +97,7 @@ IMPORTANT: A deal has already been agreed on this item at ${agreed_price}. You a
 
 CONFIRM_ADDRESS_ADDENDUM = """
 
-IMPORTANT: A deal has been agreed at ${agreed_price} and the buyer gave their delivery address: ${delivery_address}
+IMPORTANT: A deal has been agreed at ${agreed_price} and the buyer gave their delivery address: {delivery_address}
 You just confirmed the address with them and are waiting for them to say yes.
 - If they confirm (yes/yeah/yep/correct/that's right/etc), respond with something friendly and natural like "dope, sending the payment link now, one sec" or "perfect, lemme get that payment link for you real quick". Set deal_status to "address_confirmed".
 - If they say the address is wrong or give a corrected address, update delivery_address with the corrected FULL address and set deal_status to "address_received" to re-confirm.
@@ -78,16 +105,17 @@ You just confirmed the address with them and are waiting for them to say yes.
 """
 
 
-def _build_negotiation_rules(price: float, floor: float, flexibility: float) -> str:
-    """Build negotiation rules based on flexibility (0-1) and computed floor.
+def listing_pricing(listing) -> tuple[float, float, float]:
+    """Return (price, floor, flexibility) for a listing, with the defaults the prompts use."""
+    price = listing.price
+    # The real floor — never shown to the AI directly
+    floor = listing.min_price or price
+    flexibility = listing.willing_to_negotiate if listing.willing_to_negotiate is not None else 0.5
+    return price, floor, flexibility
 
-    The AI never sees min_price directly. Instead we give it concrete dollar
-    thresholds computed from the seller's flexibility preference.
 
-    flexibility=0   → firm, only accept at or very near asking price
-    flexibility=0.5 → normal haggling
-    flexibility=1   → very willing to drop price
-    """
+def negotiation_thresholds(price: float, floor: float, flexibility: float) -> tuple[int, int]:
+    """Return (visible_lowest, accept_threshold) in whole dollars."""
     # The "lowest you'd go" that the AI is told about is always above the true
     # floor so we never reveal the real min_price. We lerp between asking price
     # and the actual floor based on flexibility — high flexibility exposes a
@@ -98,6 +126,20 @@ def _build_negotiation_rules(price: float, floor: float, flexibility: float) ->
 
     # Offers within ~10% of asking are close enough to accept outright
     accept_threshold = round(price * 0.9)
+    return visible_lowest, accept_threshold
+
+
+def _build_negotiation_rules(price: float, floor: float, flexibility: float) -> str:
+    """Build negotiation rules based on flexibility (0-1) and computed floor.
+
+    The AI never sees min_price directly. Instead we give it concrete dollar
+    thresholds computed from the seller's flexibility preference.
+
+    flexibility=0   → firm, only accept at or very near asking price
+    flexibility=0.5 → normal haggling
+    flexibility=1   → very willing to drop price
+    """
+    visible_lowest, accept_threshold = negotiation_thresholds(price, floor, flexibility)
     near_asking_rule = (
         f"- Offers at or above ${accept_threshold:.0f} (within ~10% of asking) → accept, ask for delivery address.\n"
     )
@@ -162,6 +204,80 @@ def _build_negotiation_rules(price: float, floor: float, flexibility: float) ->
         )
 
 
+class PromptCache:
+    """LRU cache of compiled system prompt prefixes.
+
+    Keyed by (listing id, listing updated_at), so any edit to the listing
+    bumps updated_at and naturally misses. Only the static rules plus
+    listing context are cached; the addenda depend on conversation status
+    and per-conversation values and are filled in per call, so every
+    conversation on a listing shares one entry.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+
+    def get(self, key: tuple) -> str | None:
+        prompt = self._entries.get(key)
+        if prompt is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return prompt
+
+    def put(self, key: tuple, prompt: str) -> None:
+        self._entries[key] = prompt
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / (lookups or 1), 4),
+        }
+
+
+prompt_cache = PromptCache(settings.prompt_cache_size)
+
+
+def _compile_prompt_prefix(listing) -> str:
+    """Static rules plus the listing's context and price rules."""
+    price, floor, flexibility = listing_pricing(listing)
+    return SYSTEM_PROMPT_STATIC + LISTING_CONTEXT_TEMPLATE.format(
+        title=listing.title,
+        price=price,
+        description=listing.description,
+        seller_notes=listing.seller_notes or "None",
+        negotiation_rules=_build_negotiation_rules(price, floor, flexibility),
+    )
+
+
+def compiled_prompt_prefix(listing) -> str:
+    """Return the listing's compiled prompt prefix, from the cache when possible.
+
+    Listings without an id (not yet persisted) are compiled every time.
+    """
+    if listing.id is None:
+        return _compile_prompt_prefix(listing)
+    key = (listing.id, listing.updated_at)
+    prompt = prompt_cache.get(key)
+    if prompt is None:
+        prompt = _compile_prompt_prefix(listing)
+        prompt_cache.put(key, prompt)
+    return prompt
+
+
 def build_system_prompt(
     listing,
     conversation_status: str = "active",
@@ -173,36 +289,21 @@ def build_system_prompt(
     if not listing:
         return SYSTEM_PROMPT_NO_LISTING
 
-    price = listing.price
-    min_price = listing.min_price or price
-    flexibility = listing.willing_to_negotiate if listing.willing_to_negotiate is not None else 0.5
-
-    # The real floor — never shown to the AI directly
-    floor = min_price
+    prompt = compiled_prompt_prefix(listing)
+    price, floor, _ = listing_pricing(listing)
 
-    negotiation_rules = _build_negotiation_rules(price, floor, flexibility)
-
-    prompt = SYSTEM_PROMPT_TEMPLATE.format(
-        title=listing.title,
-        price=price,
-        description=listing.description,
-        seller_notes=listing.seller_notes or "None",
-        negotiation_rules=negotiation_rules,
-    )
-
-    if competing_offer is not None and competing_offer > min_price:
-        offer_str = f"{competing_offer:.0f}"
-        prompt += COMPETING_OFFER_ADDENDUM.replace("${competing_offer}", f"${offer_str}")
+    if competing_offer is not None and competing_offer > floor:
+        prompt += COMPETING_OFFER_ADDENDUM.format(competing_offer=f"{competing_offer:.0f}")
 
     if conversation_status == "pending":
         price_str = f"{agreed_price:.0f}" if agreed_price else str(price)
-        prompt += PENDING_ADDRESS_ADDENDUM.replace("${agreed_price}", f"${price_str}")
+        prompt += PENDING_ADDRESS_ADDENDUM.format(agreed_price=price_str)
 
     if conversation_status == "awaiting_confirm":
         price_str = f"{agreed_price:.0f}" if agreed_price else str(price)
-        addr_str = delivery_address or "unknown"
-        addendum = CONFIRM_ADDRESS_ADDENDUM.replace("${agreed_price}", f"${price_str}")
-        addendum = addendum.replace("${delivery_address}", addr_str)
-        prompt += addendum
+        prompt += CONFIRM_ADDRESS_ADDENDUM.format(
+            agreed_price=price_str,
+            delivery_address=delivery_address or "unknown",
+        )
 
     return prompt
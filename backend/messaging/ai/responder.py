@@ -1,15 +1,27 @@
-import json
 import logging
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Literal, Optional, get_args
 
-from .client import get_openai_client
-from .prompts import build_system_prompt
+from pydantic import BaseModel, Field, ValidationError
+
+from .client import RETRYABLE_ERRORS, CircuitOpenError, get_llm_gateway
+from .prompts import HISTORY_SUMMARY_PROMPT, build_system_prompt
 from .context import build_message_history
+from .router import route_stats, route_turn
+from .usage import usage_tracker
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+DealStatus = Literal[
+    "none", "agreed", "declined", "needs_review", "address_received", "address_confirmed"
+]
+
+
+# Sent when the LLM is unavailable; flags the conversation for the seller
+DEGRADED_REPLY = "lemme check on that and get back to you"
+
 
 @dataclass
 class AIResponse:
@@ -21,6 +33,67 @@ class AIResponse:
     buyer_offer: Optional[float] = None
 
 
+class ReplyOutput(BaseModel):
+    """What the model has to return; validated before anything is sent."""
+    message: str = Field(min_length=1)
+    deal_status: DealStatus
+    agreed_price: Optional[float]
+    delivery_address: Optional[str]
+    buyer_offer: Optional[float]
+
+
+# Strict JSON schema for the provider's structured output mode (mirrors ReplyOutput)
+REPLY_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "marketplace_reply",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "message": {"type": "string"},
+                "deal_status": {"type": "string", "enum": list(get_args(DealStatus))},
+                "agreed_price": {"type": ["number", "null"]},
+                "delivery_address": {"type": ["string", "null"]},
+                "buyer_offer": {"type": ["number", "null"]},
+            },
+            "required": [
+                "message", "deal_status", "agreed_price", "delivery_address", "buyer_offer"
+            ],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+@dataclass
+class ResponderStats:
+    """Counters for structured-output parsing, reported by the stats API."""
+    calls: int = 0
+    parse_failures: int = 0
+    retries: int = 0
+    repaired: int = 0
+    gave_up: int = 0
+    degraded: int = 0
+
+    def snapshot(self) -> dict:
+        calls = self.calls or 1
+        attempts = (self.calls + self.retries) or 1
+        return {
+            "calls": self.calls,
+            "parse_failures": self.parse_failures,
+            "retries": self.retries,
+            "repaired": self.repaired,
+            "gave_up": self.gave_up,
+            "degraded": self.degraded,
+            "parse_failure_rate": round(self.parse_failures / attempts, 4),
+            "retry_rate": round(self.retries / calls, 4),
+        }
+
+
+responder_stats = ResponderStats()
+
+
 async def generate_response(
     listing,
     messages: list,
@@ -29,9 +102,20 @@ async def generate_response(
     agreed_price: float | None = None,
     competing_offer: float | None = None,
     delivery_address: str | None = None,
+    conversation_id: int | None = None,
+    history_summary: str | None = None,
 ) -> AIResponse | None:
     """Generate an AI response for a conversation.
 
+    The model is asked for output matching REPLY_RESPONSE_FORMAT. If the
+    result still doesn't validate, the error is sent back for a repair,
+    at most settings.ai_repair_retries times. Raw text is never sent to
+    the buyer. The router (ai/router.py) picks the model; repairs always
+    use the full one. If the provider is unavailable the reply degrades to
+    DEGRADED_REPLY. That flags an active conversation "needs_review"; a
+    deal already in progress keeps its status (deal_status "none") so the
+    address and payment steps pick up where they left off.
+
     Args:
         listing: The Listing model instance (or None if unmatched).
         messages: List of Message model instances (full conversation history).
@@ -39,53 +123,125 @@ async def generate_response(
         new_buyer_messages: New buyer messages not yet responded to.
         agreed_price: The agreed-upon price if deal is in pending_address state.
         delivery_address: Saved delivery address for confirmation step.
+        conversation_id: Used to attribute token usage to the conversation.
+        history_summary: Summary of older messages not included in `messages`.
 
     Returns:
         AIResponse with message text and deal status, or None on failure.
     """
-    client = get_openai_client()
+    gateway = get_llm_gateway()
     system_prompt = build_system_prompt(
         listing, conversation_status, agreed_price, competing_offer, delivery_address
     )
-    chat_history = build_message_history(messages, new_buyer_messages)
+    chat_history = build_message_history(messages, new_buyer_messages, history_summary)
+    request_messages = [
+        {"role": "system", "content": system_prompt},
+        *chat_history,
+    ]
 
-    try:
-        response = await client.chat.completions.create(
-            model=settings.gpt_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *chat_history,
-            ],
-            temperature=0.7,
-            max_completion_tokens=256,
+    decision = route_turn(listing, conversation_status, new_buyer_messages, messages)
+    model = decision.model
+
+    responder_stats.calls += 1
+    for attempt in range(settings.ai_repair_retries + 1):
+        if attempt:
+            responder_stats.retries += 1
+            model = settings.gpt_model
+        started_at = time.monotonic()
+        try:
+            response = await gateway.chat(
+                model=model,
+                messages=request_messages,
+                temperature=0.7,
+                max_completion_tokens=256,
+                response_format=REPLY_RESPONSE_FORMAT,
+            )
+        except (CircuitOpenError, *RETRYABLE_ERRORS) as e:
+            logger.error(f"AI unavailable ({type(e).__name__}: {e}), sending degraded reply")
+            responder_stats.degraded += 1
+            deal_status = "needs_review" if conversation_status == "active" else "none"
+            return AIResponse(message=DEGRADED_REPLY, deal_status=deal_status)
+        except Exception as e:
+            logger.error(f"AI response error: {e}")
+            return None
+        latency_s = time.monotonic() - started_at
+        usage_tracker.record(conversation_id, response.usage, latency_s)
+        route_stats.record(decision.route, model, response.usage, latency_s)
+
+        choice = response.choices[0].message
+        raw = (choice.content or "").strip()
+        result, error = _parse_response(raw, refusal=getattr(choice, "refusal", None))
+        if result:
+            if attempt:
+                responder_stats.repaired += 1
+            return result
+
+        responder_stats.parse_failures += 1
+        logger.warning(
+            f"AI output failed validation (attempt {attempt + 1}): {error} | raw={raw[:100]}"
         )
+        request_messages = [
+            *request_messages,
+            {"role": "assistant", "content": raw},
+            {
+                "role": "user",
+                "content": (
+                    f"That reply was not valid: {error}. Send it again as a single "
+                    "JSON object matching the schema, nothing else."
+                ),
+            },
+        ]
+
+    responder_stats.gave_up += 1
+    logger.error("AI output still invalid after repair attempts, not replying")
+    return None
+
+
+async def summarize_history(
+    previous_summary: str | None,
+    messages: list,
+    conversation_id: int | None = None,
+) -> str | None:
+    """Fold older messages into the conversation's rolling summary.
 
-        raw = response.choices[0].message.content.strip()
-        return _parse_response(raw)
+    Returns the updated summary, or None on failure (the caller keeps the
+    old one).
+    """
+    transcript = "\n".join(
+        f"{'Buyer' if msg.role == 'buyer' else 'Seller'}: {msg.content}" for msg in messages
+    )
+    prompt = HISTORY_SUMMARY_PROMPT.format(
+        summary=previous_summary or "(none yet)", messages=transcript
+    )
 
+    started_at = time.monotonic()
+    try:
+        response = await get_llm_gateway().chat(
+            model=settings.gpt_model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            max_completion_tokens=200,
+        )
     except Exception as e:
-        logger.error(f"AI response error: {e}")
+        logger.error(f"History summary error: {e}")
         return None
+    usage_tracker.record(conversation_id, response.usage, time.monotonic() - started_at)
+
+    summary = (response.choices[0].message.content or "").strip()
+    return summary or None
 
 
-def _parse_response(raw: str) -> AIResponse:
-    """Parse the JSON response from GPT."""
+def _parse_response(raw: str, refusal: str | None = None) -> tuple[AIResponse | None, str | None]:
+    """Validate the model output. Returns (response, None) or (None, error)."""
+    if refusal:
+        return None, f"model refused: {refusal[:100]}"
+    if not raw:
+        return None, "empty output"
     try:
-        # Strip markdown code fences if present
-        if raw.startswith("```"):
-            raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
-            if raw.endswith("```"):
-                raw = raw[:-3]
-            raw = raw.strip()
-
-        data = json.loads(raw)
-        return AIResponse(
-            message=data.get("message", raw),
-            deal_status=data.get("deal_status", "none"),
-            agreed_price=data.get("agreed_price"),
-            delivery_address=data.get("delivery_address"),
-            buyer_offer=data.get("buyer_offer"),
+        output = ReplyOutput.model_validate_json(raw)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'output'}: {err['msg']}"
+            for err in e.errors()
         )
-    except (json.JSONDecodeError, KeyError):
-        logger.warning(f"Failed to parse AI JSON, using raw: {raw[:100]}")
-        return AIResponse(message=raw)
+    return AIResponse(**output.model_dump()), None
@@ -0,0 +1,151 @@
+import logging
+import re
+from dataclasses import dataclass, field
+
+from .usage import UsageTotals, usage_tokens
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ("address", "acknowledgement", "negotiation", "off_topic")
+
+ADDRESS_STATUSES = ("pending", "awaiting_confirm")
+
+ACK_PATTERN = re.compile(
+    r"^(?:ok(?:ay)?|k|kk|bet|cool|cool cool|sounds good|got it|gotcha|alright|aight|"
+    r"thanks|thank you|ty|thx|👍)[\s!.]*$"
+)
+
+# Anything that looks like haggling: a dollar amount or price talk
+PRICE_PATTERN = re.compile(r"\$\s*\d|\d+\s*(?:bucks|dollars)\b")
+NEGOTIATION_WORDS = re.compile(
+    r"\b(?:price|offer|lowest|lower|firm|negotiable|obo|cash|venmo|discount|deal|"
+    r"take|do\s+\d+|how\s+much|too\s+much|budget|cheaper)\b"
+)
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    model: str
+
+
+@dataclass
+class RouteStats:
+    """Per-route LLM usage, latency and estimated cost."""
+    by_route: dict[str, UsageTotals] = field(default_factory=dict)
+    cost_usd: dict[str, float] = field(default_factory=dict)
+    models: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def record(self, route: str, model: str, usage, latency_s: float) -> None:
+        prompt_tokens, cached_tokens, completion_tokens = usage_tokens(usage)
+        self.by_route.setdefault(route, UsageTotals()).add(
+            prompt_tokens, cached_tokens, completion_tokens, latency_s
+        )
+        self.cost_usd[route] = self.cost_usd.get(route, 0.0) + estimate_cost(
+            model, prompt_tokens, cached_tokens, completion_tokens
+        )
+        counts = self.models.setdefault(route, {})
+        counts[model] = counts.get(model, 0) + 1
+
+    def snapshot(self) -> dict:
+        return {
+            route: {
+                "calls": totals.calls,
+                "avg_latency_ms": round(totals.total_latency_s / (totals.calls or 1) * 1000),
+                "prompt_tokens": totals.prompt_tokens,
+                "completion_tokens": totals.completion_tokens,
+                "cost_usd": round(self.cost_usd.get(route, 0.0), 6),
+                "models": dict(self.models.get(route, {})),
+            }
+            for route, totals in self.by_route.items()
+        }
+
+
+route_stats = RouteStats()
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """Dollar cost of one call from settings.model_prices (0 for unknown models)."""
+    prices = settings.model_prices.get(model)
+    if not prices:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def classify_turn(
+    conversation_status: str,
+    new_buyer_messages: list[str] | None,
+    last_seller_message: str | None = None,
+    listing_title: str | None = None,
+) -> str:
+    """Classify a buyer turn from conversation status and message features.
+
+    "negotiation" is the safe default: anything with price talk, anything
+    in an active conversation that could be a reply to a price, and
+    questions about the item.
+    """
+    text = _normalize(" ".join(new_buyer_messages or []))
+    haggling = bool(PRICE_PATTERN.search(text) or NEGOTIATION_WORDS.search(text))
+
+    if conversation_status in ADDRESS_STATUSES:
+        # Street numbers and zip codes are expected here; only $-amounts
+        # and price words mean the buyer is reopening the price
+        return "negotiation" if haggling else "address"
+
+    if haggling or not text:
+        return "negotiation"
+
+    if ACK_PATTERN.match(text):
+        # "ok" right after a price or question may be the buyer accepting
+        if last_seller_message and re.search(r"[\d$?]", last_seller_message):
+            return "negotiation"
+        return "acknowledgement"
+
+    title_words = {w for w in re.findall(r"[a-z0-9]{3,}", (listing_title or "").lower())}
+    if "?" in text or re.search(r"\d", text) or title_words & set(re.findall(r"[a-z0-9]+", text)):
+        return "negotiation"
+    return "off_topic"
+
+
+def route_turn(
+    listing,
+    conversation_status: str,
+    new_buyer_messages: list[str] | None,
+    messages: list,
+) -> RouteDecision:
+    """Pick the model for a turn.
+
+    Easy routes (settings.small_model_routes) go to settings.gpt_model_small,
+    everything else to settings.gpt_model. settings.listing_model_overrides
+    pins a model for every turn about a listing.
+    """
+    last_seller_message = next(
+        (msg.content for msg in reversed(messages) if msg.role == "seller"), None
+    )
+    route = classify_turn(
+        conversation_status,
+        new_buyer_messages,
+        last_seller_message,
+        listing.title if listing else None,
+    )
+
+    override = settings.listing_model_overrides.get(listing.id) if listing else None
+    if override:
+        model = override
+    elif settings.model_routing_enabled and route in settings.small_model_routes:
+        model = settings.gpt_model_small
+    else:
+        model = settings.gpt_model
+
+    logger.debug(f"[route_turn] status={conversation_status} route={route} model={model}")
+    return RouteDecision(route=route, model=model)
@@ -0,0 +1,129 @@
+"""Local OpenAI-compatible chat completions stub for offline benchmarks.
+
+Serves POST /v1/chat/completions with canned replies after a configurable
+delay and reports usage the way the real API does, including cached prompt
+tokens: the longest prefix shared with an earlier request counts as cached
+once it reaches 1024 tokens, in 128-token steps. That makes prompt layout
+changes visible in the numbers.
+
+Run standalone:
+    uv run uvicorn messaging.ai.stub_server:app --port 8099
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+
+from .context import estimate_tokens
+
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 800.0
+    jitter_ms: float = 200.0
+    # Fraction of replies that are deliberately not valid JSON
+    invalid_rate: float = 0.0
+    seed: int | None = None
+    # Canned replies; picked by keywords in the latest user message
+    replies: list[dict] = field(default_factory=lambda: [
+        {"match": ["available"], "message": "yea its still available", "deal_status": "none"},
+        {"match": ["address", "ship to", "deliver to"], "message": "aight bet so deliver to that address?", "deal_status": "none"},
+        {"match": ["deal", "works for me", "sounds good"], "message": "bet whats your address", "deal_status": "agreed"},
+        {"match": ["$", "take", "do "], "message": "lowest i can do is a bit higher lmk", "deal_status": "none"},
+        {"match": [], "message": "for sure lmk if you have any questions", "deal_status": "none"},
+    ])
+
+
+config = StubConfig()
+_rng = random.Random(config.seed)
+_seen_prompts: list[str] = []
+
+app = FastAPI(title="LLM stub")
+
+
+def _cached_tokens(prompt: str) -> int:
+    """Tokens of the longest prefix shared with an earlier prompt, as the provider would cache."""
+    best = 0
+    for earlier in _seen_prompts:
+        limit = min(len(earlier), len(prompt))
+        i = 0
+        while i < limit and earlier[i] == prompt[i]:
+            i += 1
+        best = max(best, i)
+    _seen_prompts.append(prompt)
+    tokens = estimate_tokens(prompt[:best])
+    if tokens < CACHE_MIN_TOKENS:
+        return 0
+    return tokens // CACHE_BLOCK_TOKENS * CACHE_BLOCK_TOKENS
+
+
+def _pick_reply(messages: list[dict]) -> dict:
+    last_user = next(
+        (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), ""
+    ).lower()
+    for reply in config.replies:
+        if not reply["match"] or any(k in last_user for k in reply["match"]):
+            return reply
+    return config.replies[-1]
+
+
+def reset(new_config: StubConfig | None = None) -> None:
+    """Swap in a new config and forget earlier prompts (cache)."""
+    global config, _rng
+    if new_config is not None:
+        config = new_config
+    _rng = random.Random(config.seed)
+    _seen_prompts.clear()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt = "\n".join(f"{m.get('role')}: {m.get('content') or ''}" for m in messages)
+
+    delay = max(0.0, config.latency_ms + _rng.uniform(-config.jitter_ms, config.jitter_ms))
+    await asyncio.sleep(delay / 1000)
+
+    if body.get("response_format", {}).get("type") == "json_schema":
+        if _rng.random() < config.invalid_rate:
+            content = "sure thing! {message: oops"
+        else:
+            reply = _pick_reply(messages)
+            content = json.dumps({
+                "message": reply["message"],
+                "deal_status": reply["deal_status"],
+                "agreed_price": None,
+                "delivery_address": None,
+                "buyer_offer": None,
+            })
+    else:
+        content = "Buyer and seller are negotiating; no deal yet."
+
+    prompt_tokens = estimate_tokens(prompt)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content, "refusal": None},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": _cached_tokens(prompt)},
+        },
+    }
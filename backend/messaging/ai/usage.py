@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ..config import settings
+
+
+@dataclass
+class UsageTotals:
+    """Token usage and latency summed over a set of LLM calls."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency_s: float = 0.0
+    # Estimated history tokens without summarization vs actually sent
+    history_tokens_full: int = 0
+    history_tokens_sent: int = 0
+
+    def add(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int, latency_s: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+        self.total_latency_s += latency_s
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hit_rate": round(self.cached_tokens / (self.prompt_tokens or 1), 4),
+            "avg_latency_ms": round(self.total_latency_s / (self.calls or 1) * 1000),
+            "history_tokens_full": self.history_tokens_full,
+            "history_tokens_sent": self.history_tokens_sent,
+            "history_tokens_saved": self.history_tokens_full - self.history_tokens_sent,
+        }
+
+
+def usage_tokens(usage) -> tuple[int, int, int]:
+    """(prompt, cached, completion) tokens from an OpenAI usage object (may be None)."""
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    return prompt_tokens, cached_tokens, completion_tokens
+
+
+class UsageTracker:
+    """Per-call LLM usage, kept overall and per conversation.
+
+    Only the max_conversations most recently active conversations keep
+    their own totals; the overall totals count every call.
+    """
+
+    def __init__(self, max_conversations: int):
+        self.totals = UsageTotals()
+        self.max_conversations = max_conversations
+        self.by_conversation: OrderedDict[int, UsageTotals] = OrderedDict()
+
+    def _conversation(self, conversation_id: int) -> UsageTotals:
+        totals = self.by_conversation.get(conversation_id)
+        if totals is None:
+            totals = self.by_conversation[conversation_id] = UsageTotals()
+        self.by_conversation.move_to_end(conversation_id)
+        while len(self.by_conversation) > self.max_conversations:
+            self.by_conversation.popitem(last=False)
+        return totals
+
+    def record(self, conversation_id: int | None, usage, latency_s: float) -> None:
+        """Record one completion. `usage` is the OpenAI response usage object (may be None)."""
+        prompt_tokens, cached_tokens, completion_tokens = usage_tokens(usage)
+        self.totals.add(prompt_tokens, cached_tokens, completion_tokens, latency_s)
+        if conversation_id is not None:
+            self._conversation(conversation_id).add(
+                prompt_tokens, cached_tokens, completion_tokens, latency_s
+            )
+
+    def record_history(self, conversation_id: int | None, full_tokens: int, sent_tokens: int) -> None:
+        """Record how many history tokens the budget saved on one reply."""
+        targets = [self.totals]
+        if conversation_id is not None:
+            targets.append(self._conversation(conversation_id))
+        for totals in targets:
+            totals.history_tokens_full += full_tokens
+            totals.history_tokens_sent += sent_tokens
+
+    def avg_latency_s(self) -> float:
+        """Average completion latency so far (0 before the first call)."""
+        return self.totals.total_latency_s / self.totals.calls if self.totals.calls else 0.0
+
+    def snapshot(self) -> dict:
+        return self.totals.snapshot()
+
+    def conversation_snapshot(self) -> dict[int, dict]:
+        return {cid: totals.snapshot() for cid, totals in self.by_conversation.items()}
+
+
+usage_tracker = UsageTracker(settings.usage_conversations_max)
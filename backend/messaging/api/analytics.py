@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.connection import get_session
+from ..services.analytics import get_hourly
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("")
+async def get_analytics(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    session: AsyncSession = Depends(get_session),
+):
+    """Reply latency, deal funnel and posting durations from the hourly rollups."""
+    return await get_hourly(session, hours)
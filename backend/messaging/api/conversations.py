@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import get_session
@@ -9,7 +9,10 @@ from ..schemas import (
     MessageResponse,
     MessageCreate,
 )
+from ..services.context_cache import context_cache
+from ..services.event_broadcaster import event_broadcaster
 from ..services.conversation_service import ConversationService
+from ..services.payment_service import PaymentService
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
@@ -29,12 +32,25 @@ async def list_conversations(
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    before: str | None = None,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get conversation detail with messages."""
-    conversation = await ConversationService.get_by_id(session, conversation_id)
+    """Get conversation detail with its latest messages.
+
+    Older messages are paged with the `before` cursor from the X-Next-Cursor header.
+    """
+    try:
+        conversation, next_cursor = await ConversationService.get_detail(
+            session, conversation_id, limit=limit, before=before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return conversation
 
 
@@ -46,7 +62,7 @@ async def get_messages(
     session: AsyncSession = Depends(get_session),
 ):
     """Get paginated messages for a conversation."""
-    conversation = await ConversationService.get_by_id(session, conversation_id)
+    conversation = await ConversationService.get_light(session, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -62,7 +78,7 @@ async def send_message(
     session: AsyncSession = Depends(get_session),
 ):
     """Manually send a message in a conversation."""
-    conversation = await ConversationService.get_by_id(session, conversation_id)
+    conversation = await ConversationService.get_light(session, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -73,6 +89,7 @@ async def send_message(
         content=message_data.content,
         delivered=False,
     )
+    context_cache.invalidate_conversation(conversation_id)
     return message
 
 
@@ -83,15 +100,20 @@ async def update_conversation(
     session: AsyncSession = Depends(get_session),
 ):
     """Update conversation status or match to a listing."""
-    conversation = await ConversationService.get_by_id(session, conversation_id)
+    conversation = await ConversationService.get_light(session, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
+    previous_status = conversation.status
     if update_data.status:
         conversation.status = update_data.status
     if update_data.listing_id is not None:
         conversation.listing_id = update_data.listing_id
 
     await session.commit()
-    await session.refresh(conversation)
+    context_cache.invalidate_conversation(conversation_id)
+    event_broadcaster.publish_status(
+        conversation.id, conversation.listing_id, previous_status, conversation.status
+    )
+    PaymentService.on_status_change(conversation.id, conversation.status)
     return conversation
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..services.event_broadcaster import event_broadcaster
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+RECONNECT_DELAY_MS = 3000  # sent to EventSource as its retry interval
+
+
+@router.get("")
+async def stream_events(conversation_id: int | None = None, listing_id: int | None = None):
+    """Server-sent events for new messages and conversation status changes.
+
+    Events are "message" and "status", optionally filtered to one
+    conversation or listing. A client that falls behind gets an "overflow"
+    event and the stream ends; it should refetch and reconnect.
+    """
+    subscriber = event_broadcaster.subscribe(conversation_id=conversation_id, listing_id=listing_id)
+
+    async def stream():
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.sse_keepalive)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            event_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,13 +1,19 @@
+import hashlib
+import json
 import logging
 
 import stripe
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import get_session
 from ..config import settings
-from ..schemas.payment import TransactionResponse, TrackingUpload, CheckoutResponse
+from ..schemas.payment import (
+    TransactionResponse, TransactionListItem, TransactionTotals, TrackingUpload, CheckoutResponse,
+)
 from ..services.payment_service import PaymentService
+from ..services.payment_worker import payment_worker
+from ..services.webhook_consumer import webhook_consumer
 
 logger = logging.getLogger(__name__)
 
@@ -24,36 +30,58 @@ async def create_checkout(conversation_id: int, db: AsyncSession = Depends(get_s
 
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
+    """Verify and store the event, then acknowledge; the webhook consumer applies it."""
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
 
     webhook_secret = settings.stripe_webhook_secret
     if webhook_secret and sig_header:
         try:
-            event = stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
+            stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
         except (ValueError, stripe.SignatureVerificationError) as e:
             logger.error(f"Webhook signature verification failed: {e}")
             raise HTTPException(status_code=400, detail="Invalid signature")
-    else:
-        import json
-        event = json.loads(payload)
-
-    event_type = event.get("type") if isinstance(event, dict) else event.type
-
-    if event_type == "checkout.session.completed":
-        session_data = event.get("data", {}).get("object", {}) if isinstance(event, dict) else event.data.object
-        stripe_session_id = session_data.get("id") if isinstance(session_data, dict) else session_data.id
-
-        from database.connection import async_session
-        async with async_session() as db:
-            await PaymentService.handle_checkout_complete(db, stripe_session_id)
 
-    return {"status": "ok"}
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid payload")
+
+    # Unsigned local test events may lack an id; dedup those by content
+    event_id = event.get("id") or f"local_{hashlib.sha256(payload).hexdigest()[:32]}"
+    stored = await webhook_consumer.enqueue(event_id, event.get("type", ""), payload.decode())
+    return {"status": "ok" if stored else "duplicate"}
+
+
+@router.get(
+    "/transactions",
+    response_model=list[TransactionListItem],
+    response_model_exclude_unset=True,
+)
+async def list_transactions(
+    response: Response,
+    status: list[str] | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    expand: bool = False,
+    db: AsyncSession = Depends(get_session),
+):
+    """Newest transactions first. The next page's cursor is in the X-Next-Cursor header."""
+    try:
+        rows, next_cursor = await PaymentService.list_page(
+            db, statuses=status, limit=limit, cursor=cursor, expand=expand
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
-@router.get("/transactions", response_model=list[TransactionResponse])
-async def list_transactions(db: AsyncSession = Depends(get_session)):
-    return await PaymentService.get_all(db)
+@router.get("/transactions/totals", response_model=TransactionTotals)
+async def transaction_totals(db: AsyncSession = Depends(get_session)):
+    """Count and amount per status across all transactions, for earnings totals."""
+    return TransactionTotals(by_status=await PaymentService.totals_by_status(db))
 
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
@@ -73,4 +101,5 @@ async def add_tracking(
     txn = await PaymentService.add_tracking(db, transaction_id, body.tracking_number)
     if not txn:
         raise HTTPException(status_code=400, detail="Could not add tracking number")
+    payment_worker.schedule_delivery(txn)
     return txn
@@ -32,6 +32,7 @@ async def polling_status():
         cycle_count=monitor.cycle_count,
         last_poll_at=monitor.last_poll_at,
         errors=list(monitor.recent_errors),
+        pipeline=monitor.pipeline_metrics(),
     )
 
 
@@ -1,34 +1,68 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import get_session
-from ..models.conversation import Conversation
-from ..models.message import Message
-from ..models.buyer import Buyer
+from ..ai.client import get_llm_gateway
+from ..ai.fast_path import fast_path_stats
+from ..ai.prompts import prompt_cache
+from ..ai.responder import responder_stats
+from ..ai.router import route_stats
+from ..ai.usage import usage_tracker
+from ..services.event_broadcaster import event_broadcaster
+from ..services.payment_status import payment_status_tracker
+from ..services.payment_worker import payment_worker
+from ..services.stats_counters import read_counters
+from ..services.stripe_client import stripe_stats
+from ..services.webhook_consumer import webhook_consumer
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
 
 @router.get("")
 async def get_stats(session: AsyncSession = Depends(get_session)):
-    """Get dashboard stats."""
-    total_conversations = await session.scalar(
-        select(func.count(Conversation.id))
-    )
-    active_conversations = await session.scalar(
-        select(func.count(Conversation.id)).where(Conversation.status == "active")
-    )
-    sold_conversations = await session.scalar(
-        select(func.count(Conversation.id)).where(Conversation.status == "sold")
-    )
-    total_messages = await session.scalar(select(func.count(Message.id)))
-    total_buyers = await session.scalar(select(func.count(Buyer.id)))
+    """Get dashboard stats.
 
+    Counts come from the trigger-maintained stats_counters table, so this
+    is one small query however large the tables grow.
+    """
+    counters = await read_counters(session)
+
+    return {
+        "total_conversations": counters.get("conversations", 0),
+        "active_conversations": counters.get("conversations:active", 0),
+        "sold_conversations": counters.get("conversations:sold", 0),
+        "total_messages": counters.get("messages", 0),
+        "total_buyers": counters.get("buyers", 0),
+        "ai": responder_stats.snapshot(),
+        "ai_usage": usage_tracker.snapshot(),
+        "fast_path": fast_path_stats.snapshot(),
+        "prompt_cache": prompt_cache.snapshot(),
+        "event_streams": event_broadcaster.snapshot(),
+    }
+
+
+@router.get("/ai-usage")
+async def get_ai_usage():
+    """LLM token usage and latency, overall, per model route and per conversation."""
+    return {
+        "total": usage_tracker.snapshot(),
+        "routes": route_stats.snapshot(),
+        "conversations": usage_tracker.conversation_snapshot(),
+    }
+
+
+@router.get("/llm")
+async def get_llm_stats():
+    """LLM gateway state: circuit breaker, counters and per-model latency histograms."""
+    return get_llm_gateway().snapshot()
+
+
+@router.get("/stripe")
+async def get_stripe_stats():
+    """Stripe API latency per operation, webhook inbox, payment polling and payment timers."""
     return {
-        "total_conversations": total_conversations or 0,
-        "active_conversations": active_conversations or 0,
-        "sold_conversations": sold_conversations or 0,
-        "total_messages": total_messages or 0,
-        "total_buyers": total_buyers or 0,
+        "operations": stripe_stats.snapshot(),
+        "webhooks": webhook_consumer.snapshot(),
+        "payment_polling": payment_status_tracker.snapshot(),
+        "payment_worker": payment_worker.snapshot(),
     }
@@ -5,6 +5,7 @@ import random
 logger = logging.getLogger(__name__)
 
 MARKETPLACE_INBOX_URL = "https://www.facebook.com/marketplace/inbox"
+MARKETPLACE_THREAD_URL = "https://www.facebook.com/marketplace/t/{thread_id}/"
 
 
 async def navigate_to_marketplace(session) -> bool:
@@ -56,6 +57,22 @@ async def click_conversation(session, buyer_name: str) -> bool:
         return False
 
 
+async def open_thread(session, thread_id: str) -> bool:
+    """Navigate straight to a conversation thread by its Marketplace thread id.
+
+    Replaces the LLM-driven row click for conversations we have seen before.
+    The thread opens as a full page, so there are no popups to close.
+    """
+    try:
+        logger.info(f"[open_thread] Navigating to thread {thread_id}")
+        await session.navigate(url=MARKETPLACE_THREAD_URL.format(thread_id=thread_id))
+        await asyncio.sleep(1)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to open thread {thread_id}: {e}")
+        return False
+
+
 async def close_all_popups(session) -> None:
     """Close any popups or overlays that may have appeared on screen."""
     try:
@@ -1,4 +1,5 @@
 import logging
+import re
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,16 @@ def _is_fb_ui_text(content: str) -> bool:
     return any(p in lower for p in FB_UI_PATTERNS)
 
 
+# Marketplace thread links look like /marketplace/t/<id>/ or /messages/t/<id>/
+THREAD_ID_PATTERN = re.compile(r"/t/(\d+)")
+
+
+def _parse_thread_id(url: str) -> str:
+    """Pull the numeric thread id out of a conversation link, or "" if absent."""
+    match = THREAD_ID_PATTERN.search(url or "")
+    return match.group(1) if match else ""
+
+
 def _normalize_name(name: str) -> str:
     """Normalize a name for consistent DB matching.
 
@@ -41,6 +52,7 @@ class ConversationPreview:
     listing_title: str = ""
     preview_text: str = ""
     is_unread: bool = False  # whether the conversation row appears unread (bold/blue dot)
+    thread_id: str = ""      # numeric id from the row's thread link, if readable
 
 
 @dataclass
@@ -82,7 +94,8 @@ async def extract_conversation_list(session, max_retries: int = 2) -> list[Conve
                     "listing title, and preview text character-for-character. Do NOT guess "
                     "or use placeholder names. If you cannot clearly read a row, skip it. "
                     "Mark is_unread as true if the name appears bold or there is an unread "
-                    "indicator. Default is_unread to true if uncertain."
+                    "indicator. Default is_unread to true if uncertain. Set thread_url to "
+                    "the link the row points to (it contains /t/ followed by a number)."
                 ),
                 schema={
                     "type": "object",
@@ -96,6 +109,7 @@ async def extract_conversation_list(session, max_retries: int = 2) -> list[Conve
                                     "listing_title": {"type": "string"},
                                     "preview_text": {"type": "string"},
                                     "is_unread": {"type": "boolean"},
+                                    "thread_url": {"type": "string", "format": "uri"},
                                 },
                             },
                         }
@@ -124,6 +138,7 @@ async def extract_conversation_list(session, max_retries: int = 2) -> list[Conve
                     listing_title=c.get("listing_title", ""),
                     preview_text=c.get("preview_text", ""),
                     is_unread=c.get("is_unread", True),
+                    thread_id=_parse_thread_id(c.get("thread_url", "")),
                 )
                 for c in conversations_raw
             ]
@@ -131,7 +146,8 @@ async def extract_conversation_list(session, max_retries: int = 2) -> list[Conve
                 logger.info(
                     f"[extract_conversation_list] Conversation: name='{c.display_name}' "
                     f"(normalized='{c.buyer_name}'), listing='{c.listing_title}', "
-                    f"preview='{c.preview_text[:60]}', unread={c.is_unread}"
+                    f"preview='{c.preview_text[:60]}', unread={c.is_unread}, "
+                    f"thread_id='{c.thread_id}'"
                 )
             logger.info(f"[extract_conversation_list] Total: {len(convos)} conversations")
             return convos
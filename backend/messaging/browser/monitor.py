@@ -1,7 +1,9 @@
 import asyncio
 import logging
 import random
+import time
 from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
 
 from sqlalchemy import select
@@ -11,17 +13,30 @@ from ..models.transaction import Transaction
 from ..services.buyer_service import BuyerService
 from ..services.conversation_service import ConversationService
 from ..services.matching_service import MatchingService
+from ..services.context_cache import context_cache
+from ..services.payment_service import PaymentService
+from ..services.payment_status import payment_status_tracker
+from ..services.message_dedup import (
+    ANCHOR_SIZE, align_new_messages, find_new_messages, known_message,
+)
+from ..services.unit_of_work import ConversationUnitOfWork
 from ..config import settings
 from .client import get_stagehand_session, close_session, reset_session
+from .pipeline import ReplyPipeline
+from .tabs import TabPool
 from .extractor import extract_conversation_list, extract_chat_messages
 from .actions import (
     navigate_to_marketplace,
     refresh_inbox,
     click_conversation,
+    open_thread,
     close_all_popups,
     send_message as browser_send_message,
 )
-from ..ai.responder import generate_response
+from ..ai.fast_path import classify_fast_reply, fast_path_stats
+from ..ai.context import estimate_tokens, history_tokens, split_history
+from ..ai.responder import AIResponse, generate_response, summarize_history
+from ..ai.usage import usage_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +48,27 @@ IDLE_REFRESH_MAX = 11
 ACTIVE_REFRESH_MIN = 3
 ACTIVE_REFRESH_MAX = 5
 
+# A buyer who keeps typing is answered anyway after this many quiet periods
+DEBOUNCE_MAX_PERIODS = 3
+
+
+@dataclass
+class ReplyJob:
+    """A conversation that needs an AI reply, carried from prepare to deliver."""
+    db: object
+    uow: ConversationUnitOfWork
+    buyer_name: str
+    conversation: object
+    listing: object
+    history: list
+    new_buyer_messages: list[str]
+    competing_offer: float | None = None
+    ai_result: AIResponse | None = None
+    # Only used by the reply pipeline to reopen the conversation for sending
+    display_name: str = ""
+    thread_id: str | None = None
+    listing_key: str = ""
+
 
 class MessageMonitor:
     """Main polling loop for monitoring Marketplace conversations."""
@@ -45,17 +81,41 @@ class MessageMonitor:
         self._task: asyncio.Task | None = None
         self._on_inbox = False
         self._consecutive_idle = 0  # refresh page after 3 idle cycles
-        # Track last seen inbox preview per buyer to detect new activity
+        # Track last seen inbox preview per (buyer, listing) to detect new activity
         # Compare current preview to stored: same → skip, different → open & check
-        self._last_seen_preview: dict[str, str] = {}
+        self._last_seen_preview: dict[tuple[str, str], str] = {}
         # Buyers with confirmed deals awaiting payment — always re-check these
         self._awaiting_payment: set[str] = set()
+        # Debounce per buyer: (preview seen, first seen at, answer after)
+        self._debounce: dict[str, tuple[str, float, float]] = {}
+        # Known Marketplace thread id per (buyer, listing) so we can navigate
+        # straight to the thread instead of clicking the inbox row. A buyer
+        # has a separate thread for each listing. None = don't use it.
+        self._thread_ids: dict[tuple[str, str], str | None] = {}
+        # Extra tabs for handling conversations concurrently (monitor_tabs > 1)
+        self._tabs: TabPool | None = None
+        # Conversations on the same listing interact (competing offers,
+        # closing other buyers on agreement), so they never run concurrently
+        self._listing_locks: dict[str, asyncio.Lock] = {}
+        # Staged reply pipeline (monitor_pipeline) and the lock that lets its
+        # send stage share the main page with the extract stage
+        self._pipeline: ReplyPipeline | None = None
+        self._browser_lock = asyncio.Lock()
+        # Buyers with a reply still in the pipeline; not reopened until it is sent
+        self._queued_buyers: set[str] = set()
 
     async def start(self):
         """Start the monitoring loop."""
         if self.running:
             return
         self.running = True
+        if settings.monitor_pipeline:
+            self._pipeline = ReplyPipeline(
+                generate=self._generate_reply,
+                send=self._send_queued,
+                finish=self._finish_queued,
+            )
+            self._pipeline.start()
         self._task = asyncio.create_task(self._run())
         logger.info("Message monitor started")
 
@@ -68,6 +128,10 @@ class MessageMonitor:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        if self._pipeline:
+            await self._pipeline.stop()
+            self._pipeline = None
+        await self._close_tabs()
         await close_session()
         logger.info("Message monitor stopped")
 
@@ -103,13 +167,13 @@ class MessageMonitor:
                     )
                     logger.info(f"Session break: sleeping {break_time:.0f}s")
                     await asyncio.sleep(break_time)
-                elif result == "responded":
+                elif result in ("responded", "waiting"):
                     interval = random.uniform(ACTIVE_REFRESH_MIN, ACTIVE_REFRESH_MAX)
-                    await asyncio.sleep(interval)
+                    await self._pause(interval)
                 else:
                     # Idle — wait longer before refreshing
                     interval = random.uniform(IDLE_REFRESH_MIN, IDLE_REFRESH_MAX)
-                    await asyncio.sleep(interval)
+                    await self._pause(interval)
 
             except asyncio.CancelledError:
                 raise
@@ -121,10 +185,18 @@ class MessageMonitor:
 
                 if "410" in str(e) or "Gone" in str(e):
                     logger.warning("Session expired (410 Gone), resetting...")
+                    await self._close_tabs()
                     await reset_session()
 
                 await asyncio.sleep(10)
 
+    async def _pause(self, interval: float) -> None:
+        """Sleep between cycles; queued replies finish sending in the meantime."""
+        if self._pipeline:
+            await asyncio.gather(asyncio.sleep(interval), self._pipeline.wait_idle())
+        else:
+            await asyncio.sleep(interval)
+
     async def _poll_cycle(self) -> str:
         """Single poll cycle: extract inbox, process unread conversations bottom-to-top.
 
@@ -136,6 +208,7 @@ class MessageMonitor:
             "deal_completed" - item sold, session closed
             "empty" - no conversations found
             "responded" - at least one conversation got a response
+            "waiting" - new messages are waiting out their debounce period
             "idle" - conversations exist but none are unread
         """
         session = await get_stagehand_session()
@@ -158,10 +231,13 @@ class MessageMonitor:
         # Exception: always re-check buyers awaiting payment
         unread = []
         for c in conversations:
+            if c.buyer_name in self._queued_buyers:
+                logger.info(f"Skipping {c.buyer_name} (reply in the pipeline)")
+                continue
             if c.buyer_name in self._awaiting_payment:
                 unread.append(c)
                 continue
-            last_preview = self._last_seen_preview.get(c.buyer_name)
+            last_preview = self._last_seen_preview.get(self._conversation_key(c))
             if last_preview and c.preview_text == last_preview:
                 logger.info(f"Skipping {c.buyer_name} (preview unchanged)")
                 continue
@@ -171,12 +247,26 @@ class MessageMonitor:
         # Process bottom-to-top (most neglected first)
         unread.reverse()
 
+        # Let bursts of buyer messages settle so they're answered in one turn.
+        # A buyer no longer unread (answered by hand, closed, scrolled away)
+        # has nothing to wait for, so the map stays as small as the inbox.
+        unread_buyers = {c.buyer_name for c in unread}
+        for buyer_name in [name for name in self._debounce if name not in unread_buyers]:
+            del self._debounce[buyer_name]
+        waiting = [c for c in unread if not self._quiet_long_enough(c)]
+        unread = [c for c in unread if c not in waiting]
+
         logger.info(
             f"Inbox: {len(conversations)} total, {len(unread)} unread "
-            f"(processing bottom-to-top)"
+            f"(processing bottom-to-top), {len(waiting)} waiting for the buyer to finish"
         )
 
         if not unread:
+            finished = await self._finish_cycle([])
+            if finished:
+                return finished
+            if waiting:
+                return "waiting"
             self._consecutive_idle += 1
             if self._consecutive_idle >= 3:
                 logger.info("3 idle cycles, refreshing page")
@@ -185,45 +275,181 @@ class MessageMonitor:
             return "idle"
 
         self._consecutive_idle = 0
-        any_responded = False
 
         # Collect all buyer names so we can filter cross-talk from sidebar
         all_buyer_names = {c.buyer_name for c in conversations}
 
-        for conv_preview in unread:
-            try:
+        # Conversations with a known thread id can be opened in their own tab;
+        # the rest need a row click on the inbox page, one at a time
+        if settings.monitor_tabs > 1:
+            direct = [c for c in unread if await self._resolve_thread_id(c)]
+        else:
+            direct = []
+        clicked = [c for c in unread if c not in direct]
+
+        results = []
+        for conv_preview in clicked:
+            result = await self._run_conversation(session, conv_preview, all_buyer_names)
+            results.append(result)
+            if result == "sold":
+                break
+
+        if direct and "sold" not in results:
+            results += await self._run_concurrently(session, direct, all_buyer_names)
+
+        return await self._finish_cycle(results) or "idle"
+
+    async def _finish_cycle(self, results: list[str | None]) -> str | None:
+        """Fold in pipeline replies finished so far and decide the cycle's result.
+
+        Queued replies aren't waited for, so generation and sending keep
+        overlapping with the next cycle's extraction. Returns None if
+        nothing happened.
+        """
+        if self._pipeline:
+            results = results + self._pipeline.collect()
+
+        if "sold" in results:
+            logger.info("Item sold, closing Browserbase session")
+            await self._close_tabs()
+            await close_session()
+            self._on_inbox = False
+            return "deal_completed"
+        if "responded" in results:
+            return "responded"
+        if self._pipeline and self._pipeline.outstanding:
+            return "waiting"
+        return None
+
+    def _quiet_long_enough(self, conv_preview) -> bool:
+        """Debounce new buyer activity without blocking other conversations.
+
+        A conversation is only answered once its preview has stayed the same
+        for a random response_delay_min..max seconds, so two or three quick
+        messages get one reply. The wait restarts whenever the preview
+        changes, up to DEBOUNCE_MAX_PERIODS * response_delay_max in total.
+        Buyers awaiting payment are never held back.
+        """
+        buyer_name = conv_preview.buyer_name
+        if settings.response_delay_max <= 0 or buyer_name in self._awaiting_payment:
+            return True
+
+        now = time.monotonic()
+        state = self._debounce.get(buyer_name)
+        if state is None or state[0] != conv_preview.preview_text:
+            first_seen = state[1] if state else now
+            delay = random.uniform(settings.response_delay_min, settings.response_delay_max)
+            state = (conv_preview.preview_text, first_seen, now + delay)
+            self._debounce[buyer_name] = state
+
+        _, first_seen, answer_after = state
+        if now >= answer_after or now - first_seen >= DEBOUNCE_MAX_PERIODS * settings.response_delay_max:
+            del self._debounce[buyer_name]
+            return True
+        return False
+
+    async def _run_conversation(
+        self, browser_session, conv_preview, all_buyer_names: set[str], in_tab: bool = False
+    ) -> str | None:
+        """Handle one conversation and record that its preview was processed."""
+        lock = self._listing_locks.setdefault(self._listing_key(conv_preview), asyncio.Lock())
+        await lock.acquire()
+        result = None
+        try:
+            if self._pipeline and not in_tab:
+                # Replies that are ready go out before the next conversation is opened
+                await self._pipeline.wait_for_sends()
+                started_at = time.monotonic()
+                async with self._browser_lock:
+                    result = await self._handle_conversation(
+                        browser_session, conv_preview, all_buyer_names
+                    )
+                self._pipeline.record_extract(time.monotonic() - started_at)
+            else:
                 result = await self._handle_conversation(
-                    session, conv_preview, all_buyer_names
+                    browser_session, conv_preview, all_buyer_names, in_tab=in_tab
                 )
-                # Only cache preview if we actually processed the conversation.
-                # If result is None due to buyer mismatch (wrong chat opened),
-                # don't cache — so we retry next cycle.
-                if result is not None:
-                    self._last_seen_preview[conv_preview.buyer_name] = conv_preview.preview_text
-                if result == "sold":
-                    self._awaiting_payment.discard(conv_preview.buyer_name)
-                    logger.info("Item sold, closing Browserbase session")
-                    await close_session()
-                    self._on_inbox = False
-                    return "deal_completed"
-                elif result == "responded":
-                    any_responded = True
+            # Only cache preview if we actually processed the conversation.
+            # If result is None due to buyer mismatch (wrong chat opened),
+            # don't cache — so we retry next cycle. After a reply the preview
+            # changes anyway; caching the old one would hide a buyer who
+            # repeats the same text ("ok" ... "ok").
+            if result in ("responded", "queued"):
+                self._last_seen_preview.pop(self._conversation_key(conv_preview), None)
+            elif result is not None:
+                self._last_seen_preview[self._conversation_key(conv_preview)] = conv_preview.preview_text
+            if result == "sold":
+                self._awaiting_payment.discard(conv_preview.buyer_name)
+            return result
+        except Exception as e:
+            error_msg = f"Error handling {conv_preview.buyer_name}: {e}"
+            logger.error(error_msg)
+            self.recent_errors.append(error_msg)
+            return None
+        finally:
+            # A queued reply keeps its listing locked until it has been sent
+            if result != "queued":
+                lock.release()
+
+    @staticmethod
+    def _listing_key(conv_preview) -> str:
+        return conv_preview.listing_title.lower().strip()
+
+    @classmethod
+    def _conversation_key(cls, conv_preview) -> tuple[str, str]:
+        """A buyer's inbox row for one listing; the same buyer can have several."""
+        return conv_preview.buyer_name, cls._listing_key(conv_preview)
+
+    async def _run_concurrently(
+        self, session, previews: list, all_buyer_names: set[str]
+    ) -> list[str | None]:
+        """Handle conversations in parallel, one per tab, up to monitor_tabs at once."""
+        if self._tabs is None or not self._tabs.belongs_to(session):
+            await self._close_tabs()
+            tabs = TabPool(settings.monitor_tabs)
+            try:
+                await tabs.open(session)
             except Exception as e:
-                error_msg = f"Error handling {conv_preview.buyer_name}: {e}"
-                logger.error(error_msg)
-                self.recent_errors.append(error_msg)
+                logger.error(f"Failed to open conversation tabs, handling serially: {e}")
+                await tabs.close()
+                return [
+                    await self._run_conversation(session, c, all_buyer_names)
+                    for c in previews
+                ]
+            self._tabs = tabs
+
+        logger.info(
+            f"Handling {len(previews)} conversation(s) across {self._tabs.size} tabs"
+        )
+
+        async def run_in_tab(conv_preview):
+            async with self._tabs.acquire() as tab:
+                return await self._run_conversation(
+                    tab, conv_preview, all_buyer_names, in_tab=True
+                )
 
-        return "responded" if any_responded else "idle"
+        return list(await asyncio.gather(*(run_in_tab(c) for c in previews)))
+
+    async def _close_tabs(self) -> None:
+        if self._tabs:
+            await self._tabs.close()
+            self._tabs = None
 
     async def _handle_conversation(
-        self, browser_session, conv_preview, all_buyer_names: set[str] | None = None
+        self,
+        browser_session,
+        conv_preview,
+        all_buyer_names: set[str] | None = None,
+        in_tab: bool = False,
     ) -> str | None:
         """Handle a single conversation.
 
-        Clicks the conversation row in the inbox list to show messages
-        in the conversation panel, extracts messages, and responds if needed.
+        Opens the thread directly by URL if we already know its thread id,
+        otherwise clicks the conversation row in the inbox list. Then extracts
+        messages and responds if needed. With in_tab=True the browser session
+        is a dedicated tab and the inbox page is left untouched.
 
-        Returns: "sold", "responded", or None
+        Returns: "sold", "responded", "queued" (reply handed to the pipeline), or None
         """
         display_name = conv_preview.display_name or conv_preview.buyer_name
         buyer_name = conv_preview.buyer_name  # normalized for DB
@@ -234,13 +460,8 @@ class MessageMonitor:
             f"preview_text='{conv_preview.preview_text[:60]}', unread={conv_preview.is_unread}"
         )
 
-        # Close any auto-opened chat popups before clicking so we don't
-        # accidentally extract/send in the wrong panel
-        await close_all_popups(browser_session)
-
-        # Click conversation row to show messages in panel
-        if not await click_conversation(browser_session, display_name):
-            logger.warning(f"[handle_conversation] Failed to click conversation for '{display_name}'")
+        thread_id = await self._resolve_thread_id(conv_preview)
+        if not await self._open_conversation(browser_session, display_name, thread_id, in_tab):
             return None
 
         try:
@@ -269,7 +490,13 @@ class MessageMonitor:
                     f"[handle_conversation] BUYER MISMATCH: expected '{buyer_name}' but extracted "
                     f"'{extracted}' — closing and skipping"
                 )
-                await close_all_popups(browser_session)
+                if thread_id:
+                    # Stored thread id points somewhere else — fall back to clicking,
+                    # and drop it from the DB so it isn't reloaded next visit
+                    self._thread_ids[self._conversation_key(conv_preview)] = None
+                    async with async_session() as db:
+                        await ConversationService.clear_thread_id(db, thread_id)
+                await self._leave_conversation(browser_session, thread_id)
                 return None
 
             logger.info(
@@ -278,12 +505,17 @@ class MessageMonitor:
             )
 
             if not conv_data.messages:
-                await close_all_popups(browser_session)
+                await self._leave_conversation(browser_session, thread_id)
                 return None
 
+            # First contact: remember the thread so later visits skip the click
+            new_thread_id = None if thread_id else conv_preview.thread_id or None
+            if new_thread_id:
+                self._thread_ids[self._conversation_key(conv_preview)] = new_thread_id
+
             # Check payment status for confirmed deals
             payment_result = await self._check_payment_status(
-                browser_session, buyer_name, conv_data
+                browser_session, buyer_name, conv_data, new_thread_id
             )
             if payment_result == "sold":
                 return "sold"
@@ -291,312 +523,524 @@ class MessageMonitor:
             # Last message is from seller — nothing to do
             if not conv_data.messages[-1].is_from_buyer:
                 logger.info(f"Last message for {buyer_name} is from seller, skipping")
-                await close_all_popups(browser_session)
+                await self._leave_conversation(browser_session, thread_id)
                 return None
 
-            # Process messages against DB
-            result = await self._process_messages(
-                browser_session, buyer_name, conv_data
-            )
+            # Process messages against DB. Only conversations with a verified
+            # thread id are queued: the send stage reopens them by URL, while
+            # reopening by row click would cost another LLM browser action.
+            if self._pipeline and not in_tab and thread_id:
+                result = await self._queue_reply(
+                    browser_session, conv_preview, conv_data, new_thread_id, thread_id
+                )
+            else:
+                result = await self._process_messages(
+                    browser_session, buyer_name, conv_data, new_thread_id
+                )
 
             # Always close popups after handling, then refresh if we responded
-            await close_all_popups(browser_session)
-            if result == "responded" or result == "sold":
+            await self._leave_conversation(browser_session, thread_id)
+            if not thread_id and (result == "responded" or result == "sold"):
                 await refresh_inbox(browser_session)
 
             return result
 
         except Exception as e:
             logger.error(f"Error handling conversation for {buyer_name}: {e}")
-            await close_all_popups(browser_session)
+            await self._leave_conversation(browser_session, thread_id)
             return None
 
+    async def _open_conversation(
+        self, browser_session, display_name: str, thread_id: str | None, in_tab: bool = False
+    ) -> bool:
+        """Show a conversation: by thread URL if known, else by clicking its inbox row."""
+        if thread_id:
+            # Direct navigation leaves the inbox page (unless we're in a tab)
+            if not in_tab:
+                self._on_inbox = False
+            return await open_thread(browser_session, thread_id)
+
+        if not self._on_inbox:
+            if not await navigate_to_marketplace(browser_session):
+                return False
+            self._on_inbox = True
+
+        # Close any auto-opened chat popups before clicking so we don't
+        # accidentally extract/send in the wrong panel
+        await close_all_popups(browser_session)
+
+        # Click conversation row to show messages in panel
+        if not await click_conversation(browser_session, display_name):
+            logger.warning(f"[open_conversation] Failed to click conversation for '{display_name}'")
+            return False
+        return True
+
+    async def _resolve_thread_id(self, conv_preview) -> str | None:
+        """Return a navigable thread id for the buyer's conversation about this
+        listing, looking it up in the DB once."""
+        key = self._conversation_key(conv_preview)
+        if key not in self._thread_ids:
+            thread_id = None
+            async with async_session() as db:
+                listing = await MatchingService.match_listing(db, conv_preview.listing_title)
+                # Without a listing match any stored thread could be another listing's
+                if listing:
+                    thread_id = await ConversationService.get_thread_id(
+                        db, conv_preview.buyer_name, listing.id
+                    )
+            # Only ids captured from real thread links are navigable
+            self._thread_ids[key] = (
+                thread_id if thread_id and thread_id.isdigit() else None
+            )
+        return self._thread_ids[key]
+
+    async def _leave_conversation(self, browser_session, thread_id: str | None) -> None:
+        """Clean up after a conversation. Direct thread pages have no popups to close."""
+        if not thread_id:
+            await close_all_popups(browser_session)
+
     async def _process_messages(
-        self, browser_session, buyer_name: str, conv_data
+        self, browser_session, buyer_name: str, conv_data, fb_thread_id: str | None = None
     ) -> str | None:
         """Process extracted messages: diff against DB, generate AI response.
 
         Returns: "sold", "responded", or None
         """
         async with async_session() as db:
-            buyer = await BuyerService.get_or_create(db, fb_name=buyer_name)
-
-            listing = await MatchingService.match_listing(
-                db, conv_data.listing_title
+            job = await self._prepare_reply(
+                db, browser_session, buyer_name, conv_data, fb_thread_id
             )
-            listing_id = listing.id if listing else None
+            if not isinstance(job, ReplyJob):
+                return job
+            if not await self._generate_reply(job):
+                # Keep the buyer messages even though we couldn't answer them
+                await job.uow.commit()
+                return None
+            return await self._deliver_reply(browser_session, job)
 
-            conversation = await ConversationService.get_or_create(
-                db, buyer_id=buyer.id, listing_id=listing_id
-            )
+    async def _queue_reply(
+        self, browser_session, conv_preview, conv_data, fb_thread_id: str | None, thread_id: str | None
+    ) -> str | None:
+        """Prepare a reply and hand it to the pipeline instead of answering inline.
 
-            # Skip if listing already sold
-            if conversation.status == "sold":
+        The job keeps its own DB session until the send stage is done with it.
+        Returns "queued" if a job was submitted, otherwise the prepare result.
+        """
+        db = async_session()
+        try:
+            job = await self._prepare_reply(
+                db, browser_session, conv_preview.buyer_name, conv_data, fb_thread_id
+            )
+        except Exception:
+            await db.close()
+            raise
+        if not isinstance(job, ReplyJob):
+            await db.close()
+            return job
+
+        job.display_name = conv_preview.display_name or conv_preview.buyer_name
+        # Only reopen by a thread id we have already verified
+        job.thread_id = thread_id
+        job.listing_key = self._listing_key(conv_preview)
+        self._queued_buyers.add(job.buyer_name)
+        self._pipeline.submit(job)
+        return "queued"
+
+    async def _send_queued(self, job: ReplyJob) -> str | None:
+        """Pipeline send stage: reopen the thread by URL on the main page and deliver."""
+        browser_session = await get_stagehand_session()
+        async with self._browser_lock:
+            if not await self._open_conversation(browser_session, job.display_name, job.thread_id):
                 return None
+            return await self._deliver_reply(browser_session, job)
 
-            # Reopen closed/declined conversations if buyer messages again
-            if conversation.status == "closed":
-                # Check if another buyer already has a pending deal on this listing
-                if listing_id and await ConversationService.has_pending_deal(db, listing_id):
-                    # Someone else agreed — tell this buyer
-                    response_text = (
-                        "sorry someone just grabbed this, ill lmk if it falls through. bye buy!"
-                    )
-                    sent = await browser_send_message(browser_session, response_text, buyer_name=buyer_name)
-                    await ConversationService.add_message(
-                        db,
-                        conversation_id=conversation.id,
-                        role="seller",
-                        content=response_text,
-                        delivered=sent,
-                    )
-                    return "responded"
-                else:
-                    await ConversationService.update_status(
-                        db, conversation.id, "active"
-                    )
-                    conversation.status = "active"
-                    logger.info(f"Reopened closed conversation for {buyer_name}")
+    async def _finish_queued(self, job: ReplyJob) -> None:
+        """Commit anything left staged, then release the job's DB session and listing lock."""
+        self._queued_buyers.discard(job.buyer_name)
+        try:
+            try:
+                await job.uow.commit()
+            finally:
+                await job.db.close()
+        finally:
+            lock = self._listing_locks.get(job.listing_key)
+            if lock and lock.locked():
+                lock.release()
+
+    def pipeline_metrics(self) -> dict | None:
+        """Per-stage queue depth and latency of the reply pipeline, if enabled."""
+        return self._pipeline.snapshot() if self._pipeline else None
+
+    async def _prepare_reply(
+        self, db, browser_session, buyer_name: str, conv_data, fb_thread_id: str | None = None
+    ) -> ReplyJob | str | None:
+        """Diff extracted messages against the DB and gather what the LLM needs.
+
+        Canned replies (listing sold, someone else grabbed it) are sent right
+        away. Returns a ReplyJob if an AI reply is needed, otherwise the final
+        result: "sold", "responded", or None. Changes are staged on the job's
+        unit of work; early returns commit it before returning.
+        """
+        conversation, listing, ctx = await self._load_context(
+            db, buyer_name, conv_data, fb_thread_id
+        )
+        listing_id = listing.id if listing else None
 
-            # Check if payment came through for confirmed deals
-            if conversation.status == "confirmed":
-                result = await self._check_payment_and_thank(
-                    db, browser_session, conversation, listing, buyer_name
-                )
-                if result:
-                    return result
+        # Skip if listing already sold
+        if conversation.status == "sold":
+            return None
 
-            # DB diff: find truly new messages
-            existing_messages = await ConversationService.get_messages(
-                db, conversation.id, limit=200
+        uow = ConversationUnitOfWork(db, conversation)
+
+        # Reopen closed/declined conversations if buyer messages again
+        if conversation.status == "closed":
+            # Check if another buyer already has a pending deal on this listing
+            if listing_id and await ConversationService.has_pending_deal(db, listing_id):
+                # Someone else agreed — tell this buyer
+                response_text = (
+                    "sorry someone just grabbed this, ill lmk if it falls through. bye buy!"
+                )
+                sent = await browser_send_message(browser_session, response_text, buyer_name=buyer_name)
+                uow.add_message("seller", response_text, delivered=sent)
+                await uow.commit()
+                return "responded"
+            else:
+                uow.update_status("active")
+                logger.info(f"Reopened closed conversation for {buyer_name}")
+
+        # Check if payment came through for confirmed deals
+        if uow.status == "confirmed":
+            result = await self._check_payment_and_thank(
+                uow, browser_session, listing, buyer_name
+            )
+            if result:
+                return result
+
+        # DB diff: line the extracted buyer messages up with the last stored
+        # ones — cost depends on the extraction window, not the history
+        extracted = [
+            ("buyer" if msg.is_from_buyer else "seller", msg.content)
+            for msg in conv_data.messages
+        ]
+        new_buyer_messages = None
+        if ctx.tail is not None and ctx.message_count == (conversation.message_count or 0):
+            # Nothing was stored since we cached the tail — no query needed
+            new_buyer_messages = align_new_messages(conversation.id, extracted, ctx.tail)
+        if new_buyer_messages is None:
+            recent = await ConversationService.get_recent_messages(
+                db, conversation.id, limit=len(extracted) + ANCHOR_SIZE
             )
-            existing_contents = {m.content for m in existing_messages}
+            # Undelivered seller messages never made it into the chat
+            known = [known_message(m) for m in recent if m.role == "buyer" or m.delivered]
+            new_buyer_messages = find_new_messages(conversation.id, extracted, known)
+            ctx.tail = known[-ANCHOR_SIZE:]
+            ctx.message_count = conversation.message_count or 0
+
+        if not new_buyer_messages:
+            await uow.commit()
+            return None
 
-            new_buyer_messages = [
-                msg
-                for msg in conv_data.messages
-                if msg.is_from_buyer and msg.content not in existing_contents
-            ]
+        logger.info(
+            f"New messages from {buyer_name}: "
+            f"{[m[:50] for m in new_buyer_messages]}"
+        )
 
-            if not new_buyer_messages:
-                return None
+        # Stage new buyer messages
+        for content in new_buyer_messages:
+            uow.add_message("buyer", content, delivered=True)
 
-            logger.info(
-                f"New messages from {buyer_name}: "
-                f"{[m.content[:50] for m in new_buyer_messages]}"
+        # Check if listing is sold - tell buyer
+        if listing and listing.status == "sold":
+            response_text = (
+                "ay sorry someone already grabbed this one, "
+                "appreciate you reaching out tho. bye buy!"
             )
+            sent = await browser_send_message(browser_session, response_text, buyer_name=buyer_name)
+            uow.add_message("seller", response_text, delivered=sent)
+            uow.update_status("closed")
+            await uow.commit()
+            return "responded"
 
-            # Save new buyer messages to DB
-            for msg in new_buyer_messages:
-                await ConversationService.add_message(
-                    db,
-                    conversation_id=conversation.id,
-                    role="buyer",
-                    content=msg.content,
-                    delivered=True,
+        # Query competing offers from other buyers on the same listing
+        competing_offer = None
+        if listing_id:
+            competing_offer = await ConversationService.get_competing_offer(
+                db, listing_id, conversation.id
+            )
+            if competing_offer:
+                logger.info(
+                    f"Competing offer for {buyer_name}: ${competing_offer:.0f}"
                 )
 
-            # Check if listing is sold - tell buyer
-            if listing and listing.status == "sold":
-                response_text = (
-                    "ay sorry someone already grabbed this one, "
-                    "appreciate you reaching out tho. bye buy!"
-                )
-                sent = await browser_send_message(browser_session, response_text, buyer_name=buyer_name)
-                await ConversationService.add_message(
-                    db,
-                    conversation_id=conversation.id,
-                    role="seller",
-                    content=response_text,
-                    delivered=sent,
-                )
-                await ConversationService.update_status(
-                    db, conversation.id, "closed"
-                )
-                return "responded"
+        # Only what isn't covered by the rolling summary yet
+        all_messages = await ConversationService.get_messages_after(
+            db, conversation.id, conversation.summary_through_id or 0
+        )
+        return ReplyJob(
+            db=db,
+            uow=uow,
+            buyer_name=buyer_name,
+            conversation=conversation,
+            listing=listing,
+            history=all_messages,
+            new_buyer_messages=new_buyer_messages,
+            competing_offer=competing_offer,
+        )
 
-            # Query competing offers from other buyers on the same listing
-            competing_offer = None
-            if listing_id:
-                competing_offer = await ConversationService.get_competing_offer(
-                    db, listing_id, conversation.id
-                )
-                if competing_offer:
+    async def _generate_reply(self, job: ReplyJob) -> bool:
+        """Run the LLM for a prepared job. Returns False if nothing was generated."""
+        conversation = job.conversation
+        if settings.fast_path_enabled and self._fast_reply(job):
+            return True
+
+        history, summary = await self._budget_history(job)
+        job.ai_result = await generate_response(
+            listing=job.listing,
+            messages=history,
+            conversation_status=job.uow.status,
+            new_buyer_messages=job.new_buyer_messages,
+            agreed_price=conversation.agreed_price,
+            competing_offer=job.competing_offer,
+            delivery_address=conversation.delivery_address,
+            conversation_id=conversation.id,
+            history_summary=summary,
+        )
+
+        if not job.ai_result:
+            logger.warning(f"No AI response generated for {job.buyer_name}")
+            return False
+
+        logger.info(
+            f"AI response for {job.buyer_name}: {job.ai_result.message[:100]} "
+            f"(deal_status={job.ai_result.deal_status})"
+        )
+        return True
+
+    def _fast_reply(self, job: ReplyJob) -> bool:
+        """Answer trivial buyer messages by rule instead of the LLM."""
+        fast_path_stats.checked += 1
+        last_seller_message = next(
+            (m.content for m in reversed(job.history) if m.role == "seller"), None
+        )
+        fast = classify_fast_reply(
+            job.listing,
+            job.uow.status,
+            job.new_buyer_messages,
+            last_seller_message=last_seller_message,
+            current_offer=job.conversation.current_offer,
+            competing_offer=job.competing_offer,
+        )
+        if not fast:
+            return False
+
+        intent, job.ai_result = fast
+        fast_path_stats.record_hit(intent, usage_tracker.avg_latency_s())
+        logger.info(
+            f"Fast-path reply ({intent}) for {job.buyer_name}: {job.ai_result.message[:100]} "
+            f"(deal_status={job.ai_result.deal_status})"
+        )
+        return True
+
+    async def _budget_history(self, job: ReplyJob) -> tuple[list, str | None]:
+        """Fit the job's history into settings.history_token_budget.
+
+        Returns (recent messages, summary). When the unsummarized messages go
+        over budget, the older ones are folded into the conversation's rolling
+        summary down to half the budget, so a summary call is needed every
+        few turns rather than on every one.
+        """
+        conversation = job.conversation
+        summary = conversation.history_summary
+        history = job.history
+        budget = settings.history_token_budget
+        full_tokens = (conversation.summarized_tokens or 0) + history_tokens(history)
+
+        if estimate_tokens(summary) + history_tokens(history) > budget:
+            older, history = split_history(history, budget // 2)
+            if older:
+                new_summary = await summarize_history(summary, older, conversation.id)
+                if new_summary:
+                    summary = new_summary
+                    job.uow.update_summary(
+                        summary,
+                        through_id=older[-1].id,
+                        summarized_tokens=(conversation.summarized_tokens or 0) + history_tokens(older),
+                    )
                     logger.info(
-                        f"Competing offer for {buyer_name}: ${competing_offer:.0f}"
+                        f"Summarized {len(older)} older messages for {job.buyer_name}"
                     )
 
-            # Generate AI response
-            all_messages = await ConversationService.get_messages(
-                db, conversation.id, limit=50
-            )
-            new_contents = [m.content for m in new_buyer_messages]
-            ai_result = await generate_response(
-                listing=listing,
-                messages=all_messages,
-                conversation_status=conversation.status,
-                new_buyer_messages=new_contents,
-                agreed_price=conversation.agreed_price,
-                competing_offer=competing_offer,
-                delivery_address=conversation.delivery_address,
-            )
+        usage_tracker.record_history(
+            conversation.id, full_tokens, estimate_tokens(summary) + history_tokens(history)
+        )
+        return history, summary
 
-            if not ai_result:
-                logger.warning(f"No AI response generated for {buyer_name}")
-                return None
+    async def _deliver_reply(self, browser_session, job: ReplyJob) -> str | None:
+        """Send the generated reply and apply its deal status to the DB.
 
-            logger.info(
-                f"AI response for {buyer_name}: {ai_result.message[:100]} "
-                f"(deal_status={ai_result.deal_status})"
-            )
+        Expects the conversation to be open in browser_session. Everything is
+        committed together at the end through the job's unit of work.
+        """
+        db = job.db
+        uow = job.uow
+        buyer_name = job.buyer_name
+        conversation = job.conversation
+        listing = job.listing
+        listing_id = listing.id if listing else None
+        ai_result = job.ai_result
+
+        # Send AI response
+        sent = await browser_send_message(browser_session, ai_result.message, buyer_name=buyer_name)
+        logger.info(
+            f"Message send {'succeeded' if sent else 'FAILED'} for {buyer_name}"
+        )
+
+        uow.add_message("seller", ai_result.message, delivered=sent)
 
-            # Send AI response
-            sent = await browser_send_message(browser_session, ai_result.message, buyer_name=buyer_name)
+        # Store buyer's offer if extracted
+        if ai_result.buyer_offer is not None:
+            uow.update_offer(ai_result.buyer_offer)
             logger.info(
-                f"Message send {'succeeded' if sent else 'FAILED'} for {buyer_name}"
+                f"Stored buyer offer for {buyer_name}: ${ai_result.buyer_offer:.0f}"
             )
 
-            await ConversationService.add_message(
-                db,
-                conversation_id=conversation.id,
-                role="seller",
-                content=ai_result.message,
-                delivered=sent,
+        # Handle deal status
+        if ai_result.deal_status == "agreed":
+            agreed_price = ai_result.agreed_price or (
+                listing.price if listing else 0
             )
+            logger.info(
+                f"DEAL AGREED (awaiting address): "
+                f"{listing.title if listing else 'Unknown'} - "
+                f"Buyer: {buyer_name} - ${agreed_price}"
+            )
+            uow.save_deal_details(agreed_price=agreed_price)
+            uow.update_status("pending")
+            PaymentService.prepare_checkout(conversation.id, agreed_price)
 
-            # Store buyer's offer if extracted
-            if ai_result.buyer_offer is not None:
-                await ConversationService.update_offer(
-                    db, conversation.id, ai_result.buyer_offer
-                )
-                logger.info(
-                    f"Stored buyer offer for {buyer_name}: ${ai_result.buyer_offer:.0f}"
-                )
+            # Close competing conversations on this listing
+            if listing_id:
+                uow.close_competing_conversations(listing_id)
 
-            # Handle deal status
-            if ai_result.deal_status == "agreed":
-                agreed_price = ai_result.agreed_price or (
-                    listing.price if listing else 0
-                )
+        elif ai_result.deal_status == "address_received":
+            delivery_address = ai_result.delivery_address
+            if delivery_address:
                 logger.info(
-                    f"DEAL AGREED (awaiting address): "
+                    f"ADDRESS RECEIVED (awaiting confirmation): "
                     f"{listing.title if listing else 'Unknown'} - "
-                    f"Buyer: {buyer_name} - ${agreed_price}"
-                )
-                await ConversationService.save_deal_details(
-                    db, conversation.id, agreed_price=agreed_price
+                    f"Buyer: {buyer_name} - Address: {delivery_address}"
                 )
-                await ConversationService.update_status(
-                    db, conversation.id, "pending"
+                uow.save_deal_details(delivery_address=delivery_address)
+                uow.update_status("awaiting_confirm")
+            else:
+                logger.warning(
+                    f"address_received but no address extracted for {buyer_name}"
                 )
 
-                # Close competing conversations on this listing
-                if listing_id:
-                    closed_count = await ConversationService.close_competing_conversations(
-                        db, listing_id, conversation.id
-                    )
-                    if closed_count:
-                        logger.info(
-                            f"Closed {closed_count} competing conversation(s) "
-                            f"on listing '{listing.title}'"
-                        )
-
-            elif ai_result.deal_status == "address_received":
-                delivery_address = ai_result.delivery_address
-                if delivery_address:
-                    logger.info(
-                        f"ADDRESS RECEIVED (awaiting confirmation): "
-                        f"{listing.title if listing else 'Unknown'} - "
-                        f"Buyer: {buyer_name} - Address: {delivery_address}"
-                    )
-                    await ConversationService.save_deal_details(
-                        db, conversation.id, delivery_address=delivery_address
-                    )
-                    await ConversationService.update_status(
-                        db, conversation.id, "awaiting_confirm"
-                    )
-                else:
-                    logger.warning(
-                        f"address_received but no address extracted for {buyer_name}"
-                    )
+        elif ai_result.deal_status == "address_confirmed":
+            logger.info(
+                f"ADDRESS CONFIRMED: "
+                f"{listing.title if listing else 'Unknown'} - "
+                f"Buyer: {buyer_name}"
+            )
+            uow.update_status("confirmed")
+            self._awaiting_payment.add(buyer_name)
 
-            elif ai_result.deal_status == "address_confirmed":
-                logger.info(
-                    f"ADDRESS CONFIRMED: "
-                    f"{listing.title if listing else 'Unknown'} - "
-                    f"Buyer: {buyer_name}"
-                )
-                await ConversationService.update_status(
-                    db, conversation.id, "confirmed"
-                )
-                self._awaiting_payment.add(buyer_name)
-
-                # Create checkout session and send payment link in chat
-                try:
-                    from ..services.payment_service import PaymentService
-                    txn = await PaymentService.create_checkout(db, conversation.id)
-                    if txn and txn.checkout_url:
-                        price_str = f"{conversation.agreed_price:.0f}" if conversation.agreed_price else "the agreed amount"
-                        payment_msg = f"here's the payment link for ${price_str}: {txn.checkout_url}"
-                        sent = await browser_send_message(browser_session, payment_msg, buyer_name=buyer_name)
-                        await ConversationService.add_message(
-                            db,
-                            conversation_id=conversation.id,
-                            role="seller",
-                            content=payment_msg,
-                            delivered=sent,
-                        )
-                        logger.info(f"Payment link sent to {buyer_name}: {txn.checkout_url}")
-                except Exception as e:
-                    logger.error(f"Failed to create checkout for conversation {conversation.id}: {e}")
-
-            elif ai_result.deal_status == "declined":
-                logger.info(
-                    f"DEAL DECLINED: {listing.title if listing else 'Unknown'} - "
-                    f"Buyer: {buyer_name}"
-                )
-                await ConversationService.update_status(
-                    db, conversation.id, "closed"
-                )
+            # Create checkout session and send payment link in chat
+            try:
+                txn = await PaymentService.create_checkout(db, conversation.id)
+                if txn and txn.checkout_url:
+                    price_str = f"{conversation.agreed_price:.0f}" if conversation.agreed_price else "the agreed amount"
+                    payment_msg = f"here's the payment link for ${price_str}: {txn.checkout_url}"
+                    sent = await browser_send_message(browser_session, payment_msg, buyer_name=buyer_name)
+                    uow.add_message("seller", payment_msg, delivered=sent)
+                    logger.info(f"Payment link sent to {buyer_name}: {txn.checkout_url}")
+            except Exception as e:
+                logger.error(f"Failed to create checkout for conversation {conversation.id}: {e}")
 
-            elif ai_result.deal_status == "needs_review":
-                logger.info(
-                    f"NEEDS REVIEW: {listing.title if listing else 'Unknown'} - "
-                    f"Buyer: {buyer_name}"
-                )
-                await ConversationService.update_status(
-                    db, conversation.id, "needs_review"
-                )
+        elif ai_result.deal_status == "declined":
+            logger.info(
+                f"DEAL DECLINED: {listing.title if listing else 'Unknown'} - "
+                f"Buyer: {buyer_name}"
+            )
+            uow.update_status("closed")
 
-            return "responded"
+        elif ai_result.deal_status == "needs_review":
+            logger.info(
+                f"NEEDS REVIEW: {listing.title if listing else 'Unknown'} - "
+                f"Buyer: {buyer_name}"
+            )
+            # Don't overwrite a deal in progress, or its payment is never checked again
+            if uow.status == "active":
+                uow.update_status("needs_review")
+
+        await uow.commit()
+        return "responded"
 
     async def _check_payment_status(
-        self, browser_session, buyer_name: str, conv_data
+        self, browser_session, buyer_name: str, conv_data, fb_thread_id: str | None = None
     ) -> str | None:
         """Check if a confirmed deal has been paid, independent of new messages.
 
         Returns "sold" if payment went through, None otherwise.
         """
+        ctx = context_cache.get(buyer_name, conv_data.listing_title)
+        if ctx and ctx.status != "confirmed":
+            return None
+
         async with async_session() as db:
-            buyer = await BuyerService.get_or_create(db, fb_name=buyer_name)
-            listing = await MatchingService.match_listing(db, conv_data.listing_title)
-            listing_id = listing.id if listing else None
-            conversation = await ConversationService.get_or_create(
-                db, buyer_id=buyer.id, listing_id=listing_id
+            conversation, listing, _ = await self._load_context(
+                db, buyer_name, conv_data, fb_thread_id
             )
             if conversation.status != "confirmed":
                 return None
             return await self._check_payment_and_thank(
-                db, browser_session, conversation, listing, buyer_name
+                ConversationUnitOfWork(db, conversation), browser_session, listing, buyer_name
             )
 
+    async def _load_context(
+        self, db, buyer_name: str, conv_data, fb_thread_id: str | None = None
+    ):
+        """Load the buyer's conversation and matched listing, using the context cache.
+
+        On a cache hit this is one query (conversation joined with its
+        listing); on a miss it resolves buyer, listing and conversation and
+        caches the result. Returns (conversation, listing, context).
+        """
+        ctx = context_cache.get(buyer_name, conv_data.listing_title)
+        if ctx:
+            conversation = await ConversationService.get_with_listing(db, ctx.conversation_id)
+            # Fall back to a full lookup if the listing is no longer active
+            # (matching only considers active listings) or a new thread id
+            # still has to be stored by get_or_create
+            if (
+                conversation
+                and conversation.listing
+                and conversation.listing.status == "active"
+                and not (fb_thread_id and conversation.fb_thread_id != fb_thread_id)
+            ):
+                ctx.status = conversation.status
+                return conversation, conversation.listing, ctx
+            context_cache.invalidate(buyer_name)
+
+        buyer = await BuyerService.get_or_create(db, fb_name=buyer_name)
+        listing = await MatchingService.match_listing(db, conv_data.listing_title)
+        listing_id = listing.id if listing else None
+        conversation = await ConversationService.get_or_create(
+            db, buyer_id=buyer.id, listing_id=listing_id, fb_thread_id=fb_thread_id
+        )
+        ctx = context_cache.put(buyer_name, conv_data.listing_title, buyer.id, conversation)
+        return conversation, listing, ctx
+
     async def _check_payment_and_thank(
-        self, db, browser_session, conversation, listing, buyer_name: str
+        self, uow: ConversationUnitOfWork, browser_session, listing, buyer_name: str
     ) -> str | None:
-        """Check if buyer has paid (polling Stripe directly) and send thank-you.
+        """Check if buyer has paid (via the payment status tracker) and send thank-you.
 
         Returns "sold" if payment confirmed and thank-you sent, None otherwise.
         """
+        db = uow.session
+        conversation = uow.conversation
         result = await db.execute(
             select(Transaction).where(
                 Transaction.conversation_id == conversation.id
@@ -607,25 +1051,8 @@ class MessageMonitor:
         if not txn:
             return None
 
-        # If webhook already updated it, great. Otherwise check Stripe directly.
-        if txn.status == "pending" and txn.stripe_checkout_session_id:
-            try:
-                import stripe
-                from ..config import settings
-                stripe.api_key = settings.stripe_secret_key
-                stripe_session = stripe.checkout.Session.retrieve(txn.stripe_checkout_session_id)
-                if stripe_session.payment_status == "paid":
-                    from datetime import datetime
-                    txn.stripe_payment_intent_id = stripe_session.payment_intent
-                    txn.status = "payment_held"
-                    txn.paid_at = datetime.utcnow()
-                    txn.updated_at = datetime.utcnow()
-                    await db.commit()
-                    logger.info(f"Payment confirmed via Stripe polling for transaction {txn.id}")
-            except Exception as e:
-                logger.error(f"Failed to check Stripe session: {e}")
-
-        if txn.status != "payment_held":
+        # Webhook-updated rows win; Stripe is only polled with backoff
+        if not await payment_status_tracker.check(db, txn):
             return None
 
         logger.info(
@@ -633,24 +1060,16 @@ class MessageMonitor:
             f"Buyer: {buyer_name}"
         )
 
-        # Update conversation to accepted
-        await ConversationService.update_status(db, conversation.id, "accepted")
-
-        # Mark listing as sold
-        if listing:
-            listing.status = "sold"
-            await db.commit()
-
         # Send thank-you message
         thank_msg = "payment received, appreciate it! bye buy!"
         sent = await browser_send_message(browser_session, thank_msg, buyer_name=buyer_name)
-        await ConversationService.add_message(
-            db,
-            conversation_id=conversation.id,
-            role="seller",
-            content=thank_msg,
-            delivered=sent,
-        )
+
+        # Conversation accepted, listing sold, thank-you recorded — one commit
+        uow.update_status("accepted")
+        uow.add_message("seller", thank_msg, delivered=sent)
+        if listing:
+            listing.status = "sold"
+        await uow.commit()
 
         if sent:
             logger.info(f"Thank-you message sent to {buyer_name}")
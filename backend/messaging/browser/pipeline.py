@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageMetrics:
+    """Running counters for one pipeline stage."""
+    processed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    total_latency_s: float = 0.0
+    last_latency_s: float = 0.0
+    total_wait_s: float = 0.0
+
+    def record(self, latency_s: float, wait_s: float = 0.0, ok: bool = True) -> None:
+        self.processed += 1
+        if not ok:
+            self.failed += 1
+        self.total_latency_s += latency_s
+        self.last_latency_s = latency_s
+        self.total_wait_s += wait_s
+
+    def snapshot(self, queue_depth: int = 0) -> dict:
+        count = self.processed or 1
+        return {
+            "queue_depth": queue_depth,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_latency_ms": round(self.total_latency_s / count * 1000),
+            "last_latency_ms": round(self.last_latency_s * 1000),
+            "avg_wait_ms": round(self.total_wait_s / count * 1000),
+        }
+
+
+class ReplyPipeline:
+    """Staged reply pipeline that overlaps LLM generation with browser sends.
+
+    The monitor's extract stage submits jobs for conversations that need a
+    reply. A generate worker runs the LLM call for the next job while the
+    send worker is still typing the previous reply into the browser. Jobs
+    can outlive the poll cycle that submitted them; collect() hands back
+    whatever has finished so far.
+
+    The stage callables are supplied by the monitor:
+        generate(job) -> bool       True if the job should go on to send
+        send(job) -> str | None     result reported back to the poll cycle
+        finish(job) -> None         always called last, releases resources
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Any], Awaitable[bool]],
+        send: Callable[[Any], Awaitable[str | None]],
+        finish: Callable[[Any], Awaitable[None]],
+    ):
+        self._generate = generate
+        self._send = send
+        self._finish = finish
+        self._generate_queue: asyncio.Queue = asyncio.Queue()
+        self._send_queue: asyncio.Queue = asyncio.Queue()
+        self._results: list[str | None] = []
+        self._tasks: list[asyncio.Task] = []
+        # Submitted jobs that haven't been finished yet
+        self.outstanding = 0
+        self.metrics = {
+            "extract": StageMetrics(),
+            "generate": StageMetrics(),
+            "send": StageMetrics(),
+        }
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._generate_worker()),
+            asyncio.create_task(self._send_worker()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        # Release anything still queued
+        for queue in (self._generate_queue, self._send_queue):
+            while not queue.empty():
+                job, _ = queue.get_nowait()
+                queue.task_done()
+                await self._finish_job(job)
+
+    def submit(self, job) -> None:
+        """Queue a conversation for LLM generation."""
+        self.outstanding += 1
+        self._generate_queue.put_nowait((job, time.monotonic()))
+
+    def record_extract(self, latency_s: float, ok: bool = True) -> None:
+        self.metrics["extract"].record(latency_s, ok=ok)
+
+    def collect(self) -> list[str | None]:
+        """Return the results of the jobs finished since the last call, without waiting."""
+        results, self._results = self._results, []
+        return results
+
+    async def wait_for_sends(self) -> None:
+        """Wait until replies that are already generated have been sent.
+
+        The extract stage calls this before taking the browser, so a
+        finished reply goes out before the next conversation is opened.
+        """
+        await self._send_queue.join()
+
+    async def wait_idle(self) -> None:
+        """Wait until every submitted job has been sent or dropped, leaving results for collect()."""
+        await self._generate_queue.join()
+        await self._send_queue.join()
+
+    async def drain(self) -> list[str | None]:
+        """Wait until every submitted job has been sent, and return their results."""
+        await self.wait_idle()
+        return self.collect()
+
+    def snapshot(self) -> dict:
+        return {
+            "extract": self.metrics["extract"].snapshot(),
+            "generate": self.metrics["generate"].snapshot(self._generate_queue.qsize()),
+            "send": self.metrics["send"].snapshot(self._send_queue.qsize()),
+        }
+
+    async def _generate_worker(self) -> None:
+        metrics = self.metrics["generate"]
+        while True:
+            job, enqueued_at = await self._generate_queue.get()
+            started_at = time.monotonic()
+            metrics.in_flight += 1
+            try:
+                ok = await self._generate(job)
+            except Exception as e:
+                logger.error(f"[pipeline] Generate stage failed: {e}")
+                ok = False
+            metrics.in_flight -= 1
+            metrics.record(time.monotonic() - started_at, started_at - enqueued_at, ok)
+
+            if ok:
+                # Hand over before task_done so drain() never sees a gap
+                self._send_queue.put_nowait((job, time.monotonic()))
+            else:
+                self._results.append(None)
+                await self._finish_job(job)
+            self._generate_queue.task_done()
+
+    async def _send_worker(self) -> None:
+        metrics = self.metrics["send"]
+        while True:
+            job, enqueued_at = await self._send_queue.get()
+            started_at = time.monotonic()
+            metrics.in_flight += 1
+            result = None
+            try:
+                result = await self._send(job)
+            except Exception as e:
+                logger.error(f"[pipeline] Send stage failed: {e}")
+            finally:
+                metrics.in_flight -= 1
+                metrics.record(
+                    time.monotonic() - started_at, started_at - enqueued_at, result is not None
+                )
+                self._results.append(result)
+                await self._finish_job(job)
+                self._send_queue.task_done()
+
+    async def _finish_job(self, job) -> None:
+        try:
+            await self._finish(job)
+        finally:
+            self.outstanding -= 1
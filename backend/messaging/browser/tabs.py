@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserTab:
+    """A tab in the monitor's browser that Stagehand calls are pinned to.
+
+    Exposes the same navigate/act/extract/observe methods as a Stagehand
+    session, so the helpers in actions.py and extractor.py work unchanged
+    on a tab. Every call carries the tab's Playwright page, which keeps
+    concurrent conversations from reading or typing into each other's tab.
+    """
+
+    def __init__(self, session, page, index: int):
+        self._session = session
+        self._page = page
+        self.index = index
+
+    async def navigate(self, **params):
+        return await self._session.navigate(page=self._page, **params)
+
+    async def act(self, **params):
+        return await self._session.act(page=self._page, **params)
+
+    async def extract(self, **params):
+        return await self._session.extract(page=self._page, **params)
+
+    async def observe(self, **params):
+        return await self._session.observe(page=self._page, **params)
+
+
+class TabPool:
+    """Fixed set of extra tabs in the current Stagehand session.
+
+    Connects Playwright over CDP to the session's browser (same approach as
+    the posting platforms) and opens `size` pages next to the inbox tab.
+    Tabs are handed out one at a time via `acquire()`.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._session = None
+        self._playwright = None
+        self._pages: list = []
+        self._free: asyncio.Queue[BrowserTab] = asyncio.Queue()
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    def belongs_to(self, session) -> bool:
+        return self._session is session
+
+    async def open(self, session) -> None:
+        """Open the tabs inside the given Stagehand session's browser."""
+        cdp_url = session.data.cdp_url if session.data else None
+        if not cdp_url:
+            raise RuntimeError("Stagehand session has no CDP URL, cannot open tabs")
+
+        self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.connect_over_cdp(cdp_url)
+        context = browser.contexts[0]
+        for i in range(self.size):
+            page = await context.new_page()
+            self._pages.append(page)
+            self._free.put_nowait(BrowserTab(session, page, i))
+        self._session = session
+        logger.info(f"Opened {self.size} conversation tabs")
+
+    async def close(self) -> None:
+        """Close all tabs and disconnect Playwright."""
+        for page in self._pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._pages = []
+        self._playwright = None
+        self._session = None
+        self._free = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a free tab for the duration of the block."""
+        tab = await self._free.get()
+        try:
+            yield tab
+        finally:
+            self._free.put_nowait(tab)
@@ -12,13 +12,38 @@ class Settings(BaseSettings):
     )
 
     openai_api_key: str = ""
+    openai_base_url: str | None = None  # e.g. the local stub server for benchmarks
     gpt_model: str = "gpt-5.2"
+    gpt_model_small: str = "gpt-5-mini"  # for easy turns, see ai/router.py
+    model_routing_enabled: bool = True
+    small_model_routes: list[str] = ["address", "acknowledgement", "off_topic"]
+    listing_model_overrides: dict[int, str] = {}  # listing id -> model for every turn
+    # USD per 1M tokens: (input, cached input, output)
+    model_prices: dict[str, tuple[float, float, float]] = {
+        "gpt-5.2": (1.75, 0.175, 14.0),
+        "gpt-5-mini": (0.25, 0.025, 2.0),
+    }
+    ai_repair_retries: int = 1
+    llm_max_concurrency: int = 4
+    llm_timeout: float = 20.0
+    llm_max_retries: int = 2
+    llm_hedge_percentile: float = 0.0  # e.g. 0.95 to hedge slow calls, 0 = off
+    llm_breaker_threshold: int = 5
+    llm_breaker_reset: float = 30.0
+    history_token_budget: int = 1500
+    fast_path_enabled: bool = True
 
     poll_interval_min: int = 3
     poll_interval_max: int = 8
     response_delay_min: int = 5
     response_delay_max: int = 15
     max_conversations_per_cycle: int = 5
+    monitor_tabs: int = 1
+    monitor_pipeline: bool = False
+    context_cache_ttl: int = 300
+    context_cache_size: int = 256
+    prompt_cache_size: int = 256
+    usage_conversations_max: int = 1000  # per-conversation LLM usage kept for /stats
     full_sweep_interval: int = 10
     session_break_cycles: int = 75
     session_break_min: int = 60
@@ -32,6 +57,17 @@ class Settings(BaseSettings):
     stripe_secret_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_connected_account_id: str = ""
+    stripe_timeout: float = 15.0  # overall deadline per call, SDK retries included
+    stripe_max_retries: int = 2
+    stripe_poll_initial: float = 10.0  # seconds between payment checks, doubling per miss
+    stripe_poll_max: float = 300.0
+    webhook_batch_size: int = 50
+    payment_worker_concurrency: int = 4
+    stats_reconcile_interval: int = 3600  # seconds
+    analytics_rollup_interval: int = 300  # seconds
+    webhook_max_attempts: int = 8
+    sse_queue_size: int = 100  # events buffered per stream client before it is dropped
+    sse_keepalive: float = 15.0  # seconds
 
 
 settings = Settings()
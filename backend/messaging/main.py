@@ -4,11 +4,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database.connection import Base, engine
+from database.connection import Base, engine, add_missing_columns
 from database.seed import seed_default_listings, seed_default_conversations
 from .api.router import router
 from .browser.monitor import monitor
 from .services.payment_worker import payment_worker
+from .services.analytics import analytics_rollup, install_status_event_triggers
+from .services.stats_counters import counter_reconciler, install_counter_triggers
+from .services.webhook_consumer import webhook_consumer
 
 # Import models so they register with Base
 from . import models  # noqa: F401
@@ -23,15 +26,27 @@ async def lifespan(app: FastAPI):
     # Startup: initialize database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(install_counter_triggers)
+        await conn.run_sync(install_status_event_triggers)
 
     await seed_default_listings()
     await seed_default_conversations()
+    await counter_reconciler.start()
+    await analytics_rollup.start()
     await monitor.start()
     await payment_worker.start()
+    await webhook_consumer.start()
     logger.info("Messaging service started")
     yield
 
-    # Shutdown: stop worker and monitor, cleanup
+    # Shutdown: stop workers and monitor, cleanup
+    if analytics_rollup._running:
+        await analytics_rollup.stop()
+    if counter_reconciler._running:
+        await counter_reconciler.stop()
+    if webhook_consumer._running:
+        await webhook_consumer.stop()
     if payment_worker._running:
         await payment_worker.stop()
     if monitor.running:
@@ -53,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(router)
@@ -3,6 +3,13 @@ from .conversation import Conversation
 from .message import Message
 from .browser_session import BrowserSession
 from .response_config import ResponseConfig
+from .stats_counter import StatsCounter
 from .transaction import Transaction
+from .webhook_event import WebhookEvent
+from .analytics import AnalyticsHourly, AnalyticsWatermark, ConversationStatusEvent
 
-__all__ = ["Buyer", "Conversation", "Message", "BrowserSession", "ResponseConfig", "Transaction"]
+__all__ = [
+    "Buyer", "Conversation", "Message", "BrowserSession", "ResponseConfig",
+    "StatsCounter", "Transaction", "WebhookEvent",
+    "AnalyticsHourly", "AnalyticsWatermark", "ConversationStatusEvent",
+]
@@ -0,0 +1,43 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+from database.connection import Base
+
+
+class AnalyticsHourly(Base):
+    """Pre-aggregated metric per hour bucket, written by the analytics rollup."""
+    __tablename__ = "analytics_hourly"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    # reply_latency | funnel | posting_duration | posting_outcome
+    metric: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # e.g. the status entered for funnel, the platform for posting_duration
+    dimension: Mapped[str] = mapped_column(String(100), primary_key=True, default="")
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[float] = mapped_column(Float, default=0.0)
+    min_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class AnalyticsWatermark(Base):
+    """How far each rollup source has been processed (an id or a timestamp)."""
+    __tablename__ = "analytics_watermarks"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
+class ConversationStatusEvent(Base):
+    """Conversation status transitions, recorded by a trigger for the funnel."""
+    __tablename__ = "conversation_status_events"
+    __table_args__ = (
+        Index("idx_conversation_status_events_changed_at", "changed_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    conversation_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    from_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    to_status: Mapped[str] = mapped_column(String(20), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Float, DateTime, ForeignKey, Integer
+from sqlalchemy import String, Float, DateTime, ForeignKey, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
 
@@ -19,6 +19,12 @@ class Conversation(Base):
     agreed_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     delivery_address: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     current_offer: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    message_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Rolling summary of older messages (ids up to summary_through_id) that
+    # no longer fit in the prompt's history budget
+    history_summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_through_id: Mapped[int] = mapped_column(Integer, default=0)
+    summarized_tokens: Mapped[int] = mapped_column(Integer, default=0)
     last_message_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime, nullable=True
     )
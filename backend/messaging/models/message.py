@@ -1,12 +1,17 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Boolean
+from sqlalchemy import String, DateTime, ForeignKey, Boolean, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Optional
 
 from database.connection import Base
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("idx_messages_fingerprint", "fingerprint", unique=True),
+        Index("idx_messages_conversation_sent_at", "conversation_id", "sent_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     conversation_id: Mapped[int] = mapped_column(
@@ -16,6 +21,10 @@ class Message(Base):
     content: Mapped[str] = mapped_column(String, nullable=False)
     sent_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     delivered: Mapped[bool] = mapped_column(Boolean, default=False)
+    # 0-based index in the conversation, reserved from conversations.message_count
+    position: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # sha256 of conversation, role, content and position in the conversation
+    fingerprint: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     conversation: Mapped["Conversation"] = relationship(
         "Conversation", back_populates="messages"
@@ -0,0 +1,15 @@
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.connection import Base
+
+
+class StatsCounter(Base):
+    """Row counts for the dashboard, kept current by SQLite triggers.
+
+    Names: "conversations", "conversations:<status>", "messages", "buyers".
+    """
+    __tablename__ = "stats_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
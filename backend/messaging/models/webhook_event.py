@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Text, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+from database.connection import Base
+
+
+class WebhookEvent(Base):
+    """Inbox of received Stripe webhook events, applied by the webhook consumer."""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("idx_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    # Stripe event id, so redeliveries of the same event are stored once
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    # pending -> processed | ignored | failed
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -26,6 +26,23 @@ class TransactionResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class TransactionListItem(TransactionResponse):
+    """A transaction in the list endpoint; the extra fields only appear with expand=true."""
+    listing_title: Optional[str] = None
+    buyer_name: Optional[str] = None
+    conversation_status: Optional[str] = None
+
+
+class StatusTotal(BaseModel):
+    count: int
+    amount_cents: int
+
+
+class TransactionTotals(BaseModel):
+    """Totals over all transactions, not one page of the list endpoint."""
+    by_status: dict[str, StatusTotal]
+
+
 class TrackingUpload(BaseModel):
     tracking_number: str
 
@@ -8,3 +8,4 @@ class PollingStatusResponse(BaseModel):
     cycle_count: int = 0
     last_poll_at: Optional[datetime] = None
     errors: list[str] = []
+    pipeline: Optional[dict[str, dict]] = None
@@ -1,5 +1,6 @@
 from .conversation_service import ConversationService
 from .buyer_service import BuyerService
 from .matching_service import MatchingService
+from .unit_of_work import ConversationUnitOfWork
 
-__all__ = ["ConversationService", "BuyerService", "MatchingService"]
+__all__ = ["ConversationService", "BuyerService", "MatchingService", "ConversationUnitOfWork"]
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import aliased
+
+from database.connection import async_session
+from posting.models.job import PostingJob
+from ..config import settings
+from ..models.analytics import AnalyticsHourly, AnalyticsWatermark, ConversationStatusEvent
+from ..models.message import Message
+from .cursors import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+FUNNEL_STAGES = ["active", "pending", "awaiting_confirm", "confirmed", "accepted"]
+
+# Status transitions are not stored anywhere else, so record them for the funnel
+STATUS_EVENT_TRIGGERS = {
+    "trg_conversation_status_events_insert": """
+        CREATE TRIGGER IF NOT EXISTS trg_conversation_status_events_insert
+        AFTER INSERT ON conversations
+        BEGIN
+            INSERT INTO conversation_status_events (conversation_id, from_status, to_status, changed_at)
+            VALUES (NEW.id, NULL, NEW.status, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+        END""",
+    "trg_conversation_status_events_update": """
+        CREATE TRIGGER IF NOT EXISTS trg_conversation_status_events_update
+        AFTER UPDATE OF status ON conversations WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            INSERT INTO conversation_status_events (conversation_id, from_status, to_status, changed_at)
+            VALUES (NEW.id, OLD.status, NEW.status, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+        END""",
+}
+
+
+def install_status_event_triggers(sync_conn):
+    """Create the status transition triggers. Run via conn.run_sync after create_all."""
+    for ddl in STATUS_EVENT_TRIGGERS.values():
+        sync_conn.execute(text(ddl))
+
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+class _Buckets:
+    """Aggregates collected in memory before one upsert per bucket."""
+
+    def __init__(self):
+        self.rows: dict[tuple[datetime, str, str], list] = defaultdict(lambda: [0, 0.0, None, None])
+
+    def add(self, ts: datetime, metric: str, dimension: str = "", value: float | None = None):
+        row = self.rows[(_hour(ts), metric, dimension)]
+        row[0] += 1
+        if value is not None:
+            row[1] += value
+            row[2] = value if row[2] is None else min(row[2], value)
+            row[3] = value if row[3] is None else max(row[3], value)
+
+
+async def _get_watermark(session, source: str, default: str) -> str:
+    value = await session.scalar(
+        select(AnalyticsWatermark.value).where(AnalyticsWatermark.source == source)
+    )
+    return value if value is not None else default
+
+
+async def _set_watermark(session, source: str, value: str) -> None:
+    await session.execute(
+        insert(AnalyticsWatermark)
+        .values(source=source, value=value)
+        .on_conflict_do_update(index_elements=["source"], set_={"value": value})
+    )
+
+
+async def _rollup_reply_latency(session, buckets: _Buckets) -> None:
+    """Seller reply latency: from the first buyer message of a run to the reply.
+
+    Only a delivered seller message ends a run; a failed send leaves the
+    buyer waiting. Reads only the messages past the watermark. For a run of
+    buyer messages that started before it, the start is looked up per
+    conversation: the first buyer message after that conversation's last
+    earlier delivered reply.
+    """
+    last_id = int(await _get_watermark(session, "messages", "0"))
+    max_id = await session.scalar(select(Message.id).order_by(Message.id.desc()).limit(1))
+    if not max_id or max_id <= last_id:
+        return
+
+    result = await session.execute(
+        select(Message.conversation_id, Message.role, Message.sent_at, Message.delivered)
+        .where(Message.id > last_id, Message.id <= max_id)
+        .order_by(Message.conversation_id, Message.sent_at, Message.id)
+    )
+    rows = result.all()
+
+    # Buyers already waiting at the watermark, by conversation
+    prior = aliased(Message)
+    last_reply_at = (
+        select(prior.sent_at)
+        .where(
+            prior.conversation_id == Message.conversation_id,
+            prior.id <= last_id,
+            prior.role != "buyer",
+            prior.delivered.is_(True),
+        )
+        .order_by(prior.sent_at.desc(), prior.id.desc())
+        .limit(1)
+        .correlate(Message)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(Message.conversation_id, func.min(Message.sent_at))
+        .where(
+            Message.conversation_id.in_({conv_id for conv_id, *_ in rows}),
+            Message.id <= last_id,
+            Message.role == "buyer",
+            or_(last_reply_at.is_(None), Message.sent_at > last_reply_at),
+        )
+        .group_by(Message.conversation_id)
+    )
+    waiting_at_watermark = dict(result.all())
+
+    conversation_id, waiting_since = None, None
+    for conv_id, role, sent_at, delivered in rows:
+        if conv_id != conversation_id:
+            conversation_id, waiting_since = conv_id, waiting_at_watermark.get(conv_id)
+        if role == "buyer":
+            waiting_since = waiting_since or sent_at
+        elif delivered:
+            if waiting_since is not None:
+                buckets.add(sent_at, "reply_latency", "", (sent_at - waiting_since).total_seconds())
+            waiting_since = None
+
+    await _set_watermark(session, "messages", str(max_id))
+
+
+async def _rollup_funnel(session, buckets: _Buckets) -> None:
+    """Conversations entering each status, per hour."""
+    last_id = int(await _get_watermark(session, "status_events", "0"))
+    result = await session.execute(
+        select(ConversationStatusEvent.id, ConversationStatusEvent.to_status, ConversationStatusEvent.changed_at)
+        .where(ConversationStatusEvent.id > last_id)
+        .order_by(ConversationStatusEvent.id)
+    )
+    rows = result.all()
+    for _, to_status, changed_at in rows:
+        buckets.add(changed_at, "funnel", to_status)
+    if rows:
+        await _set_watermark(session, "status_events", str(rows[-1][0]))
+
+
+async def _rollup_posting(session, buckets: _Buckets) -> None:
+    """Posting job durations and outcomes per platform, by completion time.
+
+    The watermark is a (completed_at, id) keyset, so a job committed later
+    with the same completed_at as the last one counted is still picked up.
+    """
+    last = await _get_watermark(session, "posting_jobs", encode_cursor(datetime.min, 0))
+    try:
+        last_completed_at, last_id = decode_cursor(last)
+    except ValueError:
+        # Watermarks written before the keyset were a bare timestamp
+        last_completed_at, last_id = datetime.fromisoformat(last), 0
+    result = await session.execute(
+        select(
+            PostingJob.id, PostingJob.platform, PostingJob.status,
+            PostingJob.started_at, PostingJob.completed_at,
+        )
+        .where(
+            PostingJob.completed_at.isnot(None),
+            tuple_(PostingJob.completed_at, PostingJob.id) > tuple_(last_completed_at, last_id),
+        )
+        .order_by(PostingJob.completed_at, PostingJob.id)
+    )
+    rows = result.all()
+    for _, platform, status, started_at, completed_at in rows:
+        buckets.add(completed_at, "posting_outcome", f"{platform}:{status}")
+        if started_at and status == "posted":
+            buckets.add(completed_at, "posting_duration", platform, (completed_at - started_at).total_seconds())
+    if rows:
+        await _set_watermark(session, "posting_jobs", encode_cursor(rows[-1].completed_at, rows[-1].id))
+
+
+async def run_rollup() -> int:
+    """Aggregate everything new since the watermarks. Returns buckets touched.
+
+    Aggregates and watermarks are written in one transaction, so a crash
+    can't count rows twice.
+    """
+    async with async_session() as session:
+        buckets = _Buckets()
+        await _rollup_reply_latency(session, buckets)
+        await _rollup_funnel(session, buckets)
+        await _rollup_posting(session, buckets)
+
+        for (bucket, metric, dimension), (count, total, low, high) in buckets.rows.items():
+            stmt = insert(AnalyticsHourly).values(
+                bucket=bucket, metric=metric, dimension=dimension,
+                count=count, total=total, min_value=low, max_value=high,
+            )
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=["bucket", "metric", "dimension"],
+                set_={
+                    "count": AnalyticsHourly.count + stmt.excluded.count,
+                    "total": AnalyticsHourly.total + stmt.excluded.total,
+                    "min_value": text(
+                        "min(coalesce(analytics_hourly.min_value, excluded.min_value), "
+                        "coalesce(excluded.min_value, analytics_hourly.min_value))"
+                    ),
+                    "max_value": text(
+                        "max(coalesce(analytics_hourly.max_value, excluded.max_value), "
+                        "coalesce(excluded.max_value, analytics_hourly.max_value))"
+                    ),
+                },
+            ))
+        await session.commit()
+    return len(buckets.rows)
+
+
+async def get_hourly(session, hours: int) -> dict:
+    """Pre-aggregated buckets for the last `hours` hours, grouped by metric."""
+    since = _hour(datetime.utcnow()) - timedelta(hours=hours - 1)
+    result = await session.execute(
+        select(AnalyticsHourly)
+        .where(AnalyticsHourly.bucket >= since)
+        .order_by(AnalyticsHourly.bucket)
+    )
+    series: dict[str, list[dict]] = defaultdict(list)
+    totals: dict[str, dict[str, dict]] = defaultdict(dict)
+    for row in result.scalars():
+        series[row.metric].append({
+            "bucket": row.bucket.isoformat(),
+            "dimension": row.dimension,
+            "count": row.count,
+            "avg": round(row.total / row.count, 2) if row.count and row.min_value is not None else None,
+            "min": row.min_value,
+            "max": row.max_value,
+        })
+        agg = totals[row.metric].setdefault(row.dimension, {"count": 0, "total": 0.0})
+        agg["count"] += row.count
+        agg["total"] += row.total
+
+    funnel = {stage: totals["funnel"].get(stage, {}).get("count", 0) for stage in FUNNEL_STAGES}
+    latency = totals["reply_latency"].get("", {"count": 0, "total": 0.0})
+    return {
+        "since": since.isoformat(),
+        "reply_latency": {
+            "count": latency["count"],
+            "avg_s": round(latency["total"] / latency["count"], 2) if latency["count"] else None,
+            "buckets": series["reply_latency"],
+        },
+        "funnel": {
+            "stages": funnel,
+            "buckets": series["funnel"],
+        },
+        "posting": {
+            "duration_by_platform": {
+                platform: round(agg["total"] / agg["count"], 2)
+                for platform, agg in totals["posting_duration"].items() if agg["count"]
+            },
+            "outcomes": {dim: agg["count"] for dim, agg in totals["posting_outcome"].items()},
+            "buckets": series["posting_duration"] + series["posting_outcome"],
+        },
+    }
+
+
+class AnalyticsRollup:
+    """Background job that runs the rollup every settings.analytics_rollup_interval seconds."""
+
+    def __init__(self):
+        self._running = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Analytics rollup started")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Analytics rollup stopped")
+
+    async def _run(self):
+        while self._running:
+            try:
+                touched = await run_rollup()
+                logger.debug(f"[analytics_rollup] Updated {touched} buckets")
+            except Exception as e:
+                logger.error(f"Analytics rollup error: {e}")
+            await asyncio.sleep(settings.analytics_rollup_interval)
+
+
+analytics_rollup = AnalyticsRollup()
@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from ..config import settings
+from .message_dedup import ANCHOR_SIZE, KnownMessage, known_message
+
+
+@dataclass
+class ConversationContext:
+    """What the monitor needs to know about a buyer's conversation without a DB lookup."""
+    buyer_id: int
+    listing_id: int | None
+    listing_title: str  # listing title as shown in the chat, used to match
+    conversation_id: int
+    status: str
+    message_count: int = 0
+    # Last ANCHOR_SIZE stored messages the chat shows (position and
+    # fingerprint), valid while message_count matches. None until loaded.
+    tail: list[KnownMessage] | None = None
+    cached_at: float = field(default_factory=time.monotonic)
+
+
+class ConversationContextCache:
+    """Write-through cache of conversation context, keyed by normalized buyer name.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted once `max_size` is reached. The unit of work updates entries as
+    it commits; anything else that changes a conversation (the conversations
+    API, closing competing conversations) invalidates it instead.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, ConversationContext] = OrderedDict()
+
+    def get(self, buyer_name: str, listing_title: str) -> ConversationContext | None:
+        """Return the cached context if it is fresh and for the same listing."""
+        ctx = self._entries.get(buyer_name)
+        if ctx is None or ctx.listing_title != listing_title:
+            return None
+        if time.monotonic() - ctx.cached_at > self.ttl:
+            del self._entries[buyer_name]
+            return None
+        self._entries.move_to_end(buyer_name)
+        return ctx
+
+    def put(self, buyer_name: str, listing_title: str, buyer_id: int, conversation) -> ConversationContext:
+        ctx = ConversationContext(
+            buyer_id=buyer_id,
+            listing_id=conversation.listing_id,
+            listing_title=listing_title,
+            conversation_id=conversation.id,
+            status=conversation.status,
+            message_count=conversation.message_count or 0,
+        )
+        self._entries[buyer_name] = ctx
+        self._entries.move_to_end(buyer_name)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return ctx
+
+    def record_commit(self, conversation, messages: list) -> None:
+        """Write-through after a unit of work commit on this conversation."""
+        ctx = self._find(conversation.id)
+        if ctx is None:
+            return
+        ctx.status = conversation.status
+        ctx.listing_id = conversation.listing_id
+        ctx.message_count = conversation.message_count or 0
+        if messages and ctx.tail is not None:
+            # Undelivered seller messages never show up in the chat
+            shown = [known_message(m) for m in messages if m.role == "buyer" or m.delivered]
+            ctx.tail = (ctx.tail + shown)[-ANCHOR_SIZE:]
+
+    def invalidate(self, buyer_name: str) -> None:
+        self._entries.pop(buyer_name, None)
+
+    def invalidate_conversation(self, conversation_id: int) -> None:
+        for name, ctx in list(self._entries.items()):
+            if ctx.conversation_id == conversation_id:
+                del self._entries[name]
+
+    def invalidate_listing(self, listing_id: int, except_conversation_id: int | None = None) -> None:
+        """Drop every conversation on a listing, e.g. after closing competing ones."""
+        for name, ctx in list(self._entries.items()):
+            if ctx.listing_id == listing_id and ctx.conversation_id != except_conversation_id:
+                del self._entries[name]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _find(self, conversation_id: int) -> ConversationContext | None:
+        for ctx in self._entries.values():
+            if ctx.conversation_id == conversation_id:
+                return ctx
+        return None
+
+
+# Global cache shared by the monitor and the conversations API
+context_cache = ConversationContextCache(
+    ttl=settings.context_cache_ttl, max_size=settings.context_cache_size
+)
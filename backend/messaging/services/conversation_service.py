@@ -1,11 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from ..models.buyer import Buyer
 from ..models.conversation import Conversation
 from ..models.message import Message
+from .cursors import decode_cursor, encode_cursor
+from .event_broadcaster import event_broadcaster
+from .message_dedup import message_fingerprint
+from .payment_service import PaymentService
 
 
 class ConversationService:
@@ -49,6 +55,71 @@ class ConversationService:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_light(
+        session: AsyncSession, conversation_id: int
+    ) -> Conversation | None:
+        """Get a conversation row alone; touching buyer, listing or messages raises."""
+        result = await session.execute(
+            select(Conversation)
+            .options(raiseload("*"))
+            .where(Conversation.id == conversation_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_detail(
+        session: AsyncSession,
+        conversation_id: int,
+        limit: int = 50,
+        before: str | None = None,
+    ) -> tuple[Conversation | None, str | None]:
+        """Get a conversation with buyer, listing and one page of messages.
+
+        The page holds the newest `limit` messages older than the `before`
+        cursor, oldest first. Returns (conversation, cursor for the
+        previous page); raises ValueError for a malformed cursor.
+        """
+        result = await session.execute(
+            select(Conversation)
+            .options(
+                selectinload(Conversation.buyer),
+                selectinload(Conversation.listing),
+                raiseload(Conversation.messages),
+            )
+            .where(Conversation.id == conversation_id)
+        )
+        conversation = result.scalar_one_or_none()
+        if not conversation:
+            return None, None
+
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if before:
+            sent_at, message_id = decode_cursor(before)
+            query = query.where(tuple_(Message.sent_at, Message.id) < tuple_(sent_at, message_id))
+        query = query.order_by(Message.sent_at.desc(), Message.id.desc()).limit(limit + 1)
+        messages = list((await session.execute(query)).scalars().all())
+
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = encode_cursor(messages[-1].sent_at, messages[-1].id)
+        # Populate the relationship without marking it changed
+        set_committed_value(conversation, "messages", list(reversed(messages)))
+        return conversation, next_cursor
+
+    @staticmethod
+    async def get_with_listing(
+        session: AsyncSession, conversation_id: int
+    ) -> Conversation | None:
+        """Get a conversation and its listing in a single query."""
+        result = await session.execute(
+            select(Conversation)
+            .options(joinedload(Conversation.listing))
+            .where(Conversation.id == conversation_id)
+        )
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def get_or_create(
         session: AsyncSession,
@@ -56,7 +127,12 @@ class ConversationService:
         listing_id: int | None = None,
         fb_thread_id: str | None = None,
     ) -> Conversation:
-        """Get existing conversation or create a new one."""
+        """Get existing conversation or create a new one.
+
+        A given thread id was just captured from a verified visit, so it
+        replaces whatever is stored (nothing, or an id that no longer opens
+        this thread) and later visits can open the thread directly.
+        """
         query = select(Conversation).where(Conversation.buyer_id == buyer_id)
         if listing_id:
             query = query.where(Conversation.listing_id == listing_id)
@@ -65,6 +141,9 @@ class ConversationService:
         conversation = result.scalar_one_or_none()
 
         if conversation:
+            if fb_thread_id and conversation.fb_thread_id != fb_thread_id:
+                conversation.fb_thread_id = fb_thread_id
+                await session.commit()
             return conversation
 
         conversation = Conversation(
@@ -77,6 +156,33 @@ class ConversationService:
         await session.refresh(conversation)
         return conversation
 
+    @staticmethod
+    async def clear_thread_id(session: AsyncSession, fb_thread_id: str) -> int:
+        """Forget a stored thread id that opened the wrong chat. Returns rows cleared."""
+        result = await session.execute(
+            update(Conversation)
+            .where(Conversation.fb_thread_id == fb_thread_id)
+            .values(fb_thread_id=None)
+        )
+        await session.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def get_thread_id(session: AsyncSession, fb_name: str, listing_id: int) -> str | None:
+        """Get the stored fb_thread_id of a buyer's conversation about a listing."""
+        result = await session.execute(
+            select(Conversation.fb_thread_id)
+            .join(Buyer, Conversation.buyer_id == Buyer.id)
+            .where(
+                Buyer.fb_name == fb_name,
+                Conversation.listing_id == listing_id,
+                Conversation.fb_thread_id.isnot(None),
+            )
+            .order_by(Conversation.last_message_at.desc().nullslast())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def update_status(
         session: AsyncSession, conversation_id: int, status: str
@@ -89,9 +195,14 @@ class ConversationService:
         if not conversation:
             return None
 
+        previous_status = conversation.status
         conversation.status = status
         await session.commit()
         await session.refresh(conversation)
+        event_broadcaster.publish_status(
+            conversation.id, conversation.listing_id, previous_status, status
+        )
+        PaymentService.on_status_change(conversation.id, status)
         return conversation
 
     @staticmethod
@@ -131,20 +242,46 @@ class ConversationService:
             content=content,
             delivered=delivered,
         )
+        position = await ConversationService.reserve_positions(session, conversation_id, 1)
+        if position is not None:
+            message.position = position
+            message.fingerprint = message_fingerprint(conversation_id, role, content, position)
         session.add(message)
 
-        # Update conversation last_message_at
-        result = await session.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
-        )
-        conversation = result.scalar_one_or_none()
+        # Update conversation last_message_at (identity map hit if already loaded)
+        conversation = await session.get(Conversation, conversation_id)
         if conversation:
             conversation.last_message_at = datetime.utcnow()
 
         await session.commit()
-        await session.refresh(message)
+        event_broadcaster.publish_message(message, conversation.listing_id if conversation else None)
         return message
 
+    @staticmethod
+    async def reserve_positions(
+        session: AsyncSession, conversation_id: int, count: int
+    ) -> int | None:
+        """Reserve `count` message positions and return the first one.
+
+        Bumps message_count in a single UPDATE ... RETURNING, which also takes
+        the SQLite write lock, so concurrent writers (the monitor and the
+        API) never get the same positions. None if the conversation is gone.
+        """
+        result = await session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(message_count=func.coalesce(Conversation.message_count, 0) + count)
+            .returning(Conversation.message_count)
+            .execution_options(synchronize_session=False)
+        )
+        end = result.scalar_one_or_none()
+        if end is None:
+            return None
+        # Keep the loaded row in step without marking it changed
+        conversation = await session.get(Conversation, conversation_id)
+        set_committed_value(conversation, "message_count", end)
+        return end - count
+
     @staticmethod
     async def get_messages(
         session: AsyncSession,
@@ -156,12 +293,47 @@ class ConversationService:
         result = await session.execute(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.sent_at.asc())
+            .order_by(Message.sent_at.asc(), Message.id.asc())
             .limit(limit)
             .offset(offset)
         )
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_messages_after(
+        session: AsyncSession,
+        conversation_id: int,
+        after_id: int = 0,
+        limit: int = 200,
+    ) -> list[Message]:
+        """Get the messages after `after_id` (oldest first), e.g. the ones not yet summarized."""
+        result = await session.execute(
+            select(Message)
+            .where(Message.conversation_id == conversation_id, Message.id > after_id)
+            .order_by(Message.id.desc())
+            .limit(limit)
+        )
+        return list(reversed(result.scalars().all()))
+
+    @staticmethod
+    async def get_recent_messages(
+        session: AsyncSession,
+        conversation_id: int,
+        role: str | None = None,
+        limit: int = 10,
+    ) -> list[Message]:
+        """Get the last `limit` messages of a conversation (optionally one role), oldest first."""
+        query = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.id.desc())
+            .limit(limit)
+        )
+        if role:
+            query = query.where(Message.role == role)
+        result = await session.execute(query)
+        return list(reversed(result.scalars().all()))
+
     @staticmethod
     async def update_offer(
         session: AsyncSession, conversation_id: int, offer: float
@@ -207,6 +379,9 @@ class ConversationService:
         for conv in conversations:
             conv.status = "closed"
         await session.commit()
+        for conv in conversations:
+            event_broadcaster.publish_status(conv.id, listing_id, "active", "closed")
+            PaymentService.on_status_change(conv.id, "closed")
         return len(conversations)
 
     @staticmethod
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """One connected event stream. Events wait in a bounded queue until sent."""
+
+    def __init__(self, conversation_id: int | None = None, listing_id: int | None = None):
+        self.conversation_id = conversation_id
+        self.listing_id = listing_id
+        # None in the queue means the subscriber was dropped
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=settings.sse_queue_size)
+
+    def wants(self, event: dict) -> bool:
+        data = event["data"]
+        if self.conversation_id is not None and data.get("conversation_id") != self.conversation_id:
+            return False
+        if self.listing_id is not None and data.get("listing_id") != self.listing_id:
+            return False
+        return True
+
+
+class EventBroadcaster:
+    """In-process fan-out of conversation events to SSE clients.
+
+    publish() never waits: each subscriber has a queue of
+    settings.sse_queue_size events, and one that falls that far behind is
+    dropped instead of holding up the writer or buffering without bound.
+    A dropped client gets an "overflow" event and should refetch.
+    """
+
+    def __init__(self):
+        self._subscribers: set[Subscriber] = set()
+        self.counters = {"published": 0, "delivered": 0, "dropped_clients": 0}
+
+    def subscribe(self, conversation_id: int | None = None, listing_id: int | None = None) -> Subscriber:
+        subscriber = Subscriber(conversation_id, listing_id)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event_type: str, data: dict) -> None:
+        if not self._subscribers:
+            return
+        self.counters["published"] += 1
+        event = {"event": event_type, "data": data}
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+                self.counters["delivered"] += 1
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        # Replace the backlog with the drop marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        self.counters["dropped_clients"] += 1
+        logger.warning("[event_broadcaster] Dropped a slow event stream client")
+
+    def publish_message(self, message, listing_id: int | None) -> None:
+        """Publish a committed message."""
+        self.publish("message", {
+            "id": message.id,
+            "conversation_id": message.conversation_id,
+            "listing_id": listing_id,
+            "role": message.role,
+            "content": message.content,
+            "sent_at": (message.sent_at or datetime.utcnow()).isoformat(),
+            "delivered": message.delivered,
+        })
+
+    def publish_status(
+        self, conversation_id: int, listing_id: int | None, from_status: str | None, to_status: str
+    ) -> None:
+        """Publish a committed status transition."""
+        if from_status == to_status:
+            return
+        self.publish("status", {
+            "conversation_id": conversation_id,
+            "listing_id": listing_id,
+            "from_status": from_status,
+            "to_status": to_status,
+        })
+
+    def snapshot(self) -> dict:
+        return {"subscribers": len(self._subscribers), **self.counters}
+
+
+event_broadcaster = EventBroadcaster()
@@ -0,0 +1,91 @@
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+
+# How many of the last stored messages have to line up with the extracted ones
+ANCHOR_SIZE = 3
+
+
+def _norm(content: str) -> str:
+    return " ".join(content.split())
+
+
+def message_fingerprint(conversation_id: int, role: str, content: str, position: int) -> str:
+    """Stable id for a message: same conversation, role, text and position → same hash."""
+    raw = f"{conversation_id}\x1f{role}\x1f{_norm(content)}\x1f{position}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class KnownMessage:
+    """A stored message as the chat shows it: where it sits and what it hashes to."""
+    position: int
+    fingerprint: str
+    role: str
+    content: str
+
+
+def known_message(message) -> KnownMessage:
+    """KnownMessage for a Message row.
+
+    Rows stored before positions were recorded get position -1 and a
+    fingerprint computed on the spot, so they still align by content.
+    """
+    if message.position is not None and message.fingerprint:
+        return KnownMessage(message.position, message.fingerprint, message.role, message.content)
+    fingerprint = message_fingerprint(message.conversation_id, message.role, message.content, -1)
+    return KnownMessage(-1, fingerprint, message.role, message.content)
+
+
+def align_new_messages(
+    conversation_id: int, extracted: list[tuple[str, str]], tail: list[KnownMessage]
+) -> list[str] | None:
+    """Return the buyer messages after the point where `extracted` lines up with `tail`.
+
+    `extracted` is the chat as (role, content) pairs and `tail` the last
+    stored messages shown in it, both oldest first. An extracted message
+    matches a stored one if it hashes to the stored fingerprint at the
+    stored position. The latest end of the chat where the whole tail (up to
+    ANCHOR_SIZE messages) matches wins; failing that, shorter anchors are
+    tried. Keeping seller messages in the comparison is what tells a
+    repeated "ok" apart from the one already answered. Cost depends on the
+    extraction window only. Returns None if nothing lines up.
+    """
+    if not tail:
+        return [content for role, content in extracted if role == "buyer"]
+
+    for size in range(min(ANCHOR_SIZE, len(tail)), 0, -1):
+        anchor = tail[-size:]
+        for end in range(len(extracted) - 1, size - 2, -1):
+            window = extracted[end - size + 1:end + 1]
+            if all(
+                message_fingerprint(conversation_id, role, content, known.position) == known.fingerprint
+                for (role, content), known in zip(window, anchor)
+            ):
+                return [content for role, content in extracted[end + 1:] if role == "buyer"]
+    return None
+
+
+def find_new_messages(
+    conversation_id: int, extracted: list[tuple[str, str]], known: list[KnownMessage]
+) -> list[str]:
+    """Return the buyer messages in `extracted` that come after the last known message.
+
+    Uses align_new_messages. If nothing lines up (the chat changed outside
+    the app), each known buyer message accounts for one extracted message
+    with the same text, so a repeated "ok" still counts as new.
+    """
+    aligned = align_new_messages(conversation_id, extracted, known[-ANCHOR_SIZE:])
+    if aligned is not None:
+        return aligned
+
+    remaining = Counter(_norm(m.content) for m in known if m.role == "buyer")
+    new_messages = []
+    for role, content in extracted:
+        if role != "buyer":
+            continue
+        if remaining[_norm(content)]:
+            remaining[_norm(content)] -= 1
+        else:
+            new_messages.append(content)
+    return new_messages
@@ -1,20 +1,125 @@
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
 
 import stripe
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database.models.listing import Listing
 from ..config import settings
 from ..models.transaction import Transaction
+from ..models.buyer import Buyer
 from ..models.conversation import Conversation
+from .cursors import decode_cursor, encode_cursor
+from .stripe_client import stripe_call
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.stripe_secret_key
+# Checkout sessions expire after 24h; don't hand out one that is about to
+PREPARED_CHECKOUT_MAX_AGE = 23 * 3600  # seconds
+
+# Statuses in which a prepared checkout can still be used: agreed, waiting
+# for the address. Any other status releases it.
+PREPARED_CHECKOUT_STATUSES = ("pending", "awaiting_confirm")
+
+
+@dataclass
+class _PreparedCheckout:
+    amount_cents: int
+    task: asyncio.Task
+    created_at: float
+
+
+# conversation id -> checkout session being created ahead of address confirmation
+_prepared_checkouts: dict[int, _PreparedCheckout] = {}
 
 
 class PaymentService:
+    @staticmethod
+    def prepare_checkout(conversation_id: int, agreed_price: float) -> None:
+        """Start creating the Stripe checkout session in the background once a price is agreed.
+
+        create_checkout picks it up at address confirmation if the amount
+        still matches, so the payment link goes out without a Stripe round
+        trip. A new price replaces the prepared session.
+        """
+        amount_cents = int(agreed_price * 100)
+        PaymentService._sweep_prepared_checkouts()
+        existing = _prepared_checkouts.get(conversation_id)
+        if existing and existing.amount_cents == amount_cents:
+            return
+        PaymentService.discard_prepared_checkout(conversation_id)
+        task = asyncio.create_task(
+            PaymentService._create_stripe_session(conversation_id, amount_cents)
+        )
+        # Failures are handled (and logged) when the session is taken
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _prepared_checkouts[conversation_id] = _PreparedCheckout(amount_cents, task, time.monotonic())
+        logger.info(f"Preparing checkout for conversation {conversation_id} at {amount_cents} cents")
+
+    @staticmethod
+    def discard_prepared_checkout(conversation_id: int) -> None:
+        """Drop a prepared checkout session (deal closed or price changed)."""
+        prepared = _prepared_checkouts.pop(conversation_id, None)
+        if prepared and not prepared.task.done():
+            prepared.task.cancel()
+
+    @staticmethod
+    def on_status_change(conversation_id: int, status: str) -> None:
+        """Release the prepared checkout once a committed status can no longer use it."""
+        if status not in PREPARED_CHECKOUT_STATUSES:
+            PaymentService.discard_prepared_checkout(conversation_id)
+
+    @staticmethod
+    def _sweep_prepared_checkouts() -> None:
+        """Drop prepared sessions too old to hand out (the deal went quiet)."""
+        cutoff = time.monotonic() - PREPARED_CHECKOUT_MAX_AGE
+        for conversation_id in [
+            cid for cid, prepared in _prepared_checkouts.items() if prepared.created_at < cutoff
+        ]:
+            PaymentService.discard_prepared_checkout(conversation_id)
+
+    @staticmethod
+    async def _take_prepared_checkout(conversation_id: int, amount_cents: int):
+        """Return the prepared checkout session for this amount, or None."""
+        prepared = _prepared_checkouts.pop(conversation_id, None)
+        if not prepared or prepared.amount_cents != amount_cents:
+            return None
+        if time.monotonic() - prepared.created_at > PREPARED_CHECKOUT_MAX_AGE:
+            return None
+        try:
+            return await prepared.task
+        except (stripe.StripeError, asyncio.CancelledError) as e:
+            logger.warning(f"Prepared checkout for conversation {conversation_id} failed: {e}")
+            return None
+
+    @staticmethod
+    async def _create_stripe_session(conversation_id: int, amount_cents: int):
+        # Same key for prepared and on-demand creation: a fallback while the
+        # prepared request is still in flight gets the same session back
+        return await stripe_call(
+            "checkout.create",
+            stripe.checkout.Session.create_async,
+            idempotency_key=f"checkout-conv{conversation_id}-{amount_cents}",
+            payment_method_types=["card"],
+            line_items=[{
+                "price_data": {
+                    "currency": "usd",
+                    "product_data": {
+                        "name": f"Purchase - Conversation #{conversation_id}",
+                    },
+                    "unit_amount": amount_cents,
+                },
+                "quantity": 1,
+            }],
+            mode="payment",
+            success_url="http://localhost:3000/payment/success?session_id={CHECKOUT_SESSION_ID}",
+            cancel_url="http://localhost:3000/payment/cancel",
+        )
+
     @staticmethod
     async def create_checkout(session: AsyncSession, conversation_id: int) -> Transaction | None:
         """Create a Stripe Checkout Session and save the transaction."""
@@ -36,26 +141,17 @@ class PaymentService:
             logger.warning(f"Transaction already exists for conversation {conversation_id}")
             return None
 
-        try:
-            checkout_session = stripe.checkout.Session.create(
-                payment_method_types=["card"],
-                line_items=[{
-                    "price_data": {
-                        "currency": "usd",
-                        "product_data": {
-                            "name": f"Purchase - Conversation #{conversation_id}",
-                        },
-                        "unit_amount": amount_cents,
-                    },
-                    "quantity": 1,
-                }],
-                mode="payment",
-                success_url="http://localhost:3000/payment/success?session_id={CHECKOUT_SESSION_ID}",
-                cancel_url="http://localhost:3000/payment/cancel",
-            )
-        except stripe.StripeError as e:
-            logger.error(f"Stripe checkout creation failed: {e}")
-            return None
+        checkout_session = await PaymentService._take_prepared_checkout(conversation_id, amount_cents)
+        if checkout_session is None:
+            try:
+                checkout_session = await PaymentService._create_stripe_session(
+                    conversation_id, amount_cents
+                )
+            except stripe.StripeError as e:
+                logger.error(f"Stripe checkout creation failed: {e}")
+                return None
+        else:
+            logger.info(f"Using prepared checkout for conversation {conversation_id}")
 
         txn = Transaction(
             conversation_id=conversation_id,
@@ -73,8 +169,16 @@ class PaymentService:
         return txn
 
     @staticmethod
-    async def handle_checkout_complete(session: AsyncSession, stripe_session_id: str):
-        """Handle Stripe checkout.session.completed webhook."""
+    async def handle_checkout_complete(
+        session: AsyncSession, stripe_session_id: str, payment_intent: str | None = None
+    ) -> Transaction | None:
+        """Handle Stripe checkout.session.completed webhook.
+
+        Idempotent: a transaction that is already past "pending" is left
+        alone. `payment_intent` comes from the event payload when available,
+        which saves retrieving the checkout session from Stripe. Returns the
+        transaction if it was marked payment_held, else None.
+        """
         result = await session.execute(
             select(Transaction).where(
                 Transaction.stripe_checkout_session_id == stripe_session_id
@@ -83,19 +187,28 @@ class PaymentService:
         txn = result.scalar_one_or_none()
         if not txn:
             logger.error(f"No transaction found for stripe session {stripe_session_id}")
-            return
+            return None
+        if txn.status != "pending":
+            logger.info(f"Transaction {txn.id} already {txn.status}, skipping checkout completion")
+            return None
 
-        try:
-            stripe_session = stripe.checkout.Session.retrieve(stripe_session_id)
-            txn.stripe_payment_intent_id = stripe_session.payment_intent
-        except stripe.StripeError as e:
-            logger.error(f"Failed to retrieve stripe session: {e}")
+        if payment_intent:
+            txn.stripe_payment_intent_id = payment_intent
+        else:
+            try:
+                stripe_session = await stripe_call(
+                    "checkout.retrieve", stripe.checkout.Session.retrieve_async, stripe_session_id
+                )
+                txn.stripe_payment_intent_id = stripe_session.payment_intent
+            except stripe.StripeError as e:
+                logger.error(f"Failed to retrieve stripe session: {e}")
 
         txn.status = "payment_held"
         txn.paid_at = datetime.utcnow()
         txn.updated_at = datetime.utcnow()
         await session.commit()
         logger.info(f"Payment held for transaction {txn.id}")
+        return txn
 
     @staticmethod
     async def add_tracking(session: AsyncSession, transaction_id: int, tracking_number: str) -> Transaction | None:
@@ -160,7 +273,10 @@ class PaymentService:
             return
 
         try:
-            transfer = stripe.Transfer.create(
+            transfer = await stripe_call(
+                "transfer.create",
+                stripe.Transfer.create_async,
+                idempotency_key=f"transfer-txn{txn.id}",
                 amount=txn.amount_cents,
                 currency="usd",
                 destination=connected_account_id,
@@ -186,7 +302,12 @@ class PaymentService:
             return
 
         try:
-            stripe.Refund.create(payment_intent=txn.stripe_payment_intent_id)
+            await stripe_call(
+                "refund.create",
+                stripe.Refund.create_async,
+                idempotency_key=f"refund-txn{txn.id}",
+                payment_intent=txn.stripe_payment_intent_id,
+            )
             txn.status = "refunded"
             txn.refunded_at = datetime.utcnow()
             txn.updated_at = datetime.utcnow()
@@ -196,12 +317,61 @@ class PaymentService:
             logger.error(f"Refund failed for transaction {transaction_id}: {e}")
 
     @staticmethod
-    async def get_all(session: AsyncSession) -> list[Transaction]:
-        """Get all transactions ordered by newest first."""
+    async def list_page(
+        session: AsyncSession,
+        statuses: list[str] | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+        expand: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        """One page of transactions, newest first, as plain rows.
+
+        Keyset pagination on (created_at, id): `cursor` is the value
+        returned with the previous page. Only transaction columns are read
+        unless `expand` adds listing title, buyer name and conversation
+        status through joins in the same query. Returns (rows, next_cursor).
+        """
+        columns = list(Transaction.__table__.columns)
+        query = select(*columns)
+        if expand:
+            query = (
+                select(
+                    *columns,
+                    Listing.title.label("listing_title"),
+                    Buyer.fb_name.label("buyer_name"),
+                    Conversation.status.label("conversation_status"),
+                )
+                .outerjoin(Listing, Listing.id == Transaction.listing_id)
+                .outerjoin(Buyer, Buyer.id == Transaction.buyer_id)
+                .outerjoin(Conversation, Conversation.id == Transaction.conversation_id)
+            )
+        if statuses:
+            query = query.where(Transaction.status.in_(statuses))
+        if cursor:
+            created_at, txn_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Transaction.created_at, Transaction.id) < tuple_(created_at, txn_id)
+            )
+        query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)
+
+        rows = [dict(row) for row in (await session.execute(query)).mappings()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    @staticmethod
+    async def totals_by_status(session: AsyncSession) -> dict[str, dict]:
+        """Transaction count and amount per status, over every transaction."""
         result = await session.execute(
-            select(Transaction).order_by(Transaction.created_at.desc())
+            select(Transaction.status, func.count(), func.sum(Transaction.amount_cents))
+            .group_by(Transaction.status)
         )
-        return list(result.scalars().all())
+        return {
+            status: {"count": count, "amount_cents": amount_cents or 0}
+            for status, count, amount_cents in result.all()
+        }
 
     @staticmethod
     async def get_by_id(session: AsyncSession, transaction_id: int) -> Transaction | None:
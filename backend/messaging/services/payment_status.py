@@ -0,0 +1,149 @@
+import asyncio
+import calendar
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import stripe
+
+from ..config import settings
+from .payment_worker import payment_worker
+from .stripe_client import stripe_call
+
+logger = logging.getLogger(__name__)
+
+# Checkout sessions expire after 24h, so older ones can't complete anymore
+CHECKOUT_LIFETIME = timedelta(hours=24)
+MAX_LIST_PAGES = 5
+
+
+@dataclass
+class _PollState:
+    created_at: datetime
+    interval: float
+    next_check_at: float  # time.monotonic()
+
+
+class PaymentStatusTracker:
+    """Decides when a pending transaction is worth asking Stripe about.
+
+    The Transaction row comes first: once the webhook consumer has marked
+    it paid there is nothing to poll. Otherwise each checkout session is
+    checked with exponential backoff (stripe_poll_initial doubling up to
+    stripe_poll_max), and a check is one shared listing of recently
+    completed checkout sessions rather than a retrieve per buyer. The
+    listing result is cached, so other buyers due at the same time don't
+    trigger another call.
+    """
+
+    def __init__(self):
+        self._states: dict[str, _PollState] = {}
+        # checkout session id -> payment intent, for paid sessions seen in a listing
+        self._paid: dict[str, str | None] = {}
+        self._last_list_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.counters = {"checks": 0, "settled_in_db": 0, "backoff_skips": 0, "stripe_lists": 0, "confirmed": 0, "expired": 0}
+
+    async def check(self, db, txn) -> bool:
+        """Bring a transaction's payment status up to date. True once it is payment_held."""
+        self.counters["checks"] += 1
+        session_id = txn.stripe_checkout_session_id
+        if txn.status != "pending" or not session_id:
+            self.counters["settled_in_db"] += 1
+            if session_id:
+                self._states.pop(session_id, None)
+                self._paid.pop(session_id, None)
+            return txn.status == "payment_held"
+
+        self._prune()
+        created_at = txn.created_at or datetime.utcnow()
+        if created_at < datetime.utcnow() - CHECKOUT_LIFETIME and session_id not in self._paid:
+            # Past the listing window: only the webhook can still settle it
+            self.counters["expired"] += 1
+            return False
+
+        now = time.monotonic()
+        state = self._states.get(session_id)
+        if state is None:
+            # First look is immediate; backoff starts after that
+            state = _PollState(created_at, settings.stripe_poll_initial, now)
+            self._states[session_id] = state
+
+        if session_id not in self._paid:
+            if now < state.next_check_at:
+                self.counters["backoff_skips"] += 1
+                return False
+            await self._refresh()
+
+        if session_id in self._paid:
+            await self._mark_paid(db, txn, self._paid.pop(session_id))
+            self._states.pop(session_id, None)
+            return True
+
+        state.next_check_at = now + state.interval
+        state.interval = min(state.interval * 2, settings.stripe_poll_max)
+        return False
+
+    def _prune(self) -> None:
+        """Forget sessions past the checkout lifetime; abandoned checkouts never settle.
+
+        Sessions already seen paid stay until their transaction is marked.
+        """
+        cutoff = datetime.utcnow() - CHECKOUT_LIFETIME
+        for session_id in [
+            sid for sid, state in self._states.items()
+            if state.created_at < cutoff and sid not in self._paid
+        ]:
+            del self._states[session_id]
+
+    async def _refresh(self) -> None:
+        """List completed checkout sessions since the oldest tracked one, at most once per stripe_poll_initial."""
+        async with self._lock:
+            # Sessions may have settled while we waited for the lock
+            if not self._states:
+                return
+            now = time.monotonic()
+            if self._last_list_at is not None and now - self._last_list_at < settings.stripe_poll_initial:
+                return
+            self._last_list_at = now
+
+            oldest = max(
+                min(state.created_at for state in self._states.values()),
+                datetime.utcnow() - CHECKOUT_LIFETIME,
+            )
+            params = {
+                "status": "complete",
+                "created": {"gte": calendar.timegm(oldest.timetuple()) - 60},
+                "limit": 100,
+            }
+            try:
+                for _ in range(MAX_LIST_PAGES):
+                    self.counters["stripe_lists"] += 1
+                    page = await stripe_call(
+                        "checkout.list", stripe.checkout.Session.list_async, **params
+                    )
+                    for checkout in page.data:
+                        if checkout.payment_status == "paid" and checkout.id in self._states:
+                            self._paid[checkout.id] = checkout.payment_intent
+                    if not page.has_more or not page.data:
+                        break
+                    params["starting_after"] = page.data[-1].id
+            except stripe.StripeError as e:
+                logger.error(f"Failed to list Stripe checkout sessions: {e}")
+
+    async def _mark_paid(self, db, txn, payment_intent: str | None) -> None:
+        txn.stripe_payment_intent_id = payment_intent
+        txn.status = "payment_held"
+        txn.paid_at = datetime.utcnow()
+        txn.updated_at = datetime.utcnow()
+        await db.commit()
+        payment_worker.schedule_refund(txn)
+        self.counters["confirmed"] += 1
+        logger.info(f"Payment confirmed via Stripe polling for transaction {txn.id}")
+
+    def snapshot(self) -> dict:
+        return {"tracked_sessions": len(self._states), **self.counters}
+
+
+payment_status_tracker = PaymentStatusTracker()
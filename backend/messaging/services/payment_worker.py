@@ -1,26 +1,41 @@
 import asyncio
+import heapq
 import logging
 from datetime import datetime, timedelta
 
 from sqlalchemy import select
 
 from database.connection import async_session
+from ..config import settings
 from ..models.transaction import Transaction
 from .payment_service import PaymentService
 
 logger = logging.getLogger(__name__)
 
-POLL_INTERVAL = 10  # seconds
 DELIVERY_DELAY = 30  # seconds (dummy: marks delivered after 30s)
 REFUND_DEADLINE_DAYS = 7
+# Full reload of due times, for transactions changed outside this process
+REHYDRATE_INTERVAL = 300  # seconds
 
 
 class PaymentWorker:
-    """Background worker that monitors shipments and handles auto-delivery/refunds."""
+    """Background worker that auto-confirms deliveries and auto-refunds on deadlines.
+
+    Due times (shipped_at + DELIVERY_DELAY, paid_at + REFUND_DEADLINE_DAYS)
+    sit in a min-heap and the worker sleeps until the earliest one, or
+    until something new is scheduled. The heap is rebuilt from the DB on
+    start and every REHYDRATE_INTERVAL; every due item is re-checked
+    against the DB before acting, so stale entries are harmless.
+    """
 
     def __init__(self):
         self._running = False
         self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        # (due_at, kind, transaction_id); kind is "delivery" or "refund"
+        self._heap: list[tuple[datetime, str, int]] = []
+        self._scheduled: dict[tuple[str, int], datetime] = {}
+        self._last_rehydrate: datetime | None = None
 
     async def start(self):
         if self._running:
@@ -39,44 +54,123 @@ class PaymentWorker:
                 pass
         logger.info("Payment worker stopped")
 
+    def schedule_delivery(self, txn: Transaction):
+        """Schedule auto-delivery for a transaction that was just shipped."""
+        if txn.shipped_at:
+            self._schedule("delivery", txn.id, txn.shipped_at + timedelta(seconds=DELIVERY_DELAY))
+
+    def schedule_refund(self, txn: Transaction):
+        """Schedule the no-tracking refund deadline for a transaction that was just paid."""
+        if txn.paid_at:
+            self._schedule("refund", txn.id, txn.paid_at + timedelta(days=REFUND_DEADLINE_DAYS))
+
+    def _schedule(self, kind: str, transaction_id: int, due_at: datetime):
+        key = (kind, transaction_id)
+        if self._scheduled.get(key) == due_at:
+            return
+        self._scheduled[key] = due_at
+        heapq.heappush(self._heap, (due_at, kind, transaction_id))
+        self._wake.set()
+
     async def _run(self):
         while self._running:
             try:
-                await self._check_deliveries()
-                await self._check_refunds()
+                now = datetime.utcnow()
+                if (
+                    self._last_rehydrate is None
+                    or (now - self._last_rehydrate).total_seconds() >= REHYDRATE_INTERVAL
+                ):
+                    await self._rehydrate()
+                await self._run_due()
             except Exception as e:
                 logger.error(f"Payment worker error: {e}")
-            await asyncio.sleep(POLL_INTERVAL)
+            await self._sleep_until_next()
 
-    async def _check_deliveries(self):
-        """Auto-confirm delivery for shipped transactions after DELIVERY_DELAY seconds."""
+    async def _rehydrate(self):
+        """Load due times for all shipped and payment_held transactions."""
         async with async_session() as session:
-            cutoff = datetime.utcnow() - timedelta(seconds=DELIVERY_DELAY)
             result = await session.execute(
-                select(Transaction)
-                .where(Transaction.status == "shipped")
-                .where(Transaction.shipped_at <= cutoff)
+                select(Transaction.id, Transaction.status, Transaction.shipped_at, Transaction.paid_at)
+                .where(Transaction.status.in_(("shipped", "payment_held")))
             )
-            transactions = result.scalars().all()
-
-            for txn in transactions:
-                logger.info(f"Auto-confirming delivery for transaction {txn.id}")
-                await PaymentService.confirm_delivery(session, txn.id)
+            rows = result.all()
+        for txn_id, status, shipped_at, paid_at in rows:
+            if status == "shipped" and shipped_at:
+                self._schedule("delivery", txn_id, shipped_at + timedelta(seconds=DELIVERY_DELAY))
+            elif status == "payment_held" and paid_at:
+                self._schedule("refund", txn_id, paid_at + timedelta(days=REFUND_DEADLINE_DAYS))
+        self._last_rehydrate = datetime.utcnow()
+        logger.debug(f"[payment_worker] Rehydrated {len(rows)} transactions, {len(self._heap)} timers")
+
+    async def _run_due(self):
+        """Pop every due timer and process them concurrently."""
+        now = datetime.utcnow()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, kind, txn_id = heapq.heappop(self._heap)
+            # Skip entries superseded by a later schedule of the same item
+            if self._scheduled.get((kind, txn_id)) != due_at:
+                continue
+            del self._scheduled[(kind, txn_id)]
+            due.append((kind, txn_id))
+        if not due:
+            return
 
-    async def _check_refunds(self):
-        """Auto-refund if no tracking uploaded within REFUND_DEADLINE_DAYS of payment."""
+        semaphore = asyncio.Semaphore(settings.payment_worker_concurrency)
+
+        async def process(kind: str, txn_id: int):
+            async with semaphore:
+                if kind == "delivery":
+                    await self._confirm_delivery(txn_id)
+                else:
+                    await self._refund(txn_id)
+
+        results = await asyncio.gather(
+            *(process(kind, txn_id) for kind, txn_id in due), return_exceptions=True
+        )
+        for (kind, txn_id), result in zip(due, results):
+            if isinstance(result, Exception):
+                logger.error(f"Payment worker {kind} failed for transaction {txn_id}: {result}")
+
+    async def _sleep_until_next(self):
+        """Sleep until the earliest timer, the next rehydrate, or a new schedule."""
+        timeout = REHYDRATE_INTERVAL
+        if self._last_rehydrate is not None:
+            since = (datetime.utcnow() - self._last_rehydrate).total_seconds()
+            timeout = max(0.0, REHYDRATE_INTERVAL - since)
+        if self._heap:
+            timeout = min(timeout, max(0.0, (self._heap[0][0] - datetime.utcnow()).total_seconds()))
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _confirm_delivery(self, transaction_id: int):
+        """Auto-confirm delivery if the transaction is still shipped."""
         async with async_session() as session:
-            cutoff = datetime.utcnow() - timedelta(days=REFUND_DEADLINE_DAYS)
-            result = await session.execute(
-                select(Transaction)
-                .where(Transaction.status == "payment_held")
-                .where(Transaction.paid_at <= cutoff)
-            )
-            transactions = result.scalars().all()
-
-            for txn in transactions:
-                logger.info(f"Auto-refunding transaction {txn.id} (no tracking after {REFUND_DEADLINE_DAYS} days)")
-                await PaymentService.refund_buyer(session, txn.id)
+            txn = await PaymentService.get_by_id(session, transaction_id)
+            if not txn or txn.status != "shipped":
+                return
+            logger.info(f"Auto-confirming delivery for transaction {txn.id}")
+            await PaymentService.confirm_delivery(session, txn.id)
+
+    async def _refund(self, transaction_id: int):
+        """Auto-refund if tracking still hasn't been uploaded by the deadline."""
+        async with async_session() as session:
+            txn = await PaymentService.get_by_id(session, transaction_id)
+            if not txn or txn.status != "payment_held" or not txn.paid_at:
+                return
+            if txn.paid_at > datetime.utcnow() - timedelta(days=REFUND_DEADLINE_DAYS):
+                # paid_at moved; schedule for the new deadline
+                self.schedule_refund(txn)
+                return
+            logger.info(f"Auto-refunding transaction {txn.id} (no tracking after {REFUND_DEADLINE_DAYS} days)")
+            await PaymentService.refund_buyer(session, txn.id)
+
+    def snapshot(self) -> dict:
+        next_due = self._heap[0][0].isoformat() if self._heap else None
+        return {"running": self._running, "timers": len(self._scheduled), "next_due": next_due}
 
 
 payment_worker = PaymentWorker()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, text
+
+from database.connection import async_session
+from ..config import settings
+from ..models.stats_counter import StatsCounter
+
+logger = logging.getLogger(__name__)
+
+
+def _bump(name_sql: str, delta: int) -> str:
+    """Trigger statement adding delta to a counter, creating the row if needed."""
+    return (
+        f"INSERT INTO stats_counters (name, value) VALUES ({name_sql}, {delta}) "
+        f"ON CONFLICT(name) DO UPDATE SET value = value + {delta};"
+    )
+
+
+# Triggers catch every writer: both services, the seeder and raw SQL alike
+COUNTER_TRIGGERS = {
+    "trg_stats_messages_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_messages_insert AFTER INSERT ON messages
+        BEGIN {_bump("'messages'", 1)} END""",
+    "trg_stats_messages_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_messages_delete AFTER DELETE ON messages
+        BEGIN {_bump("'messages'", -1)} END""",
+    "trg_stats_buyers_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_buyers_insert AFTER INSERT ON buyers
+        BEGIN {_bump("'buyers'", 1)} END""",
+    "trg_stats_buyers_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_buyers_delete AFTER DELETE ON buyers
+        BEGIN {_bump("'buyers'", -1)} END""",
+    "trg_stats_conversations_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_conversations_insert AFTER INSERT ON conversations
+        BEGIN
+            {_bump("'conversations'", 1)}
+            {_bump("'conversations:' || NEW.status", 1)}
+        END""",
+    "trg_stats_conversations_status": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_conversations_status
+        AFTER UPDATE OF status ON conversations WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            {_bump("'conversations:' || OLD.status", -1)}
+            {_bump("'conversations:' || NEW.status", 1)}
+        END""",
+    "trg_stats_conversations_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_conversations_delete AFTER DELETE ON conversations
+        BEGIN
+            {_bump("'conversations'", -1)}
+            {_bump("'conversations:' || OLD.status", -1)}
+        END""",
+}
+
+
+def install_counter_triggers(sync_conn):
+    """Create the counter triggers. Run via conn.run_sync after create_all."""
+    for ddl in COUNTER_TRIGGERS.values():
+        sync_conn.execute(text(ddl))
+
+
+async def reconcile_counters() -> None:
+    """Recompute every counter from the tables, in one write transaction."""
+    async with async_session() as session:
+        # Taking the write lock first keeps triggers from interleaving
+        await session.execute(text("UPDATE stats_counters SET value = 0"))
+        await session.execute(text("""
+            INSERT INTO stats_counters (name, value)
+            SELECT 'messages', COUNT(*) FROM messages
+            UNION ALL SELECT 'buyers', COUNT(*) FROM buyers
+            UNION ALL SELECT 'conversations', COUNT(*) FROM conversations
+            UNION ALL SELECT 'conversations:' || status, COUNT(*) FROM conversations GROUP BY status
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value
+        """))
+        await session.commit()
+
+
+async def read_counters(session) -> dict[str, int]:
+    """All counters in one query."""
+    result = await session.execute(select(StatsCounter.name, StatsCounter.value))
+    return dict(result.all())
+
+
+class CounterReconciler:
+    """Background job that periodically corrects counter drift."""
+
+    def __init__(self):
+        self._running = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Stats counter reconciler started")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Stats counter reconciler stopped")
+
+    async def _run(self):
+        while self._running:
+            try:
+                await reconcile_counters()
+            except Exception as e:
+                logger.error(f"Stats counter reconcile error: {e}")
+            await asyncio.sleep(settings.stats_reconcile_interval)
+
+
+counter_reconciler = CounterReconciler()
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+
+import stripe
+
+from ..ai.client import LatencyHistogram
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+stripe.api_key = settings.stripe_secret_key
+# The SDK retries connection errors, 409s, lock timeouts and 5xx itself,
+# reusing the idempotency key of the original request
+stripe.max_network_retries = settings.stripe_max_retries
+
+
+class StripeStats:
+    """Latency and error counts per Stripe operation."""
+
+    def __init__(self):
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.errors: dict[str, int] = {}
+        self.timeouts: dict[str, int] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            operation: {
+                **histogram.snapshot(),
+                "errors": self.errors.get(operation, 0),
+                "timeouts": self.timeouts.get(operation, 0),
+            }
+            for operation, histogram in self.latency.items()
+        }
+
+
+stripe_stats = StripeStats()
+
+
+async def stripe_call(operation: str, method, *args, **params):
+    """Await a Stripe SDK *_async method with a deadline and record its latency.
+
+    `operation` names the call in the stats (e.g. "checkout.create"). Pass
+    `idempotency_key` for anything that creates money movement so that a
+    retry, in the SDK or by us after a crash, can't do it twice. A deadline
+    overrun is raised as stripe.APIConnectionError so callers only need to
+    handle stripe.StripeError.
+    """
+    histogram = stripe_stats.latency.setdefault(operation, LatencyHistogram())
+    started_at = time.monotonic()
+    try:
+        async with asyncio.timeout(settings.stripe_timeout):
+            return await method(*args, **params)
+    except TimeoutError:
+        stripe_stats.timeouts[operation] = stripe_stats.timeouts.get(operation, 0) + 1
+        stripe_stats.errors[operation] = stripe_stats.errors.get(operation, 0) + 1
+        raise stripe.APIConnectionError(
+            f"Stripe {operation} timed out after {settings.stripe_timeout:.0f}s"
+        )
+    except stripe.StripeError:
+        stripe_stats.errors[operation] = stripe_stats.errors.get(operation, 0) + 1
+        raise
+    finally:
+        histogram.record(time.monotonic() - started_at)
@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.conversation import Conversation
+from ..models.message import Message
+from .context_cache import context_cache
+from .conversation_service import ConversationService
+from .event_broadcaster import event_broadcaster
+from .message_dedup import message_fingerprint
+from .payment_service import PaymentService
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationUnitOfWork:
+    """Stages changes to one conversation and writes them in a single commit.
+
+    Messages and field updates are held in memory and only added to the
+    session in commit(). That way autoflush never takes the SQLite write lock
+    while the monitor is waiting on the browser or the LLM, and one handled
+    conversation costs one write transaction instead of one per change.
+    """
+
+    def __init__(self, session: AsyncSession, conversation: Conversation):
+        self.session = session
+        self.conversation = conversation
+        self._messages: list[Message] = []
+        self._changes: dict[str, object] = {}
+        self._close_competing_listing_id: int | None = None
+
+    @property
+    def status(self) -> str:
+        """Conversation status including staged changes."""
+        return self._changes.get("status", self.conversation.status)
+
+    @property
+    def pending(self) -> bool:
+        return bool(
+            self._messages
+            or self._changes
+            or self._close_competing_listing_id is not None
+        )
+
+    def add_message(self, role: str, content: str, delivered: bool = False) -> Message:
+        """Stage a message. sent_at is taken now so staged messages keep their order.
+
+        Its position and fingerprint are assigned in commit().
+        """
+        now = datetime.utcnow()
+        message = Message(
+            conversation_id=self.conversation.id,
+            role=role,
+            content=content,
+            delivered=delivered,
+            sent_at=now,
+        )
+        self._messages.append(message)
+        self._changes["last_message_at"] = now
+        return message
+
+    def update_status(self, status: str) -> None:
+        self._changes["status"] = status
+
+    def update_offer(self, offer: float) -> None:
+        self._changes["current_offer"] = offer
+
+    def save_deal_details(
+        self, agreed_price: float | None = None, delivery_address: str | None = None
+    ) -> None:
+        if agreed_price is not None:
+            self._changes["agreed_price"] = agreed_price
+        if delivery_address is not None:
+            self._changes["delivery_address"] = delivery_address
+
+    def update_summary(self, summary: str, through_id: int, summarized_tokens: int) -> None:
+        """Stage a new rolling history summary covering messages up to through_id."""
+        self._changes["history_summary"] = summary
+        self._changes["summary_through_id"] = through_id
+        self._changes["summarized_tokens"] = summarized_tokens
+
+    def close_competing_conversations(self, listing_id: int) -> None:
+        """Stage closing all other active conversations on the listing."""
+        self._close_competing_listing_id = listing_id
+
+    async def commit(self) -> None:
+        """Apply everything staged in one transaction."""
+        if not self.pending:
+            return
+
+        previous_status = self.conversation.status
+        if self._messages:
+            # Reserved atomically: an API send may have added messages since we loaded the row
+            first = await ConversationService.reserve_positions(
+                self.session, self.conversation.id, len(self._messages)
+            )
+            for offset, message in enumerate(self._messages):
+                message.position = first + offset
+                message.fingerprint = message_fingerprint(
+                    message.conversation_id, message.role, message.content, message.position
+                )
+            self.session.add_all(self._messages)
+        for field, value in self._changes.items():
+            setattr(self.conversation, field, value)
+
+        closed_ids: list[int] = []
+        if self._close_competing_listing_id is not None:
+            result = await self.session.execute(
+                update(Conversation)
+                .where(
+                    Conversation.listing_id == self._close_competing_listing_id,
+                    Conversation.id != self.conversation.id,
+                    Conversation.status.in_(["active"]),
+                )
+                .values(status="closed")
+                .returning(Conversation.id)
+            )
+            closed_ids = list(result.scalars().all())
+        closed_count = len(closed_ids)
+
+        await self.session.commit()
+        context_cache.record_commit(self.conversation, self._messages)
+        self._publish(previous_status, closed_ids)
+        PaymentService.on_status_change(self.conversation.id, self.conversation.status)
+        for conversation_id in closed_ids:
+            PaymentService.on_status_change(conversation_id, "closed")
+        if closed_count:
+            context_cache.invalidate_listing(
+                self._close_competing_listing_id, except_conversation_id=self.conversation.id
+            )
+            logger.info(
+                f"Closed {closed_count} competing conversation(s) "
+                f"on listing {self._close_competing_listing_id}"
+            )
+
+        self._messages = []
+        self._changes = {}
+        self._close_competing_listing_id = None
+
+    def _publish(self, previous_status: str, closed_ids: list[int]) -> None:
+        """Push the committed messages and status changes to event stream clients."""
+        listing_id = self.conversation.listing_id
+        for message in self._messages:
+            event_broadcaster.publish_message(message, listing_id)
+        event_broadcaster.publish_status(
+            self.conversation.id, listing_id, previous_status, self.conversation.status
+        )
+        for conversation_id in closed_ids:
+            event_broadcaster.publish_status(
+                conversation_id, self._close_competing_listing_id, "active", "closed"
+            )
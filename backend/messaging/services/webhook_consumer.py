@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.sqlite import insert
+
+from database.connection import async_session
+from ..config import settings
+from ..models.webhook_event import WebhookEvent
+from .payment_service import PaymentService
+from .payment_worker import payment_worker
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 5  # seconds, when not woken by a new event
+
+
+async def _apply_checkout_completed(session, event: dict) -> None:
+    checkout = event.get("data", {}).get("object", {})
+    txn = await PaymentService.handle_checkout_complete(
+        session, checkout["id"], payment_intent=checkout.get("payment_intent")
+    )
+    # Same as the polling path: start the no-tracking refund deadline once paid
+    if txn:
+        payment_worker.schedule_refund(txn)
+
+
+# Event type -> handler(session, event). Handlers must be idempotent.
+HANDLERS = {
+    "checkout.session.completed": _apply_checkout_completed,
+}
+
+
+class WebhookConsumer:
+    """Background worker that applies inbox events.
+
+    Woken by the webhook endpoint for low latency, and polls as a fallback
+    (events stored while the service was down, retries that came due).
+    A failing event is retried with exponential backoff and marked
+    "failed" after settings.webhook_max_attempts.
+    """
+
+    def __init__(self):
+        self._running = False
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self.counters = {"received": 0, "duplicates": 0, "processed": 0, "ignored": 0, "retries": 0, "failed": 0}
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook consumer started")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Webhook consumer stopped")
+
+    async def enqueue(self, event_id: str, event_type: str, payload: str) -> bool:
+        """Persist a webhook event to the inbox and wake the consumer.
+
+        Returns False for a redelivery of an event that is already stored.
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                insert(WebhookEvent)
+                .values(id=event_id, type=event_type, payload=payload)
+                .on_conflict_do_nothing(index_elements=["id"])
+            )
+            await session.commit()
+
+        if result.rowcount == 0:
+            self.counters["duplicates"] += 1
+            return False
+        self.counters["received"] += 1
+        self._wake.set()
+        return True
+
+    async def _run(self):
+        while self._running:
+            try:
+                # Keep draining while full batches come back
+                while await self._process_batch() == settings.webhook_batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Webhook consumer error: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _process_batch(self) -> int:
+        """Apply one batch of due events. Returns how many were handled."""
+        async with async_session() as session:
+            result = await session.execute(
+                select(WebhookEvent)
+                .where(WebhookEvent.status == "pending")
+                .where(WebhookEvent.next_attempt_at <= datetime.utcnow())
+                .order_by(WebhookEvent.received_at)
+                .limit(settings.webhook_batch_size)
+            )
+            events = list(result.scalars().all())
+
+            for inbox_event in events:
+                await self._apply(session, inbox_event)
+        return len(events)
+
+    async def _apply(self, session, inbox_event: WebhookEvent) -> None:
+        # A failed event earlier in the batch rolled back and expired everything
+        if inspect(inbox_event).expired:
+            await session.refresh(inbox_event)
+        handler = HANDLERS.get(inbox_event.type)
+        if handler is None:
+            inbox_event.status = "ignored"
+            inbox_event.processed_at = datetime.utcnow()
+            await session.commit()
+            self.counters["ignored"] += 1
+            return
+
+        attempts = inbox_event.attempts + 1
+        inbox_event.attempts = attempts
+        try:
+            await handler(session, json.loads(inbox_event.payload))
+        except Exception as e:
+            await session.rollback()
+            await session.refresh(inbox_event)
+            inbox_event.attempts = attempts
+            inbox_event.last_error = str(e)[:1000]
+            if inbox_event.attempts >= settings.webhook_max_attempts:
+                inbox_event.status = "failed"
+                self.counters["failed"] += 1
+                logger.error(
+                    f"[webhook_consumer] Giving up on {inbox_event.type} {inbox_event.id} "
+                    f"after {inbox_event.attempts} attempts: {e}"
+                )
+            else:
+                delay = min(3600, 10 * 2 ** (inbox_event.attempts - 1))
+                inbox_event.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                self.counters["retries"] += 1
+                logger.warning(
+                    f"[webhook_consumer] {inbox_event.type} {inbox_event.id} failed "
+                    f"(attempt {inbox_event.attempts}), retrying in {delay}s: {e}"
+                )
+            await session.commit()
+            return
+
+        inbox_event.status = "processed"
+        inbox_event.processed_at = datetime.utcnow()
+        inbox_event.last_error = None
+        await session.commit()
+        self.counters["processed"] += 1
+
+    def snapshot(self) -> dict:
+        return {"running": self._running, **self.counters}
+
+
+webhook_consumer = WebhookConsumer()
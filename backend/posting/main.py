@@ -5,7 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .api.router import router
-from database.connection import Base, engine
+from database.connection import Base, engine, add_missing_columns
 from database.seed import seed_default_listings
 from .config import settings
 from .queue.worker import worker
@@ -22,6 +22,7 @@ async def lifespan(app: FastAPI):
     # Startup: initialize database
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
 
     # Seed default data
     await seed_default_listings()
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import tempfile
+
+# Must be set before database.connection creates the engine
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
+import pytest
+
+from database.connection import Base, engine
+from messaging import models  # noqa: F401  (registers the tables)
+from posting import models as posting_models  # noqa: F401
+
+
+@pytest.fixture
+def run_db():
+    """Run an async test body against freshly created tables.
+
+    Everything runs in one event loop, and the engine's pooled connections
+    are disposed before the loop closes.
+    """
+    def run(test_body):
+        async def main():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            try:
+                return await test_body()
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return run
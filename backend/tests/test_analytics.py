@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from database.connection import async_session
+from database.models.listing import Listing
+from messaging.models import Buyer, Conversation, Message
+from messaging.services.analytics import _Buckets, _rollup_posting, _rollup_reply_latency
+from posting.models.job import PostingJob
+
+T0 = datetime(2026, 1, 5, 9, 0)
+
+
+def _msg(conversation_id, role, minute, delivered=True):
+    return Message(
+        conversation_id=conversation_id, role=role, content="x",
+        sent_at=T0 + timedelta(minutes=minute), delivered=delivered,
+    )
+
+
+def _latencies(buckets: _Buckets) -> tuple[int, float]:
+    count = sum(row[0] for (_, metric, _), row in buckets.rows.items() if metric == "reply_latency")
+    total = sum(row[1] for (_, metric, _), row in buckets.rows.items() if metric == "reply_latency")
+    return count, total
+
+
+def test_reply_latency_carries_waiting_buyers_across_the_watermark(run_db):
+    async def body():
+        async with async_session() as session:
+            session.add_all([Buyer(fb_name="Ana"), Buyer(fb_name="Ben")])
+            await session.flush()
+            session.add_all([Conversation(buyer_id=1), Conversation(buyer_id=2)])
+            await session.flush()
+
+            batches = [
+                # Answered after 3 minutes, then the buyer writes again at 10 and 12
+                [_msg(1, "buyer", 0), _msg(1, "buyer", 1), _msg(1, "seller", 3),
+                 _msg(1, "buyer", 10), _msg(1, "buyer", 12), _msg(2, "buyer", 0)],
+                # The run that started at minute 10 is answered at 15
+                [_msg(1, "buyer", 13), _msg(1, "seller", 15), _msg(1, "buyer", 20)],
+                # A failed send doesn't end the wait that began at minute 20
+                [_msg(1, "seller", 21, delivered=False), _msg(1, "buyer", 30),
+                 _msg(1, "seller", 31), _msg(2, "seller", 40)],
+            ]
+            results = []
+            for batch in batches:
+                session.add_all(batch)
+                await session.flush()
+                buckets = _Buckets()
+                await _rollup_reply_latency(session, buckets)
+                await session.commit()
+                results.append(_latencies(buckets))
+            return results
+
+    assert run_db(body) == [(1, 180.0), (1, 300.0), (2, 660.0 + 2400.0)]
+
+
+def test_posting_jobs_sharing_the_watermark_timestamp_are_counted(run_db):
+    async def body():
+        async with async_session() as session:
+            session.add(Listing(title="Desk", description="Oak desk", price=100.0))
+            await session.flush()
+            counts = []
+            for platform in ("craigslist", "ebay"):
+                # Same completed_at, committed after the previous rollup
+                session.add(PostingJob(
+                    listing_id=1, platform=platform, status="posted",
+                    started_at=T0, completed_at=T0 + timedelta(minutes=2),
+                ))
+                await session.flush()
+                buckets = _Buckets()
+                await _rollup_posting(session, buckets)
+                await session.commit()
+                counts.append(sorted(dim for (_, metric, dim) in buckets.rows if metric == "posting_outcome"))
+            return counts
+
+    assert run_db(body) == [["craigslist:posted"], ["ebay:posted"]]
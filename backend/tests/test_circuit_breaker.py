@@ -0,0 +1,152 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from messaging.ai import client
+from messaging.ai.client import CircuitBreaker, CircuitOpenError, LLMGateway
+
+
+def _status_error(cls, status: int):
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    return cls("error", response=httpx.Response(status, request=request), body=None)
+
+
+def _gateway(max_retries: int = 0, threshold: int = 2, reset: float = 30.0) -> LLMGateway:
+    return LLMGateway(
+        max_concurrency=2, timeout=5.0, max_retries=max_retries,
+        hedge_percentile=0.0, breaker_threshold=threshold, breaker_reset=reset,
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(client.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, reset=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, reset=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_one_trial(clock):
+    breaker = CircuitBreaker(threshold=1, reset=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_trial_success_closes_and_failure_reopens(clock):
+    breaker = CircuitBreaker(threshold=1, reset=10)
+    breaker.record_failure()
+    clock[0] += 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_end_trial_frees_the_slot(clock):
+    breaker = CircuitBreaker(threshold=1, reset=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.end_trial()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_client_errors_do_not_open_breaker(monkeypatch):
+    gateway = _gateway(threshold=1)
+
+    async def bad_request(params):
+        raise _status_error(openai.BadRequestError, 400)
+
+    monkeypatch.setattr(gateway, "_attempt", bad_request)
+    for _ in range(3):
+        with pytest.raises(openai.BadRequestError):
+            asyncio.run(gateway.chat(model="m", messages=[]))
+    assert gateway.breaker.state == "closed"
+    assert gateway.counters["failures"] == 0
+
+
+def test_server_errors_open_breaker(monkeypatch):
+    gateway = _gateway(threshold=2)
+
+    async def server_error(params):
+        raise _status_error(openai.InternalServerError, 503)
+
+    monkeypatch.setattr(gateway, "_attempt", server_error)
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            asyncio.run(gateway.chat(model="m", messages=[]))
+    assert gateway.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(gateway.chat(model="m", messages=[]))
+
+
+def test_cancelled_trial_does_not_wedge_breaker(monkeypatch, clock):
+    gateway = _gateway(threshold=1, reset=10)
+    gateway.breaker.record_failure()
+    clock[0] += 10
+
+    async def hang(params):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(gateway, "_attempt", hang)
+
+    async def cancel_trial():
+        task = asyncio.create_task(gateway.chat(model="m", messages=[]))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert gateway.breaker.allow()
+
+
+def test_backoff_does_not_hold_the_semaphore(monkeypatch):
+    gateway = _gateway(max_retries=1)
+    calls = []
+
+    async def flaky(params):
+        calls.append(params["model"])
+        if params["model"] == "slow" and calls.count("slow") == 1:
+            raise openai.APITimeoutError(request=httpx.Request("POST", "http://llm.test"))
+        return params["model"]
+
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        # While "slow" waits to retry, both slots must be free
+        assert gateway._semaphore._value == 2
+        await real_sleep(0)
+
+    monkeypatch.setattr(gateway, "_attempt", flaky)
+    monkeypatch.setattr(client.asyncio, "sleep", sleep)
+    assert asyncio.run(gateway.chat(model="slow", messages=[])) == "slow"
+    assert calls == ["slow", "slow"]
+    assert gateway.counters["retries"] == 1
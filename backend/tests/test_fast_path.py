@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from messaging.ai.fast_path import classify_fast_reply, evaluate_offer, parse_offer
+
+
+def _listing(price=100.0, min_price=70.0, willing_to_negotiate=0.5):
+    return SimpleNamespace(price=price, min_price=min_price, willing_to_negotiate=willing_to_negotiate)
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("$80", 80.0),
+    ("$80?", 80.0),
+    ("80$", 80.0),
+    ("80 bucks", 80.0),
+    ("$ 72.50", 72.5),
+    ("would you take 80", 80.0),
+    ("Would u do $75?", 75.0),
+    ("how about 60 dollars", 60.0),
+    ("$85 ok?", 85.0),
+])
+def test_parse_offer_reads_prices(text, amount):
+    assert parse_offer(text) == amount
+
+
+@pytest.mark.parametrize("text", [
+    "80",
+    "2?",
+    "2015",
+    "3 ok?",
+    "is it available",
+    "would you take 80 and throw in the case",
+])
+def test_parse_offer_ignores_numbers_without_price_context(text):
+    assert parse_offer(text) is None
+
+
+def test_offer_at_the_accept_threshold_is_accepted():
+    response = evaluate_offer(_listing(), 90.0, None, None)
+    assert response.deal_status == "agreed"
+    assert response.agreed_price == 90.0
+
+
+def test_offer_above_asking_goes_to_the_llm():
+    assert evaluate_offer(_listing(), 100.0, None, None).deal_status == "agreed"
+    assert evaluate_offer(_listing(), 1000.0, None, None) is None
+
+
+def test_never_agrees_below_the_sellers_minimum():
+    # 90% of asking is below min_price; the lowest the seller shows is $98
+    response = evaluate_offer(_listing(min_price=95.0), 90.0, None, None)
+    assert response.deal_status == "none"
+    assert "$98" in response.message
+    assert evaluate_offer(_listing(min_price=95.0), 98.0, None, None).agreed_price == 98.0
+    # Super flexible: counters go to the LLM instead of agreeing
+    assert evaluate_offer(_listing(min_price=98.0, willing_to_negotiate=0.9), 91.0, None, None) is None
+    assert classify_fast_reply(
+        _listing(min_price=98.0, willing_to_negotiate=0.9), "active", ["would you take 91"]
+    ) is None
+
+
+def test_first_lowball_gets_the_lowest_price():
+    response = evaluate_offer(_listing(), 50.0, None, None)
+    assert response.deal_status == "none"
+    assert "$85" in response.message
+    assert response.buyer_offer == 50.0
+
+
+def test_counter_offers_go_to_the_llm():
+    # Between the lowest and the accept threshold
+    assert evaluate_offer(_listing(), 87.0, None, None) is None
+    # A repeated lowball
+    assert evaluate_offer(_listing(), 50.0, 60.0, None) is None
+
+
+def test_firm_listing_only_accepts_asking():
+    firm = _listing(willing_to_negotiate=0.1)
+    assert "firm at $100" in evaluate_offer(firm, 95.0, None, None).message
+    assert evaluate_offer(firm, 100.0, None, None).deal_status == "agreed"
+
+
+def test_competing_offer_raises_the_accept_price():
+    assert "$95" in evaluate_offer(_listing(), 92.0, None, 95.0).message
+    assert evaluate_offer(_listing(), 95.0, None, 95.0).deal_status == "agreed"
+
+
+def test_bare_number_falls_back_to_the_llm():
+    assert classify_fast_reply(_listing(), "active", ["2"]) is None
+    intent, response = classify_fast_reply(_listing(), "active", ["$95"])
+    assert intent == "offer"
+    assert response.agreed_price == 95.0
@@ -0,0 +1,103 @@
+
+from database.connection import async_session
+from messaging.models import Buyer, Conversation, Message
+from messaging.services import ConversationService, ConversationUnitOfWork
+from messaging.services.message_dedup import (
+    KnownMessage, align_new_messages, find_new_messages, known_message, message_fingerprint,
+)
+
+CONV = 7
+
+
+def _stored(*pairs, start: int = 0) -> list[KnownMessage]:
+    return [
+        KnownMessage(start + i, message_fingerprint(CONV, role, content, start + i), role, content)
+        for i, (role, content) in enumerate(pairs)
+    ]
+
+
+def test_no_known_messages_means_all_buyer_messages_are_new():
+    extracted = [("buyer", "hi"), ("seller", "hey"), ("buyer", "still there?")]
+    assert align_new_messages(CONV, extracted, []) == ["hi", "still there?"]
+
+
+def test_returns_messages_after_the_aligned_tail():
+    tail = _stored(("buyer", "is it available"), ("seller", "yep"), ("buyer", "ok"), start=4)
+    extracted = [("buyer", "is it available"), ("seller", "yep"), ("buyer", "ok"), ("buyer", "$80?")]
+    assert align_new_messages(CONV, extracted, tail) == ["$80?"]
+
+
+def test_repeated_message_after_reply_is_new():
+    tail = _stored(("buyer", "ok"), ("seller", "cool, want it?"))
+    extracted = [("buyer", "ok"), ("seller", "cool, want it?"), ("buyer", "ok")]
+    assert align_new_messages(CONV, extracted, tail) == ["ok"]
+
+
+def test_nothing_new():
+    tail = _stored(("buyer", "ok"), ("seller", "cool"))
+    assert align_new_messages(CONV, [("buyer", "ok"), ("seller", "cool")], tail) == []
+
+
+def test_whitespace_differences_still_align():
+    tail = _stored(("seller", "lowest i can do\nis $90"))
+    extracted = [("seller", "lowest i can do is $90"), ("buyer", "deal")]
+    assert align_new_messages(CONV, extracted, tail) == ["deal"]
+
+
+def test_window_starting_inside_the_tail_uses_a_shorter_anchor():
+    tail = _stored(("buyer", "a"), ("seller", "b"), ("buyer", "c"))
+    extracted = [("seller", "b"), ("buyer", "c"), ("buyer", "d")]
+    assert align_new_messages(CONV, extracted, tail) == ["d"]
+
+
+def test_same_text_at_another_position_does_not_align():
+    # Hashes include the conversation and position, not just the text
+    tail = [KnownMessage(9, message_fingerprint(CONV, "seller", "hey", 3), "seller", "hey")]
+    assert align_new_messages(CONV, [("seller", "hey"), ("buyer", "hi")], tail) is None
+
+
+def test_fallback_counts_repeats():
+    known = _stored(("buyer", "ok"), ("seller", "sent"))
+    # Seller typed something by hand, so nothing lines up
+    extracted = [("buyer", "ok"), ("seller", "typed by hand"), ("buyer", "ok")]
+    known = [KnownMessage(k.position, "stale", k.role, k.content) for k in known]
+    assert find_new_messages(CONV, extracted, known) == ["ok"]
+
+
+def test_legacy_rows_align_by_content():
+    row = Message(conversation_id=CONV, role="seller", content="sure", position=None, fingerprint=None)
+    tail = [known_message(row)]
+    assert align_new_messages(CONV, [("seller", "sure"), ("buyer", "thanks")], tail) == ["thanks"]
+
+
+def test_positions_are_reserved_across_writers(run_db):
+    async def body():
+        async with async_session() as session:
+            buyer = Buyer(fb_name="Ana")
+            session.add(buyer)
+            await session.flush()
+            conversation = Conversation(buyer_id=buyer.id, message_count=0)
+            session.add(conversation)
+            await session.commit()
+            conversation_id = conversation.id
+
+        async with async_session() as monitor_db, async_session() as api_db:
+            conversation = await monitor_db.get(Conversation, conversation_id)
+            uow = ConversationUnitOfWork(monitor_db, conversation)
+            uow.add_message("seller", "ok", delivered=True)
+            uow.add_message("buyer", "ok", delivered=True)
+            # An API send lands after the monitor loaded its row; with stale
+            # positions both seller "ok"s would get the same fingerprint
+            await ConversationService.add_message(api_db, conversation_id, "seller", "ok")
+            await uow.commit()
+
+        async with async_session() as session:
+            rows = (await session.execute(
+                Message.__table__.select().where(Message.conversation_id == conversation_id)
+            )).all()
+            count = (await session.get(Conversation, conversation_id)).message_count
+        return sorted(row.position for row in rows), count, conversation.message_count
+
+    positions, count, cached_count = run_db(body)
+    assert positions == [0, 1, 2]
+    assert count == cached_count == 3
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.connection import async_session
+from database.models.listing import Listing
+from messaging.models import Buyer, Conversation, Message
+from messaging.models.transaction import Transaction
+from messaging.services import ConversationService
+from messaging.services.cursors import decode_cursor, encode_cursor
+from messaging.services.payment_service import PaymentService
+
+T0 = datetime(2026, 1, 5, 9, 0)
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 5, 9, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bm8tc2VwYXJhdG9y", encode_cursor(T0, 1)[:-4]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_message_pages_walk_back_without_gaps_or_repeats(run_db):
+    async def body():
+        async with async_session() as session:
+            buyer = Buyer(fb_name="Ana")
+            session.add(buyer)
+            await session.flush()
+            conversation = Conversation(buyer_id=buyer.id)
+            session.add(conversation)
+            await session.flush()
+            # Pairs share a timestamp so the id has to break the tie
+            session.add_all([
+                Message(
+                    conversation_id=conversation.id, role="buyer", content=str(i),
+                    sent_at=T0 + timedelta(minutes=i // 2),
+                )
+                for i in range(7)
+            ])
+            await session.commit()
+            conversation_id = conversation.id
+
+        pages, cursor = [], None
+        while True:
+            async with async_session() as session:
+                conv, cursor = await ConversationService.get_detail(
+                    session, conversation_id, limit=3, before=cursor
+                )
+            pages.append([msg.content for msg in conv.messages])
+            if cursor is None:
+                return pages
+
+    assert run_db(body) == [["4", "5", "6"], ["1", "2", "3"], ["0"]]
+
+
+def test_missing_conversation_has_no_page(run_db):
+    async def body():
+        async with async_session() as session:
+            return await ConversationService.get_detail(session, 999)
+
+    assert run_db(body) == (None, None)
+
+
+def test_transaction_totals_cover_every_page(run_db):
+    async def body():
+        async with async_session() as session:
+            listing = Listing(title="Desk", description="Oak desk", price=100.0)
+            session.add(listing)
+            session.add_all([Buyer(fb_name=f"b{i}") for i in range(5)])
+            await session.flush()
+            session.add_all([Conversation(buyer_id=i + 1, listing_id=listing.id) for i in range(5)])
+            await session.flush()
+            session.add_all([
+                Transaction(
+                    conversation_id=i + 1, listing_id=listing.id, buyer_id=i + 1,
+                    amount_cents=1000 * (i + 1), status="paid_out" if i < 4 else "pending",
+                )
+                for i in range(5)
+            ])
+            await session.commit()
+            rows, cursor = await PaymentService.list_page(session, limit=2)
+            return len(rows), cursor, await PaymentService.totals_by_status(session)
+
+    count, cursor, totals = run_db(body)
+    assert count == 2 and cursor is not None
+    assert totals == {
+        "paid_out": {"count": 4, "amount_cents": 10000},
+        "pending": {"count": 1, "amount_cents": 5000},
+    }
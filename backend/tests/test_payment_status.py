@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from messaging.services.payment_status import PaymentStatusTracker
+
+
+def _txn(session_id: str, age: timedelta):
+    return SimpleNamespace(
+        status="pending", stripe_checkout_session_id=session_id, created_at=datetime.utcnow() - age,
+    )
+
+
+def test_abandoned_checkouts_are_pruned(monkeypatch):
+    async def refresh(self):
+        pass
+
+    monkeypatch.setattr(PaymentStatusTracker, "_refresh", refresh)
+    tracker = PaymentStatusTracker()
+
+    async def body():
+        await tracker.check(None, _txn("cs_old", timedelta(hours=23)))
+        await tracker.check(None, _txn("cs_paid", timedelta(hours=23)))
+        tracker._paid["cs_paid"] = "pi_1"
+        # Two hours later both are past the lifetime; only the unpaid one is forgotten
+        for state in tracker._states.values():
+            state.created_at -= timedelta(hours=2)
+        expired = await tracker.check(None, _txn("cs_new", timedelta(hours=25)))
+        return expired, set(tracker._states)
+
+    expired, tracked = asyncio.run(body())
+    assert expired is False
+    assert tracked == {"cs_paid"}
+    assert tracker.counters["expired"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from database.connection import async_session
+from database.models.listing import Listing
+from messaging.models import Buyer, Conversation
+from messaging.services import ConversationUnitOfWork
+from messaging.services import payment_service
+from messaging.services.payment_service import PaymentService
+
+
+@pytest.fixture(autouse=True)
+def fake_stripe(monkeypatch):
+    async def create_session(conversation_id, amount_cents):
+        await asyncio.sleep(0)
+        return {"conversation_id": conversation_id, "amount_cents": amount_cents}
+
+    monkeypatch.setattr(PaymentService, "_create_stripe_session", staticmethod(create_session))
+    payment_service._prepared_checkouts.clear()
+    yield
+    payment_service._prepared_checkouts.clear()
+
+
+def test_closing_status_releases_the_prepared_checkout():
+    async def body():
+        PaymentService.prepare_checkout(1, 80.0)
+        PaymentService.on_status_change(1, "awaiting_confirm")
+        kept = 1 in payment_service._prepared_checkouts
+        PaymentService.on_status_change(1, "closed")
+        return kept, 1 in payment_service._prepared_checkouts
+
+    assert asyncio.run(body()) == (True, False)
+
+
+def test_stale_prepared_checkouts_are_swept():
+    async def body():
+        PaymentService.prepare_checkout(1, 80.0)
+        payment_service._prepared_checkouts[1].created_at -= payment_service.PREPARED_CHECKOUT_MAX_AGE + 1
+        PaymentService.prepare_checkout(2, 50.0)
+        return set(payment_service._prepared_checkouts)
+
+    assert asyncio.run(body()) == {2}
+
+
+def test_closing_competing_conversations_releases_their_checkouts(run_db):
+    async def body():
+        async with async_session() as session:
+            listing = Listing(title="Desk", description="Oak desk", price=100.0)
+            session.add(listing)
+            session.add_all([Buyer(fb_name="Ana"), Buyer(fb_name="Ben")])
+            await session.flush()
+            winner = Conversation(buyer_id=1, listing_id=listing.id, status="active")
+            loser = Conversation(buyer_id=2, listing_id=listing.id, status="active")
+            session.add_all([winner, loser])
+            await session.commit()
+            # A deal on the losing conversation that was reopened by hand
+            PaymentService.prepare_checkout(loser.id, 90.0)
+
+            uow = ConversationUnitOfWork(session, winner)
+            uow.update_status("pending")
+            PaymentService.prepare_checkout(winner.id, 95.0)
+            uow.close_competing_conversations(listing.id)
+            await uow.commit()
+            return set(payment_service._prepared_checkouts), winner.id
+
+    remaining, winner_id = run_db(body)
+    assert remaining == {winner_id}
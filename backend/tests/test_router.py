@@ -0,0 +1,49 @@
+import pytest
+
+from messaging.ai.router import classify_turn
+
+LISTING = "Airpod Pro 2nd Generation"
+
+
+@pytest.mark.parametrize("messages", [
+    ["would you take $80"],
+    ["80 bucks?"],
+    ["whats the lowest you'd go"],
+    ["is the price negotiable"],
+])
+def test_price_talk_is_negotiation(messages):
+    assert classify_turn("active", messages, listing_title=LISTING) == "negotiation"
+
+
+def test_empty_turn_is_negotiation():
+    assert classify_turn("active", []) == "negotiation"
+    assert classify_turn("active", None) == "negotiation"
+
+
+def test_address_statuses_route_to_address():
+    assert classify_turn("pending", ["123 Main St, Austin TX 78701"]) == "address"
+    assert classify_turn("awaiting_confirm", ["yes thats right"]) == "address"
+
+
+def test_price_talk_reopens_negotiation_while_waiting_for_an_address():
+    assert classify_turn("pending", ["actually can you do $70"]) == "negotiation"
+
+
+def test_ack_after_a_plain_message_is_an_acknowledgement():
+    assert classify_turn("active", ["thanks!"], "for sure lmk") == "acknowledgement"
+    assert classify_turn("active", ["bet"]) == "acknowledgement"
+
+
+@pytest.mark.parametrize("last_seller_message", ["i can do $100", "want it?"])
+def test_ack_after_a_price_or_question_is_negotiation(last_seller_message):
+    assert classify_turn("active", ["ok"], last_seller_message) == "negotiation"
+
+
+def test_questions_and_item_mentions_are_negotiation():
+    assert classify_turn("active", ["does it come with the case?"], listing_title=LISTING) == "negotiation"
+    assert classify_turn("active", ["love the airpod"], listing_title=LISTING) == "negotiation"
+    assert classify_turn("active", ["i have 2 kids"], listing_title=LISTING) == "negotiation"
+
+
+def test_unrelated_chat_is_off_topic():
+    assert classify_turn("active", ["lol my dog just sneezed"], listing_title=LISTING) == "off_topic"
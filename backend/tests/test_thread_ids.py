@@ -0,0 +1,32 @@
+from database.connection import async_session
+from database.models.listing import Listing
+from messaging.models import Buyer
+from messaging.services import ConversationService
+
+
+def test_stale_thread_id_is_cleared_and_replaced(run_db):
+    async def body():
+        async with async_session() as session:
+            desk = Listing(title="Desk", description="Oak desk", price=100.0)
+            lamp = Listing(title="Lamp", description="Brass lamp", price=20.0)
+            session.add_all([desk, lamp, Buyer(fb_name="ana")])
+            await session.flush()
+            await ConversationService.get_or_create(session, 1, desk.id, fb_thread_id="111")
+            await ConversationService.get_or_create(session, 1, lamp.id, fb_thread_id="222")
+            stored = await ConversationService.get_thread_id(session, "ana", desk.id)
+
+            # "111" opened someone else's chat: forgetting it leaves the lamp thread alone
+            await ConversationService.clear_thread_id(session, "111")
+            cleared = await ConversationService.get_thread_id(session, "ana", desk.id)
+            lamp_thread = await ConversationService.get_thread_id(session, "ana", lamp.id)
+
+            # A verified visit captures the real id, which replaces any stored one
+            await ConversationService.get_or_create(session, 1, desk.id, fb_thread_id="333")
+            await ConversationService.get_or_create(session, 1, lamp.id, fb_thread_id="444")
+            return (
+                stored, cleared, lamp_thread,
+                await ConversationService.get_thread_id(session, "ana", desk.id),
+                await ConversationService.get_thread_id(session, "ana", lamp.id),
+            )
+
+    assert run_db(body) == ("111", None, "222", "333", "444")
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+from messaging.ai.usage import UsageTracker
+
+
+def _usage(prompt_tokens=100, completion_tokens=20):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def test_per_conversation_totals_keep_the_most_recent_conversations():
+    tracker = UsageTracker(max_conversations=2)
+    tracker.record(1, _usage(), 0.5)
+    tracker.record(2, _usage(), 0.5)
+    tracker.record_history(1, 300, 200)  # touching 1 makes 2 the oldest
+    tracker.record(3, _usage(), 0.5)
+
+    assert list(tracker.by_conversation) == [1, 3]
+    assert tracker.by_conversation[1].calls == 1
+    assert tracker.by_conversation[1].history_tokens_full == 300
+    # Overall totals still count the evicted conversation
+    assert tracker.totals.calls == 3
+    assert tracker.totals.prompt_tokens == 300
@@ -0,0 +1,42 @@
+from database.connection import async_session
+from database.models.listing import Listing
+from messaging.models import Buyer, Conversation
+from messaging.models.transaction import Transaction
+from messaging.services.payment_worker import payment_worker
+from messaging.services.webhook_consumer import HANDLERS
+
+
+def _completed_event(session_id: str) -> dict:
+    return {"data": {"object": {"id": session_id, "payment_intent": "pi_1"}}}
+
+
+def test_checkout_completed_schedules_the_refund_deadline(run_db):
+    async def body():
+        async with async_session() as session:
+            listing = Listing(title="Desk", description="Oak desk", price=100.0)
+            buyer = Buyer(fb_name="Ana")
+            session.add_all([listing, buyer])
+            await session.flush()
+            conversation = Conversation(buyer_id=buyer.id, listing_id=listing.id, status="confirmed")
+            session.add(conversation)
+            await session.flush()
+            txn = Transaction(
+                conversation_id=conversation.id, listing_id=listing.id, buyer_id=buyer.id,
+                amount_cents=9000, stripe_checkout_session_id="cs_1",
+            )
+            session.add(txn)
+            await session.commit()
+
+            handler = HANDLERS["checkout.session.completed"]
+            await handler(session, _completed_event("cs_1"))
+            scheduled = ("refund", txn.id) in payment_worker._scheduled
+            # Redelivered event: transaction is no longer pending, nothing new to schedule
+            payment_worker._scheduled.clear()
+            payment_worker._heap.clear()
+            await handler(session, _completed_event("cs_1"))
+            return scheduled, txn.status, dict(payment_worker._scheduled)
+
+    scheduled, status, rescheduled = run_db(body)
+    assert scheduled
+    assert status == "payment_held"
+    assert rescheduled == {}
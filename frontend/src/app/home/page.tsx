@@ -36,7 +36,7 @@ export default function HomePage() {
   const [newListingOpen, setNewListingOpen] = useState(false);
   const { data: listings } = useSWR("/api/listings", () => api.listings.list().catch(() => []), { fallbackData: [], revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
   const { data: jobs } = useSWR("/api/jobs", () => api.jobs.list().catch(() => []), { fallbackData: [], revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
-  const { data: transactions } = useSWR("/payments/transactions", () => api.payments.listTransactions().catch(() => []), { fallbackData: [], revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
+  const { data: transactions } = useSWR("/payments/transactions", () => api.payments.listTransactions({ limit: 6 }).catch(() => []), { fallbackData: [], revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
 
   const txns = [...(transactions || []), ...DUMMY_TRANSACTIONS].sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
   const allListings = listings || [];
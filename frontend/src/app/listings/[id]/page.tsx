@@ -1,10 +1,10 @@
 "use client";
 
-import { use, useState } from "react";
-import useSWR from "swr";
+import { use, useEffect, useState } from "react";
+import useSWR, { useSWRConfig } from "swr";
 import Link from "next/link";
 import { api } from "@/lib/api";
-import { Platform, Conversation, ConversationDetail } from "@/lib/types";
+import { Platform, Conversation, ConversationDetail, Message } from "@/lib/types";
 import { Button } from "@/components/ui/Button";
 import { Card, CardContent, CardHeader } from "@/components/ui/Card";
 import { StatusBadge } from "@/components/ui/StatusBadge";
@@ -180,16 +180,48 @@ function ChatCard({ chat }: {
 }
 
 /* ── Real Chat Card (fetches message history) ──────── */
+function mergeMessages(current: Message[], incoming: Message[]) {
+  const byId = new Map(current.map((msg) => [msg.id, msg]));
+  incoming.forEach((msg) => byId.set(msg.id, msg));
+  return Array.from(byId.values()).sort(
+    (a, b) => a.sent_at.localeCompare(b.sent_at) || a.id - b.id
+  );
+}
+
 function RealChatCard({ conversation }: { conversation: Conversation }) {
   const [expanded, setExpanded] = useState(false);
-  const { data: detail } = useSWR(
+  // The newest page is refetched on live events; older pages are kept here
+  const { data: page } = useSWR(
     expanded ? `/conversations/${conversation.id}` : null,
-    () => api.conversations.get(conversation.id),
+    () => api.conversations.getPage(conversation.id),
   );
+  const detail = page?.data;
+  const [loaded, setLoaded] = useState<Message[]>([]);
+  // undefined until the first page arrives; null once there is nothing older
+  const [olderCursor, setOlderCursor] = useState<string | null | undefined>(undefined);
+  const [loadingOlder, setLoadingOlder] = useState(false);
+
+  useEffect(() => {
+    if (!page) return;
+    setLoaded((prev) => mergeMessages(prev, page.data.messages));
+    setOlderCursor((prev) => (prev === undefined ? page.nextCursor : prev));
+  }, [page]);
+
+  const loadOlder = async () => {
+    if (!olderCursor) return;
+    setLoadingOlder(true);
+    try {
+      const older = await api.conversations.getPage(conversation.id, { before: olderCursor });
+      setLoaded((prev) => mergeMessages(prev, older.data.messages));
+      setOlderCursor(older.nextCursor);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
 
   const buyerName = detail?.buyer?.fb_name || `Buyer #${conversation.buyer_id}`;
   const offer = conversation.current_offer ?? conversation.agreed_price ?? 0;
-  const messages = detail?.messages || [];
+  const messages = loaded;
   const lastMsg = messages.length > 0
     ? messages[messages.length - 1].content
     : conversation.last_message_at ? `Last active ${timeAgo(conversation.last_message_at)}` : "No messages yet";
@@ -203,6 +235,15 @@ function RealChatCard({ conversation }: { conversation: Conversation }) {
       expanded={expanded}
       onToggle={() => setExpanded(!expanded)}
     >
+      {olderCursor && (
+        <button
+          onClick={loadOlder}
+          disabled={loadingOlder}
+          className="w-full text-xs font-bold text-primary hover:underline disabled:text-ink/40 py-1"
+        >
+          {loadingOlder ? "Loading..." : "Load older messages"}
+        </button>
+      )}
       {messages.length === 0 && expanded ? (
         <p className="text-xs text-ink/40 font-medium py-2">Loading messages...</p>
       ) : (
@@ -280,7 +321,23 @@ export default function ListingDetailPage({
 
   const { data: listing, error: listingError } = useSWR(`/api/listings/${id}`, () => api.listings.get(parseInt(id)));
   const { data: jobs, mutate: mutateJobs } = useSWR(`/api/jobs?listing_id=${id}`, () => api.jobs.list({ listing_id: parseInt(id) }), { refreshInterval: 3000 });
-  const { data: conversations } = useSWR(`/conversations?listing_id=${id}`, () => api.conversations.list({ listing_id: parseInt(id) }), { refreshInterval: 5000 });
+  const { data: conversations, mutate: mutateConversations } = useSWR(`/conversations?listing_id=${id}`, () => api.conversations.list({ listing_id: parseInt(id) }));
+  const { mutate } = useSWRConfig();
+
+  // Live updates replace polling; refetch on (re)connect to catch anything missed
+  useEffect(() => {
+    const source = new EventSource(api.conversations.eventsUrl({ listing_id: parseInt(id) }));
+    const onChange = (e: MessageEvent) => {
+      const { conversation_id } = JSON.parse(e.data);
+      mutateConversations();
+      mutate(`/conversations/${conversation_id}`);
+    };
+    source.onopen = () => mutateConversations();
+    source.addEventListener("message", onChange);
+    source.addEventListener("status", onChange);
+    source.addEventListener("overflow", () => mutateConversations());
+    return () => source.close();
+  }, [id, mutate, mutateConversations]);
 
   if (listingError) {
     return (
@@ -145,7 +145,7 @@ export default function TransactionsPage() {
 
   const fetchTransactions = useCallback(async () => {
     try {
-      const data = await api.payments.listTransactions();
+      const data = await api.payments.listAllTransactions();
       setTransactions(data);
     } catch {
       // silent
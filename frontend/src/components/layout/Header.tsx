@@ -8,10 +8,10 @@ import { api } from "@/lib/api";
 const DUMMY_EARNED = 132000; // $1,320.00 in cents
 
 export function Header() {
-  const { data: transactions } = useSWR("/payments/transactions/header", () => api.payments.listTransactions().catch(() => []), { fallbackData: [], revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
+  const { data: totals } = useSWR("/payments/transactions/totals", () => api.payments.totals().catch(() => null), { revalidateOnFocus: false, shouldRetryOnError: false, refreshInterval: 10000 });
 
-  const totalEarnedCents = transactions && transactions.length > 0
-    ? transactions.filter((t) => t.status === "paid_out").reduce((s, t) => s + t.amount_cents, 0)
+  const totalEarnedCents = totals && Object.keys(totals.by_status).length > 0
+    ? totals.by_status.paid_out?.amount_cents ?? 0
     : DUMMY_EARNED;
 
   const earned = (totalEarnedCents / 100).toLocaleString("en-US", { style: "currency", currency: "USD" });
@@ -4,9 +4,11 @@ import {
   PostingJob,
   Platform,
   Transaction,
+  TransactionTotals,
   Conversation,
   ConversationDetail,
   DashboardStats,
+  Page,
 } from "./types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
@@ -20,11 +22,11 @@ class ApiError extends Error {
   }
 }
 
-async function fetchApi<T>(
+async function request(
   endpoint: string,
   options?: RequestInit,
   baseUrl: string = API_BASE
-): Promise<T> {
+): Promise<Response> {
   const res = await fetch(`${baseUrl}${endpoint}`, {
     ...options,
     headers: {
@@ -39,9 +41,28 @@ async function fetchApi<T>(
     throw new ApiError(res.status, error.detail || "Request failed");
   }
 
+  return res;
+}
+
+async function fetchApi<T>(
+  endpoint: string,
+  options?: RequestInit,
+  baseUrl: string = API_BASE
+): Promise<T> {
+  const res = await request(endpoint, options, baseUrl);
   return res.json();
 }
 
+// Keyset-paginated endpoints return the next page's cursor in X-Next-Cursor
+async function fetchPage<T>(
+  endpoint: string,
+  options?: RequestInit,
+  baseUrl: string = API_BASE
+): Promise<Page<T>> {
+  const res = await request(endpoint, options, baseUrl);
+  return { data: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 export const api = {
   listings: {
     list: () => fetchApi<Listing[]>("/api/listings"),
@@ -149,9 +170,34 @@ export const api = {
   },
 
   payments: {
-    listTransactions: () =>
+    // Newest transactions only: one page of at most `limit` (server default 100)
+    listTransactions: (params?: { limit?: number }) =>
       fetchApi<Transaction[]>(
-        "/payments/transactions",
+        `/payments/transactions${params?.limit ? `?limit=${params.limit}` : ""}`,
+        undefined,
+        MESSAGING_API_BASE
+      ),
+
+    // Every transaction, following X-Next-Cursor until the last page
+    listAllTransactions: async () => {
+      const all: Transaction[] = [];
+      let cursor: string | null = null;
+      do {
+        const page: Page<Transaction[]> = await fetchPage<Transaction[]>(
+          `/payments/transactions?limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`,
+          undefined,
+          MESSAGING_API_BASE
+        );
+        all.push(...page.data);
+        cursor = page.nextCursor;
+      } while (cursor);
+      return all;
+    },
+
+    // Count and amount per status over all transactions
+    totals: () =>
+      fetchApi<TransactionTotals>(
+        "/payments/transactions/totals",
         undefined,
         MESSAGING_API_BASE
       ),
@@ -202,6 +248,30 @@ export const api = {
         undefined,
         MESSAGING_API_BASE
       ),
+
+    // Newest `limit` messages, or the ones before a cursor from a previous page
+    getPage: (id: number, params?: { before?: string; limit?: number }) => {
+      const searchParams = new URLSearchParams();
+      if (params?.before) searchParams.append("before", params.before);
+      if (params?.limit) searchParams.append("limit", params.limit.toString());
+      const query = searchParams.toString();
+      return fetchPage<ConversationDetail>(
+        `/conversations/${id}${query ? `?${query}` : ""}`,
+        undefined,
+        MESSAGING_API_BASE
+      );
+    },
+
+    // Server-sent "message" and "status" events; use with EventSource
+    eventsUrl: (params?: { listing_id?: number; conversation_id?: number }) => {
+      const searchParams = new URLSearchParams();
+      if (params?.listing_id)
+        searchParams.append("listing_id", params.listing_id.toString());
+      if (params?.conversation_id)
+        searchParams.append("conversation_id", params.conversation_id.toString());
+      const query = searchParams.toString();
+      return `${MESSAGING_API_BASE}/events${query ? `?${query}` : ""}`;
+    },
   },
 
   stats: {
@@ -82,6 +82,10 @@ export interface Transaction {
 
 /* ── Messaging / Conversations ───────────────────── */
 
+export interface TransactionTotals {
+  by_status: Partial<Record<TransactionStatus, { count: number; amount_cents: number }>>;
+}
+
 export interface Buyer {
   id: number;
   fb_name: string;
@@ -123,6 +127,11 @@ export interface ConversationDetail extends Conversation {
   };
 }
 
+export interface Page<T> {
+  data: T;
+  nextCursor: string | null;
+}
+
 export interface DashboardStats {
   total_conversations: number;
   active_conversations: number;